@@ -4,18 +4,29 @@ from dotenv import load_dotenv
 from flask import Flask, request
 from flask_migrate import Migrate
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from utils.instrumentation import instrumentation
+from utils.serializer import FastJSONProvider
 
 load_dotenv()
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
     "DATABASE_URL", "sqlite:///" + os.path.join(basedir, "database", "database.db")
 )
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY")
 
+# Behind nginx, remote_addr is the proxy; trust this many X-Forwarded-For
+# hops so per-IP limits see the client. Set 0 when serving clients directly.
+_proxy_hops = int(os.getenv("PROXY_FIX_X_FOR", "1"))
+if _proxy_hops:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=_proxy_hops, x_proto=_proxy_hops)
+
 # Configure CORS to allow all origins
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
 
@@ -25,18 +36,34 @@ from models import db
 db.init_app(app)
 migrate = Migrate(app, db)
 
+from services.job_queue import job_queue
+import services.transaction_scoring  # registers background job handlers
+
+job_queue.init_app(app)
+instrumentation.init_app(app)
+
 from controllers.alert_controller import AlertController
 from controllers.business_controller import BusinessController
 from controllers.category_controller import CategoryController
 from controllers.dashboard_controller import DashboardController
 from controllers.forecast_controller import ForecastController
+from controllers.risk_score_controller import RiskScoreController
+from controllers.scenario_controller import ScenarioController
 from controllers.transaction_controller import TransactionController
 from controllers.user_controller import UserController
-from middleware import require_permission, self_or_admin_required, validate_json
+from middleware import rate_limit, require_permission, self_or_admin_required, validate_json
 from middleware.auth import AuthenticationMiddleware, authenticate_request
 from middleware.permissions import require_role, transaction_access_required
 from models import User
-from utils.crypto import hash_password
+from utils.crypto import PasswordHasherBusy, hash_password, needs_rehash, verify_password
+
+
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(e):
+    """Any request that needs a password hash while the hashing pool is full"""
+    from flask import jsonify
+
+    return jsonify({"error": "Password service busy, retry shortly"}), 503, {"Retry-After": "1"}
 
 
 # User routes
@@ -136,6 +163,13 @@ def create_transaction():
     return TransactionController.create_transaction()
 
 
+@app.route("/api/transactions/import", methods=["POST"])
+@authenticate_request
+@transaction_access_required
+def import_transactions():
+    return TransactionController.import_transactions()
+
+
 @app.route("/api/transactions", methods=["GET"])
 @authenticate_request
 @transaction_access_required
@@ -201,6 +235,12 @@ def regenerate_forecast_analysis(forecast_id):
     return ForecastController.regenerate_analysis(forecast_id)
 
 
+@app.route("/api/forecasts/<int:forecast_id>/risk-score", methods=["POST"])
+@authenticate_request
+def assess_forecast_risk(forecast_id):
+    return RiskScoreController.assess_forecast(forecast_id)
+
+
 # Alert routes
 @app.route("/api/alerts", methods=["POST"])
 @authenticate_request
@@ -235,8 +275,31 @@ def delete_alert(alert_id):
     return AlertController.delete_alert(alert_id)
 
 
+# Scenario routes
+@app.route("/api/scenarios/batch", methods=["POST"])
+@authenticate_request
+@require_permission("scenarios:write")
+def evaluate_scenarios():
+    return ScenarioController.evaluate_batch()
+
+
+@app.route("/api/scenarios/sweep", methods=["POST"])
+@authenticate_request
+@require_permission("scenarios:write")
+def sweep_scenarios():
+    return ScenarioController.sweep_scenarios()
+
+
+@app.route("/api/scenarios/<int:scenario_id>/run", methods=["POST"])
+@authenticate_request
+@require_permission("scenarios:write")
+def run_scenario(scenario_id):
+    return ScenarioController.run_scenario(scenario_id)
+
+
 # Auth routes
 @app.route("/api/auth/login", methods=["POST"])
+@rate_limit(max_requests=int(os.getenv("LOGIN_RATE_LIMIT", "10")), window_seconds=60)
 @validate_json(["email", "password"])
 def login():
     """Login user and return JWT token"""
@@ -244,12 +307,33 @@ def login():
 
     data = request.get_json()
 
-    user = User.query.filter_by(email=data["email"]).first()
-    hashed_password = hash_password(data["password"])
+    # Read what is needed and end the transaction, so the database
+    # connection is not held while the password hash is computed
+    user = (
+        db.session.query(User.id, User.email, User.name, User.role, User.password)
+        .filter_by(email=data["email"])
+        .first()
+    )
+    db.session.rollback()
+
+    try:
+        valid = verify_password(data["password"], user.password if user else None)
+    except PasswordHasherBusy:
+        return jsonify({"error": "Too many login attempts in progress, retry shortly"}), 503, {"Retry-After": "1"}
 
-    if not user or user.password != hashed_password:
+    if not user or not valid:
         return jsonify({"error": "Invalid credentials"}), 401
 
+    if needs_rehash(user.password):
+        try:
+            # Only replaces the hash that was verified, in case it changed meanwhile
+            User.query.filter_by(id=user.id, password=user.password).update(
+                {"password": hash_password(data["password"])}, synchronize_session=False
+            )
+            db.session.commit()
+        except PasswordHasherBusy:
+            pass  # upgraded on a later login
+
     token = AuthenticationMiddleware.generate_token(user.id, os.getenv("SECRET_KEY"))
 
     return jsonify(
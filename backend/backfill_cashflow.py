@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Rebuild the daily_cashflow rollup table from transactions.
+
+Usage:
+    python backfill_cashflow.py                 # all businesses
+    python backfill_cashflow.py --business 3    # a single business
+"""
+
+import argparse
+
+from app import app
+from repositories.daily_cashflow_repository import DailyCashflowRepository
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill daily cashflow rollups")
+    parser.add_argument(
+        "--business", type=int, default=None, help="Only rebuild this business id"
+    )
+    args = parser.parse_args()
+
+    with app.app_context():
+        scope = f"business {args.business}" if args.business else "all businesses"
+        print(f"📊 Rebuilding daily cashflow rollups for {scope}...")
+        buckets = DailyCashflowRepository().rebuild(args.business)
+        print(f"✅ Wrote {buckets} daily cashflow buckets.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark: anomaly scoring throughput with and without the statistical pre-filter.
+
+Seeds a throwaway SQLite database with a year of history per business and
+a set of new transactions (mostly ordinary, some borderline, a few
+extreme), then scores the new ones twice: once sending everything to the
+LLM and once through the pre-filter. Both the one-job-per-transaction path
+(new transactions) and job-sized batches (imports) are measured. The LLM
+is stub_llm_server.py with a configurable round-trip latency, so the
+numbers show the completions the pre-filter saves rather than network noise.
+
+Usage:
+    python benchmark_anomaly_prefilter.py                    # 1000 transactions, 300 ms LLM
+    python benchmark_anomaly_prefilter.py --transactions 5000 --latency 800 --borderline 0.1
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["DATABASE_URL"] = f"sqlite:///{database.name}"
+
+from app import app  # noqa: E402
+from models import Alert, Business, Category, Transaction, User, db  # noqa: E402
+from services import transaction_scoring  # noqa: E402
+from stub_llm_server import StubLLMServer  # noqa: E402
+
+TODAY = date(2024, 6, 30)
+HISTORY_PER_GROUP = 150
+
+
+def seed(businesses, transactions, borderline, extreme, rng):
+    owner = User(email="bench@example.com", password="unused", name="Bench", role="business_owner")
+    db.session.add(owner)
+    db.session.flush()
+
+    groups = []
+    for index in range(businesses):
+        business = Business(owner_id=owner.id, name=f"Business {index}", currency="IDR", timezone="Asia/Jakarta")
+        db.session.add(business)
+        db.session.flush()
+        for name, kind, direction, typical in (
+            ("Sales", "income", "inflow", 500.0),
+            ("Supplies", "expense", "outflow", 120.0),
+            ("Utilities", "expense", "outflow", 60.0),
+        ):
+            category = Category(business_id=business.id, name=name, type=kind)
+            db.session.add(category)
+            db.session.flush()
+            groups.append((business.id, category.id, direction, typical))
+
+    history = [
+        {
+            "business_id": business_id,
+            "category_id": category_id,
+            "direction": direction,
+            "date": TODAY - timedelta(days=rng.randrange(1, 365)),
+            "amount": round(rng.gauss(typical, typical * 0.15), 2),
+            "description": "history",
+        }
+        for business_id, category_id, direction, typical in groups
+        for _ in range(HISTORY_PER_GROUP)
+    ]
+    db.session.execute(Transaction.__table__.insert(), history)
+
+    fresh = []
+    for _ in range(transactions):
+        business_id, category_id, direction, typical = rng.choice(groups)
+        roll = rng.random()
+        if roll < extreme:
+            amount = typical * rng.uniform(8, 20)
+        elif roll < extreme + borderline:
+            amount = typical * rng.uniform(1.45, 1.9)
+        else:
+            amount = rng.gauss(typical, typical * 0.15)
+        fresh.append(
+            {
+                "business_id": business_id,
+                "category_id": category_id,
+                "direction": direction,
+                "date": TODAY,
+                "amount": round(amount, 2),
+                "description": "new",
+            }
+        )
+    db.session.execute(Transaction.__table__.insert(), fresh)
+    db.session.commit()
+
+    return [
+        transaction_id
+        for (transaction_id,) in db.session.query(Transaction.id)
+        .filter(Transaction.description == "new")
+        .order_by(Transaction.id)
+    ]
+
+
+def score(ids, batch_size, prefilter, stub):
+    Transaction.query.filter(Transaction.id.in_(ids)).update(
+        {Transaction.is_anomalous: False, Transaction.ai_tag: None}, synchronize_session=False
+    )
+    Alert.query.delete()
+    db.session.commit()
+
+    transaction_scoring.ANOMALY_PREFILTER = prefilter
+    calls, verdicts = stub.requests, stub.verdicts
+    started = time.perf_counter()
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start : start + batch_size]
+        # What the per-transaction and batch jobs do
+        if len(chunk) == 1:
+            transaction_scoring.score_transaction_anomaly({"transaction_id": chunk[0]})
+        else:
+            transaction_scoring.score_transaction_anomaly_batch({"transaction_ids": chunk})
+    elapsed = time.perf_counter() - started
+
+    flagged = Transaction.query.filter(Transaction.id.in_(ids), Transaction.is_anomalous.is_(True)).count()
+    label = f"batch {batch_size}, " + ("pre-filter" if prefilter else "LLM only")
+    print(
+        f"{label:<24} {elapsed:7.2f}s  {len(ids) / elapsed:8.1f} transactions/s  "
+        f"{stub.requests - calls:5d} LLM calls  {stub.verdicts - verdicts:5d} sent to LLM  {flagged:5d} flagged"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the anomaly pre-filter")
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--businesses", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=transaction_scoring.ANOMALY_BATCH_SIZE)
+    parser.add_argument("--latency", type=float, default=300.0, help="Stub LLM round-trip in milliseconds")
+    parser.add_argument("--borderline", type=float, default=0.03, help="Share of borderline amounts")
+    parser.add_argument("--extreme", type=float, default=0.02, help="Share of extreme amounts")
+    args = parser.parse_args()
+
+    # Seeded amounts sit well below the stub's threshold unless extreme
+    stub = StubLLMServer(("127.0.0.1", 0), threshold=1000.0, latency=args.latency / 1000).start()
+    os.environ["KOLOSAL_API_KEY"] = "stub"
+    os.environ["KOLOSAL_BASE_URL"] = stub.base_url
+
+    with app.app_context():
+        db.create_all()
+        ids = seed(args.businesses, args.transactions, args.borderline, args.extreme, random.Random(5))
+        print(f"Scoring {len(ids):,} transactions against a {args.latency:.0f} ms stub LLM")
+
+        for batch_size in (1, args.batch_size):
+            before = score(ids, batch_size, False, stub)
+            after = score(ids, batch_size, True, stub)
+            print(f"batch {batch_size} speedup: {before / after:.1f}x")
+
+    stub.stop()
+    os.unlink(database.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark: native forecasting methods over a batch of business histories.
+
+Generates synthetic daily net cashflow (trend, weekly season, noise) for
+many businesses and times every native method through
+ForecastEngine.fit_forecast, fitting all series in one vectorized pass.
+Also times the incremental Holt-Winters update the nightly run uses, and
+a sample of businesses fitted one series at a time for comparison.
+
+Usage:
+    python benchmark_forecasting.py                      # 10k businesses x 3 years
+    python benchmark_forecasting.py --businesses 2000 --days 730 --horizon 90
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from services.forecasting import ForecastEngine
+from services.forecasting.methods import HoltWinters
+
+CASES = (
+    ("holt_winters", {}, "Holt-Winters, 12-point grid"),
+    ("holt_winters", {"alpha": 0.3, "beta": 0.1, "gamma": 0.2}, "Holt-Winters, fixed params"),
+    ("arima", {"p": 2, "d": 1}, "ARIMA(2,1,0)"),
+    ("seasonal_naive", {}, "seasonal naive"),
+    ("mean", {}, "historical mean"),
+)
+
+
+def synthetic_history(businesses, days, seed=3):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    base = rng.uniform(50, 5000, size=(businesses, 1))
+    trend = rng.normal(0, 0.002, size=(businesses, 1)) * base * t
+    weekly = rng.uniform(0, 0.4, size=(businesses, 7)) * base
+    noise = rng.normal(0, 0.15, size=(businesses, days)) * base
+    return base + trend + weekly[:, t % 7] + noise
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def report(label, businesses, elapsed):
+    print(f"{label:<32} {elapsed:8.2f}s  {businesses / elapsed:>11,.0f} businesses/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the forecasting engine")
+    parser.add_argument("--businesses", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--sample", type=int, default=100, help="Businesses fitted one at a time for comparison")
+    args = parser.parse_args()
+
+    engine = ForecastEngine()
+    Y = synthetic_history(args.businesses, args.days)
+    print(f"{args.businesses:,} businesses x {args.days} days ({Y.nbytes / 1e6:.0f} MB), horizon {args.horizon}")
+
+    for model_type, params, label in CASES:
+        (result, method, _), elapsed = timed(
+            lambda: engine.fit_forecast(model_type, params, Y, args.horizon)
+        )
+        assert result.mean.shape == (args.businesses, args.horizon), method
+        report(label, args.businesses, elapsed)
+
+    # Nightly incremental refresh: extend a stored fit by one new day
+    history, new_day = Y[:, :-1], Y[:, -1:]
+    fitted = HoltWinters().fit_forecast(history, args.horizon)
+    _, elapsed = timed(lambda: HoltWinters().update(fitted.state, new_day, args.horizon))
+    report("Holt-Winters, update +1 day", args.businesses, elapsed)
+
+    sample = Y[: args.sample]
+    _, elapsed = timed(
+        lambda: [engine.fit_forecast("holt_winters", {}, row[None, :], args.horizon) for row in sample]
+    )
+    per_business = elapsed / len(sample)
+    report("Holt-Winters, one at a time", len(sample), elapsed)
+    print(f"  -> {per_business * args.businesses:.0f}s projected for all {args.businesses:,} businesses")
+
+
+if __name__ == "__main__":
+    main()
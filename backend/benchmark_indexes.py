@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Benchmark: transaction scan queries with and without the composite indexes.
+
+Seeds a scratch database with synthetic transactions spread over many
+businesses, then runs the hot (business_id, date) reads twice: once with
+the transactions table stripped of its secondary indexes and once with the
+indexes declared on the model. Prints each query plan and its latency.
+
+Runs against a throwaway SQLite file by default. Set BENCHMARK_DATABASE_URL
+to an empty scratch database (e.g. Postgres) to measure there instead; its
+tables are dropped at the end.
+
+Usage:
+    python benchmark_indexes.py                         # 1M rows, 1000 businesses
+    python benchmark_indexes.py --rows 5000000 --repeat 20
+    BENCHMARK_DATABASE_URL=postgresql://localhost/bench python benchmark_indexes.py
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+database = None
+if os.getenv("BENCHMARK_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["BENCHMARK_DATABASE_URL"]
+else:
+    database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    os.environ["DATABASE_URL"] = f"sqlite:///{database.name}"
+
+from sqlalchemy import text  # noqa: E402
+
+from app import app  # noqa: E402
+from models import Business, Transaction, User, db  # noqa: E402
+
+START = date(2022, 1, 1)
+DAYS = 3 * 365
+INSERT_BATCH = 50_000
+
+QUERIES = {
+    # TransactionRepository.findByDateRange / forecast history
+    "date range": (
+        "SELECT * FROM transactions WHERE business_id = :business AND date >= :start AND date <= :end",
+        {},
+    ),
+    # Dashboard inflow/outflow totals
+    "direction totals": (
+        "SELECT direction, SUM(amount) FROM transactions WHERE business_id = :business "
+        "AND date >= :start AND date <= :end GROUP BY direction",
+        {},
+    ),
+    "outflow range": (
+        "SELECT SUM(amount) FROM transactions WHERE business_id = :business "
+        "AND direction = 'outflow' AND date >= :start AND date <= :end",
+        {},
+    ),
+    "anomalous": (
+        "SELECT * FROM transactions WHERE business_id = :business AND is_anomalous = :flag",
+        {"flag": True},
+    ),
+    # Newest-first listing page
+    "listing page": (
+        "SELECT * FROM transactions WHERE business_id = :business "
+        "ORDER BY date DESC, id DESC LIMIT 50",
+        {},
+    ),
+}
+
+
+def seed(rows, businesses):
+    owner = User(email="bench@example.com", password="unused", name="Bench", role="business_owner")
+    db.session.add(owner)
+    db.session.flush()
+    db.session.add_all(
+        Business(owner_id=owner.id, name=f"Business {index}", currency="IDR", timezone="Asia/Jakarta")
+        for index in range(businesses)
+    )
+    db.session.commit()
+    business_ids = [business_id for (business_id,) in db.session.query(Business.id)]
+
+    rng = random.Random(7)
+    table = Transaction.__table__
+    for offset in range(0, rows, INSERT_BATCH):
+        batch = [
+            {
+                "business_id": rng.choice(business_ids),
+                "date": START + timedelta(days=rng.randrange(DAYS)),
+                "amount": round(rng.lognormvariate(4, 1), 2),
+                "direction": "inflow" if rng.random() < 0.45 else "outflow",
+                "is_anomalous": rng.random() < 0.01,
+            }
+            for _ in range(min(INSERT_BATCH, rows - offset))
+        ]
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+    return business_ids
+
+
+def plan(sql, params):
+    if db.engine.dialect.name == "sqlite":
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)
+        return "; ".join(row[-1] for row in rows)
+    rows = db.session.execute(text(f"EXPLAIN {sql}"), params)
+    return "; ".join(row[0].strip() for row in rows)
+
+
+def run(label, business_ids, repeat):
+    rng = random.Random(11)
+    print(f"\n== {label}")
+    timings = {}
+    for name, (sql, extra) in QUERIES.items():
+        samples = []
+        for _ in range(repeat):
+            start = START + timedelta(days=rng.randrange(DAYS - 90))
+            params = {"business": rng.choice(business_ids), "start": start, "end": start + timedelta(days=60), **extra}
+            began = time.perf_counter()
+            db.session.execute(text(sql), params).fetchall()
+            samples.append(time.perf_counter() - began)
+        samples.sort()
+        timings[name] = samples[len(samples) // 2]
+        print(f"{name:<18} {timings[name] * 1000:9.2f} ms  {plan(sql, params)}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transaction scan indexes")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--businesses", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per query; the median is reported")
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        indexes = list(Transaction.__table__.indexes)
+        for index in indexes:
+            index.drop(db.engine)
+
+        began = time.perf_counter()
+        business_ids = seed(args.rows, args.businesses)
+        print(
+            f"Seeded {args.rows:,} transactions for {args.businesses:,} businesses "
+            f"on {db.engine.dialect.name} in {time.perf_counter() - began:.1f}s"
+        )
+
+        before = run("no secondary indexes", business_ids, args.repeat)
+
+        began = time.perf_counter()
+        for index in indexes:
+            index.create(db.engine)
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        print(f"\nBuilt {len(indexes)} indexes in {time.perf_counter() - began:.1f}s")
+
+        after = run("model indexes", business_ids, args.repeat)
+
+        print()
+        for name in QUERIES:
+            print(f"{name:<18} {before[name] / after[name]:8.1f}x faster")
+
+        db.session.remove()
+        db.drop_all()
+
+    if database:
+        os.unlink(database.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Load test: logins per second through POST /api/auth/login.
+
+Runs concurrent clients against the app in-process with a throwaway SQLite
+database, at the PASSWORD_SCRYPT_* / PASSWORD_HASH_* settings from the
+environment. Rate limiting is switched off so the KDF is what is measured.
+
+Usage:
+    python benchmark_login.py                     # 8 clients for 10 seconds
+    python benchmark_login.py --clients 32 --seconds 5
+    PASSWORD_SCRYPT_N=32768 python benchmark_login.py
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["DATABASE_URL"] = f"sqlite:///{database.name}"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app import app  # noqa: E402
+from models import User, db  # noqa: E402
+from utils import crypto  # noqa: E402
+
+EMAIL = "load@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login throughput")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(
+            User(email=EMAIL, name="Load", role="viewer", password=crypto.hash_password(PASSWORD))
+        )
+        db.session.commit()
+
+        started = time.perf_counter()
+        for _ in range(5):
+            crypto.hash_password(PASSWORD)
+        kdf_ms = (time.perf_counter() - started) / 5 * 1000
+
+    print(
+        f"scrypt N={crypto.SCRYPT_N} r={crypto.SCRYPT_R} p={crypto.SCRYPT_P}: "
+        f"{kdf_ms:.1f} ms per hash; pool {crypto.HASH_WORKERS} workers + "
+        f"{crypto.HASH_QUEUE} queued; {args.clients} clients for {args.seconds:.0f}s"
+    )
+
+    statuses = Counter()
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def client_loop():
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            response = client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            elapsed = time.perf_counter() - began
+            with lock:
+                statuses[response.status_code] += 1
+                if response.status_code == 200:
+                    latencies.append(elapsed)
+
+    threads = [threading.Thread(target=client_loop) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    print(f"logins/second: {ok / args.seconds:.1f}  statuses: {dict(statuses)}")
+    if latencies:
+        print(
+            f"latency p50 {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} ms"
+        )
+
+    os.unlink(database.name)
+
+
+if __name__ == "__main__":
+    main()
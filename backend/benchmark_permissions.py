@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Microbenchmark: per-request overhead of the require_permission decorator.
+
+Compares the list-scanning checks the decorator used to run against the
+precompiled permission bitmasks, for a token user and an API key.
+
+Usage:
+    python benchmark_permissions.py               # 200k calls per case
+    python benchmark_permissions.py --calls 50000
+"""
+
+import argparse
+import time
+from functools import wraps
+
+from flask import g, jsonify, request
+
+from app import app
+from middleware.auth_cache import Principal
+from middleware.permissions import PermissionPolicies, require_permission
+
+
+def legacy_require_permission(permission):
+    """The decorator as it was before the masks: lists rebuilt and scanned per call"""
+
+    def user_permissions(user):
+        return list(PermissionPolicies.ROLE_PERMISSIONS.get(user.role or "viewer", []))
+
+    def api_key_permissions(scopes):
+        permissions = []
+        for scope in scopes:
+            if scope in PermissionPolicies.API_KEY_SCOPES:
+                permissions.extend(PermissionPolicies.API_KEY_SCOPES[scope])
+        return list(set(permissions))
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not hasattr(g, "current_user") or not g.current_user:
+                return jsonify({"error": "Authentication required"}), 401
+
+            business_id = kwargs.get("business_id") or request.view_args.get(
+                "business_id"
+            )
+
+            if g.auth_method == "api_key":
+                if permission not in api_key_permissions(getattr(g, "scopes", [])):
+                    return jsonify({"error": "Insufficient permissions"}), 403
+            else:
+                if permission not in user_permissions(g.current_user):
+                    return jsonify({"error": "Insufficient permissions"}), 403
+                if business_id and g.current_user.role != "admin":
+                    if business_id not in g.current_user.business_ids:
+                        return jsonify({"error": "Insufficient permissions"}), 403
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
+
+
+def view(**kwargs):
+    return None
+
+
+def measure(label, function, calls, baseline=0.0):
+    started = time.perf_counter()
+    for _ in range(calls):
+        function(business_id=7)
+    per_call = (time.perf_counter() - started) / calls - baseline
+    print(f"{label:<34} {per_call * 1e9:9.0f} ns/request")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark permission checks")
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    permission = "scenarios:write"
+    cases = (
+        ("token user", "token", Principal(1, "owner@example.com", "Owner", "business_owner", [7]), None),
+        ("API key", "api_key", Principal(1, "owner@example.com", "Owner", "business_owner", [7]), ["read", "write"]),
+    )
+
+    with app.test_request_context("/api/businesses/7"):
+        baseline = measure("undecorated view", view, args.calls)
+        for label, method, user, scopes in cases:
+            g.current_user = user
+            g.auth_method = method
+            g.scopes = scopes
+            before = measure(f"{label}: list scan", legacy_require_permission(permission)(view), args.calls, baseline)
+            after = measure(f"{label}: bitmask", require_permission(permission)(view), args.calls, baseline)
+            print(f"{label}: {before / after:.1f}x less decorator overhead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Microbenchmark: serialize Transaction rows to a JSON response body.
+
+Compares the per-row dict construction the controllers used to do (encoded
+with Flask's stdlib provider) against the compiled ModelSerializer with
+FastJSONProvider (orjson when installed).
+
+Usage:
+    python benchmark_serializer.py              # 100k rows
+    python benchmark_serializer.py --rows 20000
+"""
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import app
+from models import Transaction
+from utils.serializer import FastJSONProvider, orjson, serializer_for
+
+
+def legacy_dict(transaction):
+    return {
+        "id": transaction.id,
+        "business_id": transaction.business_id,
+        "date": transaction.date.isoformat() if transaction.date else None,
+        "datetime": transaction.datetime.isoformat()
+        if transaction.datetime
+        else None,
+        "description": transaction.description,
+        "amount": float(transaction.amount) if transaction.amount else None,
+        "direction": transaction.direction,
+        "category_id": transaction.category_id,
+        "source": transaction.source,
+        "ocr_document_id": transaction.ocr_document_id,
+        "tags": transaction.tags,
+        "is_anomalous": transaction.is_anomalous,
+        "ai_tag": transaction.ai_tag,
+        "created_at": transaction.created_at.isoformat()
+        if transaction.created_at
+        else None,
+        "updated_at": transaction.updated_at.isoformat()
+        if transaction.updated_at
+        else None,
+    }
+
+
+def build_rows(count):
+    """Instances with every column set, like rows loaded by a query"""
+    start = date(2024, 1, 1)
+    created = datetime(2024, 1, 1, 9, 30)
+    return [
+        Transaction(
+            id=index,
+            business_id=index % 50,
+            date=start + timedelta(days=index % 365),
+            datetime=created + timedelta(minutes=index),
+            description=f"Invoice #{index}",
+            amount=Decimal(index % 10000) / 100 + Decimal("1.25"),
+            direction="inflow" if index % 2 else "outflow",
+            category_id=index % 12 or None,
+            source="import",
+            ocr_document_id=None,
+            tags=["recurring"] if index % 5 == 0 else None,
+            is_anomalous=index % 97 == 0,
+            ai_tag=None,
+            created_at=created,
+            updated_at=None,
+        )
+        for index in range(count)
+    ]
+
+
+def measure(label, rows, to_dicts, provider):
+    started = time.perf_counter()
+    payload = to_dicts(rows)
+    body = provider.dumps(payload, separators=(",", ":"))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<34} {elapsed:7.3f}s  {len(rows) / elapsed:>12,.0f} rows/s  "
+        f"({len(body) / 1e6:.1f} MB)"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark row serialization")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with app.app_context():
+        rows = build_rows(args.rows)
+        serializer = serializer_for(Transaction)
+
+        print(f"Serializing {args.rows:,} Transaction rows (orjson: {'yes' if orjson else 'no'})")
+        before = measure(
+            "hand-built dicts + stdlib json",
+            rows,
+            lambda items: [legacy_dict(item) for item in items],
+            DefaultJSONProvider(app),
+        )
+        after = measure("compiled serializer + FastJSON", rows, serializer.many, FastJSONProvider(app))
+        print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
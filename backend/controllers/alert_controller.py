@@ -1,6 +1,25 @@
 from flask import request, jsonify, g
 from models import db, Alert, Business, Transaction, Forecast
 from datetime import datetime
+from utils.streaming import requested_stream_format, stream_query
+from repositories.alert_repository import AlertRepository
+from utils.serializer import serializer_for
+
+alert_serializer = serializer_for(Alert)
+
+
+def _alert_listing(query):
+    query = AlertRepository().read_only(query)
+
+    try:
+        stream = requested_stream_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        return stream_query(query.order_by(Alert.id), alert_serializer.one, stream)
+
+    return jsonify(alert_serializer.many(query))
 
 
 class AlertController:
@@ -53,54 +72,17 @@ class AlertController:
         db.session.add(alert)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": alert.id,
-                "business_id": alert.business_id,
-                "created_at": alert.created_at.isoformat()
-                if alert.created_at
-                else None,
-                "level": alert.level,
-                "message": alert.message,
-                "linked_transaction_id": alert.linked_transaction_id,
-                "linked_forecast_id": alert.linked_forecast_id,
-                "resolved": alert.resolved,
-                "resolved_at": alert.resolved_at.isoformat()
-                if alert.resolved_at
-                else None,
-                "forecast_metadata": alert.forecast_metadata,
-            }
-        ), 201
+        return jsonify(alert_serializer.one(alert)), 201
 
     @staticmethod
     def get_alerts():
         # Only admin users can see all alerts, regular users can only see their own business alerts
         if g.current_user.role == "admin":
-            alerts = Alert.query.all()
+            query = Alert.query
         else:
-            alerts = Alert.query.join(Business).filter(Business.owner_id == g.current_user.id).all()
-
-        return jsonify(
-            [
-                {
-                    "id": alert.id,
-                    "business_id": alert.business_id,
-                    "created_at": alert.created_at.isoformat()
-                    if alert.created_at
-                    else None,
-                    "level": alert.level,
-                    "message": alert.message,
-                    "linked_transaction_id": alert.linked_transaction_id,
-                    "linked_forecast_id": alert.linked_forecast_id,
-                    "resolved": alert.resolved,
-                    "resolved_at": alert.resolved_at.isoformat()
-                    if alert.resolved_at
-                    else None,
-                    "forecast_metadata": alert.forecast_metadata,
-                }
-                for alert in alerts
-            ]
-        )
+            query = Alert.query.join(Business).filter(Business.owner_id == g.current_user.id)
+
+        return _alert_listing(query)
 
     @staticmethod
     def get_alert(alert_id):
@@ -113,24 +95,7 @@ class AlertController:
             if alert.business.owner_id != g.current_user.id:
                 return jsonify({"error": "Access denied. You can only view alerts from your own businesses."}), 403
 
-        return jsonify(
-            {
-                "id": alert.id,
-                "business_id": alert.business_id,
-                "created_at": alert.created_at.isoformat()
-                if alert.created_at
-                else None,
-                "level": alert.level,
-                "message": alert.message,
-                "linked_transaction_id": alert.linked_transaction_id,
-                "linked_forecast_id": alert.linked_forecast_id,
-                "resolved": alert.resolved,
-                "resolved_at": alert.resolved_at.isoformat()
-                if alert.resolved_at
-                else None,
-                "forecast_metadata": alert.forecast_metadata,
-            }
-        )
+        return jsonify(alert_serializer.one(alert))
 
     @staticmethod
     def update_alert(alert_id):
@@ -189,24 +154,7 @@ class AlertController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": alert.id,
-                "business_id": alert.business_id,
-                "created_at": alert.created_at.isoformat()
-                if alert.created_at
-                else None,
-                "level": alert.level,
-                "message": alert.message,
-                "linked_transaction_id": alert.linked_transaction_id,
-                "linked_forecast_id": alert.linked_forecast_id,
-                "resolved": alert.resolved,
-                "resolved_at": alert.resolved_at.isoformat()
-                if alert.resolved_at
-                else None,
-                "forecast_metadata": alert.forecast_metadata,
-            }
-        )
+        return jsonify(alert_serializer.one(alert))
 
     @staticmethod
     def delete_alert(alert_id):
@@ -233,86 +181,26 @@ class AlertController:
         if g.current_user.role != "admin" and business.owner_id != g.current_user.id:
             return jsonify({"error": "Access denied. You can only view alerts from your own businesses."}), 403
 
-        alerts = Alert.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": alert.id,
-                    "business_id": alert.business_id,
-                    "created_at": alert.created_at.isoformat()
-                    if alert.created_at
-                    else None,
-                    "level": alert.level,
-                    "message": alert.message,
-                    "linked_transaction_id": alert.linked_transaction_id,
-                    "linked_forecast_id": alert.linked_forecast_id,
-                    "resolved": alert.resolved,
-                    "resolved_at": alert.resolved_at.isoformat()
-                    if alert.resolved_at
-                    else None,
-                    "forecast_metadata": alert.forecast_metadata,
-                }
-                for alert in alerts
-            ]
-        )
+        query = Alert.query.filter_by(business_id=business_id)
+        return _alert_listing(query)
 
     @staticmethod
     def get_alerts_by_level(level):
         # Only admin users can see all alerts by level, regular users can only see their own business alerts by level
         if g.current_user.role == "admin":
-            alerts = Alert.query.filter_by(level=level).all()
+            query = Alert.query.filter_by(level=level)
         else:
-            alerts = Alert.query.join(Business).filter(Business.owner_id == g.current_user.id, Alert.level == level).all()
-        return jsonify(
-            [
-                {
-                    "id": alert.id,
-                    "business_id": alert.business_id,
-                    "created_at": alert.created_at.isoformat()
-                    if alert.created_at
-                    else None,
-                    "level": alert.level,
-                    "message": alert.message,
-                    "linked_transaction_id": alert.linked_transaction_id,
-                    "linked_forecast_id": alert.linked_forecast_id,
-                    "resolved": alert.resolved,
-                    "resolved_at": alert.resolved_at.isoformat()
-                    if alert.resolved_at
-                    else None,
-                    "forecast_metadata": alert.forecast_metadata,
-                }
-                for alert in alerts
-            ]
-        )
+            query = Alert.query.join(Business).filter(Business.owner_id == g.current_user.id, Alert.level == level)
+        return _alert_listing(query)
 
     @staticmethod
     def get_unresolved_alerts():
         # Only admin users can see all unresolved alerts, regular users can only see their own business unresolved alerts
         if g.current_user.role == "admin":
-            alerts = Alert.query.filter_by(resolved=False).all()
+            query = Alert.query.filter_by(resolved=False)
         else:
-            alerts = Alert.query.join(Business).filter(Business.owner_id == g.current_user.id, Alert.resolved == False).all()
-        return jsonify(
-            [
-                {
-                    "id": alert.id,
-                    "business_id": alert.business_id,
-                    "created_at": alert.created_at.isoformat()
-                    if alert.created_at
-                    else None,
-                    "level": alert.level,
-                    "message": alert.message,
-                    "linked_transaction_id": alert.linked_transaction_id,
-                    "linked_forecast_id": alert.linked_forecast_id,
-                    "resolved": alert.resolved,
-                    "resolved_at": alert.resolved_at.isoformat()
-                    if alert.resolved_at
-                    else None,
-                    "forecast_metadata": alert.forecast_metadata,
-                }
-                for alert in alerts
-            ]
-        )
+            query = Alert.query.join(Business).filter(Business.owner_id == g.current_user.id, Alert.resolved == False)
+        return _alert_listing(query)
 
     @staticmethod
     def resolve_alert(alert_id):
@@ -328,21 +216,4 @@ class AlertController:
         alert.resolved_at = datetime.utcnow()
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": alert.id,
-                "business_id": alert.business_id,
-                "created_at": alert.created_at.isoformat()
-                if alert.created_at
-                else None,
-                "level": alert.level,
-                "message": alert.message,
-                "linked_transaction_id": alert.linked_transaction_id,
-                "linked_forecast_id": alert.linked_forecast_id,
-                "resolved": alert.resolved,
-                "resolved_at": alert.resolved_at.isoformat()
-                if alert.resolved_at
-                else None,
-                "forecast_metadata": alert.forecast_metadata,
-            }
-        )
+        return jsonify(alert_serializer.one(alert))
@@ -1,5 +1,9 @@
 from flask import request, jsonify
 from models import db, APIKey, Business
+from middleware.auth_cache import auth_cache
+from utils.serializer import serializer_for
+
+api_key_serializer = serializer_for(APIKey)
 
 
 class APIKeyController:
@@ -25,39 +29,12 @@ class APIKeyController:
         db.session.add(api_key)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": api_key.id,
-                "business_id": api_key.business_id,
-                "name": api_key.name,
-                "key_hash": api_key.key_hash,
-                "scopes": api_key.scopes,
-                "revoked": api_key.revoked,
-                "created_at": api_key.created_at.isoformat()
-                if api_key.created_at
-                else None,
-            }
-        ), 201
+        return jsonify(api_key_serializer.one(api_key)), 201
 
     @staticmethod
     def get_api_keys():
         api_keys = APIKey.query.all()
-        return jsonify(
-            [
-                {
-                    "id": key.id,
-                    "business_id": key.business_id,
-                    "name": key.name,
-                    "key_hash": key.key_hash,
-                    "scopes": key.scopes,
-                    "revoked": key.revoked,
-                    "created_at": key.created_at.isoformat()
-                    if key.created_at
-                    else None,
-                }
-                for key in api_keys
-            ]
-        )
+        return jsonify(api_key_serializer.many(api_keys))
 
     @staticmethod
     def get_api_key(api_key_id):
@@ -65,19 +42,7 @@ class APIKeyController:
         if not api_key:
             return jsonify({"error": "API key not found"}), 404
 
-        return jsonify(
-            {
-                "id": api_key.id,
-                "business_id": api_key.business_id,
-                "name": api_key.name,
-                "key_hash": api_key.key_hash,
-                "scopes": api_key.scopes,
-                "revoked": api_key.revoked,
-                "created_at": api_key.created_at.isoformat()
-                if api_key.created_at
-                else None,
-            }
-        )
+        return jsonify(api_key_serializer.one(api_key))
 
     @staticmethod
     def update_api_key(api_key_id):
@@ -106,20 +71,9 @@ class APIKeyController:
             api_key.revoked = data["revoked"]
 
         db.session.commit()
+        auth_cache.invalidate_api_key(api_key_id)
 
-        return jsonify(
-            {
-                "id": api_key.id,
-                "business_id": api_key.business_id,
-                "name": api_key.name,
-                "key_hash": api_key.key_hash,
-                "scopes": api_key.scopes,
-                "revoked": api_key.revoked,
-                "created_at": api_key.created_at.isoformat()
-                if api_key.created_at
-                else None,
-            }
-        )
+        return jsonify(api_key_serializer.one(api_key))
 
     @staticmethod
     def delete_api_key(api_key_id):
@@ -129,6 +83,7 @@ class APIKeyController:
 
         db.session.delete(api_key)
         db.session.commit()
+        auth_cache.invalidate_api_key(api_key_id)
 
         return jsonify({"message": "API key deleted successfully"})
 
@@ -139,62 +94,17 @@ class APIKeyController:
             return jsonify({"error": "Business not found"}), 404
 
         api_keys = APIKey.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": key.id,
-                    "business_id": key.business_id,
-                    "name": key.name,
-                    "key_hash": key.key_hash,
-                    "scopes": key.scopes,
-                    "revoked": key.revoked,
-                    "created_at": key.created_at.isoformat()
-                    if key.created_at
-                    else None,
-                }
-                for key in api_keys
-            ]
-        )
+        return jsonify(api_key_serializer.many(api_keys))
 
     @staticmethod
     def get_active_api_keys():
         api_keys = APIKey.query.filter_by(revoked=False).all()
-        return jsonify(
-            [
-                {
-                    "id": key.id,
-                    "business_id": key.business_id,
-                    "name": key.name,
-                    "key_hash": key.key_hash,
-                    "scopes": key.scopes,
-                    "revoked": key.revoked,
-                    "created_at": key.created_at.isoformat()
-                    if key.created_at
-                    else None,
-                }
-                for key in api_keys
-            ]
-        )
+        return jsonify(api_key_serializer.many(api_keys))
 
     @staticmethod
     def get_revoked_api_keys():
         api_keys = APIKey.query.filter_by(revoked=True).all()
-        return jsonify(
-            [
-                {
-                    "id": key.id,
-                    "business_id": key.business_id,
-                    "name": key.name,
-                    "key_hash": key.key_hash,
-                    "scopes": key.scopes,
-                    "revoked": key.revoked,
-                    "created_at": key.created_at.isoformat()
-                    if key.created_at
-                    else None,
-                }
-                for key in api_keys
-            ]
-        )
+        return jsonify(api_key_serializer.many(api_keys))
 
     @staticmethod
     def revoke_api_key(api_key_id):
@@ -204,20 +114,9 @@ class APIKeyController:
 
         api_key.revoked = True
         db.session.commit()
+        auth_cache.invalidate_api_key(api_key_id)
 
-        return jsonify(
-            {
-                "id": api_key.id,
-                "business_id": api_key.business_id,
-                "name": api_key.name,
-                "key_hash": api_key.key_hash,
-                "scopes": api_key.scopes,
-                "revoked": api_key.revoked,
-                "created_at": api_key.created_at.isoformat()
-                if api_key.created_at
-                else None,
-            }
-        )
+        return jsonify(api_key_serializer.one(api_key))
 
     @staticmethod
     def activate_api_key(api_key_id):
@@ -228,16 +127,4 @@ class APIKeyController:
         api_key.revoked = False
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": api_key.id,
-                "business_id": api_key.business_id,
-                "name": api_key.name,
-                "key_hash": api_key.key_hash,
-                "scopes": api_key.scopes,
-                "revoked": api_key.revoked,
-                "created_at": api_key.created_at.isoformat()
-                if api_key.created_at
-                else None,
-            }
-        )
+        return jsonify(api_key_serializer.one(api_key))
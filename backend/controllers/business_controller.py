@@ -2,6 +2,7 @@ from flask import request, jsonify, g
 from models import db, Business, User
 from repositories.business_repository import BusinessRepository
 from middleware import authenticate_request
+from middleware.auth_cache import auth_cache
 
 
 class BusinessController:
@@ -28,6 +29,7 @@ class BusinessController:
             return jsonify({"error": "Owner not found"}), 404
 
         business = self.business_repository.createWithOwner(data, data["owner_id"])
+        auth_cache.invalidate_user(data["owner_id"])
         return jsonify(self.business_repository.to_dict(business)), 201
 
     def index(self):
@@ -63,6 +65,9 @@ class BusinessController:
                 return jsonify({"error": "Owner not found"}), 404
 
         updated_business = self.business_repository.update(business_id, data)
+        if "owner_id" in data:
+            auth_cache.invalidate_business(business_id)
+            auth_cache.invalidate_user(data["owner_id"])
         return jsonify(self.business_repository.to_dict(updated_business))
 
     def destroy(self, business_id):
@@ -71,6 +76,7 @@ class BusinessController:
             return jsonify({"error": "Business not found"}), 404
 
         self.business_repository.delete(business_id)
+        auth_cache.invalidate_business(business_id)
         return jsonify({"message": "Business deleted successfully"})
 
     def my_businesses(self):
@@ -171,6 +177,9 @@ class BusinessController:
                 return jsonify({"error": "Owner not found"}), 404
 
         updated_business = self.business_repository.update(business_id, data)
+        if "owner_id" in data:
+            auth_cache.invalidate_business(business_id)
+            auth_cache.invalidate_user(data["owner_id"])
         return jsonify(self.business_repository.to_dict(updated_business))
 
     def delete_business(self, business_id):
@@ -179,6 +188,7 @@ class BusinessController:
             return jsonify({"error": "Business not found"}), 404
 
         self.business_repository.delete(business_id)
+        auth_cache.invalidate_business(business_id)
         return jsonify({"message": "Business deleted successfully"})
 
     def update_settings(self, business_id):
@@ -1,5 +1,8 @@
 from flask import request, jsonify
 from models import db, Category, Business
+from utils.serializer import serializer_for
+
+category_serializer = serializer_for(Category)
 
 
 class CategoryController:
@@ -34,37 +37,12 @@ class CategoryController:
         db.session.add(category)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": category.id,
-                "business_id": category.business_id,
-                "name": category.name,
-                "type": category.type,
-                "parent_id": category.parent_id,
-                "created_at": category.created_at.isoformat()
-                if category.created_at
-                else None,
-            }
-        ), 201
+        return jsonify(category_serializer.one(category)), 201
 
     @staticmethod
     def get_categories():
         categories = Category.query.all()
-        return jsonify(
-            [
-                {
-                    "id": category.id,
-                    "business_id": category.business_id,
-                    "name": category.name,
-                    "type": category.type,
-                    "parent_id": category.parent_id,
-                    "created_at": category.created_at.isoformat()
-                    if category.created_at
-                    else None,
-                }
-                for category in categories
-            ]
-        )
+        return jsonify(category_serializer.many(categories))
 
     @staticmethod
     def get_category(category_id):
@@ -72,18 +50,7 @@ class CategoryController:
         if not category:
             return jsonify({"error": "Category not found"}), 404
 
-        return jsonify(
-            {
-                "id": category.id,
-                "business_id": category.business_id,
-                "name": category.name,
-                "type": category.type,
-                "parent_id": category.parent_id,
-                "created_at": category.created_at.isoformat()
-                if category.created_at
-                else None,
-            }
-        )
+        return jsonify(category_serializer.one(category))
 
     @staticmethod
     def update_category(category_id):
@@ -114,18 +81,7 @@ class CategoryController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": category.id,
-                "business_id": category.business_id,
-                "name": category.name,
-                "type": category.type,
-                "parent_id": category.parent_id,
-                "created_at": category.created_at.isoformat()
-                if category.created_at
-                else None,
-            }
-        )
+        return jsonify(category_serializer.one(category))
 
     @staticmethod
     def delete_category(category_id):
@@ -150,21 +106,7 @@ class CategoryController:
             return jsonify({"error": "Business not found"}), 404
 
         categories = Category.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": category.id,
-                    "business_id": category.business_id,
-                    "name": category.name,
-                    "type": category.type,
-                    "parent_id": category.parent_id,
-                    "created_at": category.created_at.isoformat()
-                    if category.created_at
-                    else None,
-                }
-                for category in categories
-            ]
-        )
+        return jsonify(category_serializer.many(categories))
 
     @staticmethod
     def get_root_categories(business_id):
@@ -175,21 +117,7 @@ class CategoryController:
         categories = Category.query.filter_by(
             business_id=business_id, parent_id=None
         ).all()
-        return jsonify(
-            [
-                {
-                    "id": category.id,
-                    "business_id": category.business_id,
-                    "name": category.name,
-                    "type": category.type,
-                    "parent_id": category.parent_id,
-                    "created_at": category.created_at.isoformat()
-                    if category.created_at
-                    else None,
-                }
-                for category in categories
-            ]
-        )
+        return jsonify(category_serializer.many(categories))
 
     @staticmethod
     def get_child_categories(parent_id):
@@ -198,18 +126,4 @@ class CategoryController:
             return jsonify({"error": "Parent category not found"}), 404
 
         categories = Category.query.filter_by(parent_id=parent_id).all()
-        return jsonify(
-            [
-                {
-                    "id": category.id,
-                    "business_id": category.business_id,
-                    "name": category.name,
-                    "type": category.type,
-                    "parent_id": category.parent_id,
-                    "created_at": category.created_at.isoformat()
-                    if category.created_at
-                    else None,
-                }
-                for category in categories
-            ]
-        )
+        return jsonify(category_serializer.many(categories))
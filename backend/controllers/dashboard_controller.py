@@ -1,10 +1,84 @@
 from flask import jsonify, g
-from models import Business, Transaction, RiskScore
+from models import db, Business, DailyCashflow, RiskScore
 from datetime import datetime, timedelta
-from sqlalchemy import func, extract
+from decimal import Decimal
+from sqlalchemy import func, extract, case, literal, true
 
 
 class DashboardController:
+    @staticmethod
+    def _fetch_period_metrics(business_id, prev_start, current_start, end):
+        """Compute current/previous inflow and outflow plus the latest risk score
+        in a single statement.
+
+        The previous period covers [prev_start, current_start) and the current
+        period [current_start, end]. Returns (totals, latest_risk_score) where
+        latest_risk_score is None when the business has no risk scores yet.
+        """
+
+        def period_sum(direction, condition):
+            return func.coalesce(
+                func.sum(
+                    case(
+                        (
+                            db.and_(DailyCashflow.direction == direction, condition),
+                            DailyCashflow.total,
+                        ),
+                        else_=literal(0),
+                    )
+                ),
+                0,
+            )
+
+        is_current = DailyCashflow.date >= current_start
+        is_previous = DailyCashflow.date < current_start
+
+        totals = (
+            db.select(
+                period_sum("inflow", is_current).label("current_inflow"),
+                period_sum("outflow", is_current).label("current_outflow"),
+                period_sum("inflow", is_previous).label("prev_inflow"),
+                period_sum("outflow", is_previous).label("prev_outflow"),
+            )
+            .where(
+                DailyCashflow.business_id == business_id,
+                DailyCashflow.date >= prev_start,
+                DailyCashflow.date <= end,
+            )
+            .subquery()
+        )
+
+        ranked_risk = (
+            db.select(
+                RiskScore.id.label("risk_score_id"),
+                RiskScore.liquidity_score,
+                RiskScore.cashflow_risk_score,
+                RiskScore.volatility_index,
+                RiskScore.details,
+                func.row_number()
+                .over(order_by=(RiskScore.assessed_at.desc(), RiskScore.id.desc()))
+                .label("risk_rank"),
+            )
+            .where(RiskScore.business_id == business_id)
+            .subquery()
+        )
+        latest_risk = (
+            db.select(ranked_risk).where(ranked_risk.c.risk_rank == 1).subquery()
+        )
+
+        row = db.session.execute(
+            db.select(totals, latest_risk).select_from(
+                totals.outerjoin(latest_risk, true())
+            )
+        ).one()
+
+        totals = {
+            key: Decimal(str(getattr(row, key)))
+            for key in ("current_inflow", "current_outflow", "prev_inflow", "prev_outflow")
+        }
+
+        return totals, row if row.risk_score_id is not None else None
+
     @staticmethod
     def get_metrics():
         from flask import request
@@ -36,39 +110,18 @@ class DashboardController:
 
         print(f"DEBUG: Date Range: {start_date.date()} to {end_date.date()}")
 
-        current_period_transactions = Transaction.query.filter(
-            Transaction.business_id == business_id,
-            Transaction.date >= start_date.date(),
-            Transaction.date <= end_date.date(),  # Changed from < to <= just in case
-        ).all()
-
-        print(
-            f"DEBUG: Found {len(current_period_transactions)} transactions in period."
-        )
-
         prev_start_date = start_date - timedelta(days=30)
-        prev_end_date = start_date
-
-        prev_period_transactions = Transaction.query.filter(
-            Transaction.business_id == business_id,
-            Transaction.date >= prev_start_date.date(),
-            Transaction.date < prev_end_date.date(),
-        ).all()
 
-        current_inflow = sum(
-            t.amount for t in current_period_transactions if t.direction == "inflow"
-        )
-        current_outflow = sum(
-            t.amount for t in current_period_transactions if t.direction == "outflow"
+        totals, latest_risk_score = DashboardController._fetch_period_metrics(
+            business_id, prev_start_date.date(), start_date.date(), end_date.date()
         )
+
+        current_inflow = totals["current_inflow"]
+        current_outflow = totals["current_outflow"]
         net_cashflow = float(current_inflow - current_outflow)
 
-        prev_inflow = sum(
-            t.amount for t in prev_period_transactions if t.direction == "inflow"
-        )
-        prev_outflow = sum(
-            t.amount for t in prev_period_transactions if t.direction == "outflow"
-        )
+        prev_inflow = totals["prev_inflow"]
+        prev_outflow = totals["prev_outflow"]
         prev_net_cashflow = float(prev_inflow - prev_outflow)
 
         net_cashflow_percentage_change = 0.0
@@ -121,11 +174,6 @@ class DashboardController:
         cashflow_volatility_percentage_change = 0.0
 
         # --- Projected Risk ---
-        latest_risk_score = (
-            RiskScore.query.filter_by(business_id=business_id)
-            .order_by(RiskScore.assessed_at.desc())
-            .first()
-        )
         projected_risk = (
             latest_risk_score.details.get("overall_risk", "Unknown")
             if latest_risk_score and latest_risk_score.details
@@ -1,8 +1,57 @@
 from flask import request, jsonify
-from models import db, Forecast, Business, Model, ModelRun, Transaction
+from models import db, Forecast, Business, Model, ModelRun
 from datetime import datetime, date
 from decimal import Decimal
 from services.ai_service import AIService
+from services.forecasting import ForecastEngine
+from services.forecasting.engine import validate_period
+from utils.streaming import requested_stream_format, stream_query
+from repositories.forecast_repository import ForecastRepository
+from repositories.transaction_repository import TransactionRepository
+from utils.serializer import serializer_for
+
+forecast_serializer = serializer_for(Forecast)
+
+
+def _forecast_listing(query):
+    query = ForecastRepository().read_only(query)
+
+    try:
+        stream = requested_stream_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        return stream_query(query.order_by(Forecast.id), forecast_serializer.one, stream)
+
+    return jsonify(forecast_serializer.many(query))
+
+
+def _analysis_transactions(business_id, period_start, period_end):
+    """Transactions in the period as AI input, with category names joined in"""
+    return [
+        {
+            "date": row.date.isoformat(),
+            "amount": float(row.amount),
+            "direction": row.direction,
+            "description": row.description,
+            "category": row.category,
+        }
+        for row in TransactionRepository().findForAnalysis(
+            business_id, period_start, period_end
+        )
+    ]
+
+
+def _parse_date(value, field):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            raise ValueError(f"Invalid {field}: {value}")
+    if not isinstance(value, date):
+        raise ValueError(f"Invalid {field}: {value}")
+    return value
 
 
 class ForecastController:
@@ -22,6 +71,7 @@ class ForecastController:
         if not business:
             return jsonify({"error": "Business not found"}), 404
 
+        model = None
         if "model_id" in data and data["model_id"]:
             model = Model.query.get(data["model_id"])
             if not model:
@@ -32,23 +82,35 @@ class ForecastController:
             if not model_run:
                 return jsonify({"error": "Model run not found"}), 404
 
-        period_start = data["period_start"]
-        if isinstance(period_start, str):
-            period_start = datetime.fromisoformat(period_start).date()
-
-        period_end = data["period_end"]
-        if isinstance(period_end, str):
-            period_end = datetime.fromisoformat(period_end).date()
+        try:
+            period_start = _parse_date(data["period_start"], "period_start")
+            period_end = _parse_date(data["period_end"], "period_end")
+            validate_period(period_start, period_end, data["granularity"])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
         # Initialize metadata if not present
         metadata = data.get("forecast_metadata") or {}
 
+        # Compute the forecast server-side unless the client supplied one
+        if data.get("predicted_value") is None:
+            try:
+                summary, engine_run = ForecastEngine().forecast_business(
+                    business, period_start, period_end, data["granularity"], model
+                )
+                data["predicted_value"] = summary["predicted_value"]
+                data["lower_bound"] = summary["lower_bound"]
+                data["upper_bound"] = summary["upper_bound"]
+                data["model_id"] = engine_run.model_id
+                data["model_run_id"] = engine_run.id
+                metadata["engine"] = summary
+            except Exception as e:
+                print(f"Forecast Engine Error: {e}")
+                db.session.rollback()
+                metadata["engine_error"] = str(e)
+
         # Get transactions within the forecast period
-        transactions = Transaction.query.filter(
-            Transaction.business_id == data["business_id"],
-            Transaction.date >= period_start,
-            Transaction.date <= period_end,
-        ).all()
+        transactions = _analysis_transactions(data["business_id"], period_start, period_end)
 
         # Generate AI Insight
         try:
@@ -61,18 +123,7 @@ class ForecastController:
                 "predicted_value": data.get("predicted_value"),
                 "lower_bound": data.get("lower_bound"),
                 "upper_bound": data.get("upper_bound"),
-                "transactions": [
-                    {
-                        "date": transaction.date.isoformat(),
-                        "amount": float(transaction.amount),
-                        "direction": transaction.direction,
-                        "description": transaction.description,
-                        "category": transaction.category.name
-                        if transaction.category
-                        else None,
-                    }
-                    for transaction in transactions
-                ],
+                "transactions": transactions,
             }
 
             insight = ai_service.generate_forecast_insight(analysis_input)
@@ -105,69 +156,11 @@ class ForecastController:
         db.session.add(forecast)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": forecast.id,
-                "business_id": forecast.business_id,
-                "model_run_id": forecast.model_run_id,
-                "model_id": forecast.model_id,
-                "created_at": forecast.created_at.isoformat()
-                if forecast.created_at
-                else None,
-                "granularity": forecast.granularity,
-                "period_start": forecast.period_start.isoformat()
-                if forecast.period_start
-                else None,
-                "period_end": forecast.period_end.isoformat()
-                if forecast.period_end
-                else None,
-                "predicted_value": float(forecast.predicted_value)
-                if forecast.predicted_value
-                else None,
-                "lower_bound": float(forecast.lower_bound)
-                if forecast.lower_bound
-                else None,
-                "upper_bound": float(forecast.upper_bound)
-                if forecast.upper_bound
-                else None,
-                "forecast_metadata": forecast.forecast_metadata,
-            }
-        ), 201
+        return jsonify(forecast_serializer.one(forecast)), 201
 
     @staticmethod
     def get_forecasts():
-        forecasts = Forecast.query.all()
-        return jsonify(
-            [
-                {
-                    "id": forecast.id,
-                    "business_id": forecast.business_id,
-                    "model_run_id": forecast.model_run_id,
-                    "model_id": forecast.model_id,
-                    "created_at": forecast.created_at.isoformat()
-                    if forecast.created_at
-                    else None,
-                    "granularity": forecast.granularity,
-                    "period_start": forecast.period_start.isoformat()
-                    if forecast.period_start
-                    else None,
-                    "period_end": forecast.period_end.isoformat()
-                    if forecast.period_end
-                    else None,
-                    "predicted_value": float(forecast.predicted_value)
-                    if forecast.predicted_value
-                    else None,
-                    "lower_bound": float(forecast.lower_bound)
-                    if forecast.lower_bound
-                    else None,
-                    "upper_bound": float(forecast.upper_bound)
-                    if forecast.upper_bound
-                    else None,
-                    "forecast_metadata": forecast.forecast_metadata,
-                }
-                for forecast in forecasts
-            ]
-        )
+        return _forecast_listing(Forecast.query)
 
     @staticmethod
     def get_forecast(forecast_id):
@@ -175,34 +168,7 @@ class ForecastController:
         if not forecast:
             return jsonify({"error": "Forecast not found"}), 404
 
-        return jsonify(
-            {
-                "id": forecast.id,
-                "business_id": forecast.business_id,
-                "model_run_id": forecast.model_run_id,
-                "model_id": forecast.model_id,
-                "created_at": forecast.created_at.isoformat()
-                if forecast.created_at
-                else None,
-                "granularity": forecast.granularity,
-                "period_start": forecast.period_start.isoformat()
-                if forecast.period_start
-                else None,
-                "period_end": forecast.period_end.isoformat()
-                if forecast.period_end
-                else None,
-                "predicted_value": float(forecast.predicted_value)
-                if forecast.predicted_value
-                else None,
-                "lower_bound": float(forecast.lower_bound)
-                if forecast.lower_bound
-                else None,
-                "upper_bound": float(forecast.upper_bound)
-                if forecast.upper_bound
-                else None,
-                "forecast_metadata": forecast.forecast_metadata,
-            }
-        )
+        return jsonify(forecast_serializer.one(forecast))
 
     @staticmethod
     def update_forecast(forecast_id):
@@ -232,19 +198,16 @@ class ForecastController:
                     return jsonify({"error": "Model not found"}), 404
             forecast.model_id = data["model_id"]
 
-        if "granularity" in data:
-            forecast.granularity = data["granularity"]
-
-        if "period_start" in data:
-            period_start = data["period_start"]
-            if isinstance(period_start, str):
-                period_start = datetime.fromisoformat(period_start).date()
+        if {"granularity", "period_start", "period_end"} & data.keys():
+            try:
+                period_start = _parse_date(data.get("period_start", forecast.period_start), "period_start")
+                period_end = _parse_date(data.get("period_end", forecast.period_end), "period_end")
+                granularity = data.get("granularity", forecast.granularity)
+                validate_period(period_start, period_end, granularity)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            forecast.granularity = granularity
             forecast.period_start = period_start
-
-        if "period_end" in data:
-            period_end = data["period_end"]
-            if isinstance(period_end, str):
-                period_end = datetime.fromisoformat(period_end).date()
             forecast.period_end = period_end
 
         if "predicted_value" in data:
@@ -269,34 +232,7 @@ class ForecastController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": forecast.id,
-                "business_id": forecast.business_id,
-                "model_run_id": forecast.model_run_id,
-                "model_id": forecast.model_id,
-                "created_at": forecast.created_at.isoformat()
-                if forecast.created_at
-                else None,
-                "granularity": forecast.granularity,
-                "period_start": forecast.period_start.isoformat()
-                if forecast.period_start
-                else None,
-                "period_end": forecast.period_end.isoformat()
-                if forecast.period_end
-                else None,
-                "predicted_value": float(forecast.predicted_value)
-                if forecast.predicted_value
-                else None,
-                "lower_bound": float(forecast.lower_bound)
-                if forecast.lower_bound
-                else None,
-                "upper_bound": float(forecast.upper_bound)
-                if forecast.upper_bound
-                else None,
-                "forecast_metadata": forecast.forecast_metadata,
-            }
-        )
+        return jsonify(forecast_serializer.one(forecast))
 
     @staticmethod
     def delete_forecast(forecast_id):
@@ -316,11 +252,9 @@ class ForecastController:
             return jsonify({"error": "Forecast not found"}), 404
 
         # Get transactions within the forecast period
-        transactions = Transaction.query.filter(
-            Transaction.business_id == forecast.business_id,
-            Transaction.date >= forecast.period_start,
-            Transaction.date <= forecast.period_end,
-        ).all()
+        transactions = _analysis_transactions(
+            forecast.business_id, forecast.period_start, forecast.period_end
+        )
 
         # Generate new AI Insight
         try:
@@ -333,18 +267,7 @@ class ForecastController:
                 "predicted_value": forecast.predicted_value,
                 "lower_bound": forecast.lower_bound,
                 "upper_bound": forecast.upper_bound,
-                "transactions": [
-                    {
-                        "date": transaction.date.isoformat(),
-                        "amount": float(transaction.amount),
-                        "direction": transaction.direction,
-                        "description": transaction.description,
-                        "category": transaction.category.name
-                        if transaction.category
-                        else None,
-                    }
-                    for transaction in transactions
-                ],
+                "transactions": transactions,
             }
 
             insight = ai_service.generate_forecast_insight(analysis_input)
@@ -371,38 +294,7 @@ class ForecastController:
         if not business:
             return jsonify({"error": "Business not found"}), 404
 
-        forecasts = Forecast.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": forecast.id,
-                    "business_id": forecast.business_id,
-                    "model_run_id": forecast.model_run_id,
-                    "model_id": forecast.model_id,
-                    "created_at": forecast.created_at.isoformat()
-                    if forecast.created_at
-                    else None,
-                    "granularity": forecast.granularity,
-                    "period_start": forecast.period_start.isoformat()
-                    if forecast.period_start
-                    else None,
-                    "period_end": forecast.period_end.isoformat()
-                    if forecast.period_end
-                    else None,
-                    "predicted_value": float(forecast.predicted_value)
-                    if forecast.predicted_value
-                    else None,
-                    "lower_bound": float(forecast.lower_bound)
-                    if forecast.lower_bound
-                    else None,
-                    "upper_bound": float(forecast.upper_bound)
-                    if forecast.upper_bound
-                    else None,
-                    "forecast_metadata": forecast.forecast_metadata,
-                }
-                for forecast in forecasts
-            ]
-        )
+        return _forecast_listing(Forecast.query.filter_by(business_id=business_id))
 
     @staticmethod
     def get_forecasts_by_model(model_id):
@@ -410,35 +302,4 @@ class ForecastController:
         if not model:
             return jsonify({"error": "Model not found"}), 404
 
-        forecasts = Forecast.query.filter_by(model_id=model_id).all()
-        return jsonify(
-            [
-                {
-                    "id": forecast.id,
-                    "business_id": forecast.business_id,
-                    "model_run_id": forecast.model_run_id,
-                    "model_id": forecast.model_id,
-                    "created_at": forecast.created_at.isoformat()
-                    if forecast.created_at
-                    else None,
-                    "granularity": forecast.granularity,
-                    "period_start": forecast.period_start.isoformat()
-                    if forecast.period_start
-                    else None,
-                    "period_end": forecast.period_end.isoformat()
-                    if forecast.period_end
-                    else None,
-                    "predicted_value": float(forecast.predicted_value)
-                    if forecast.predicted_value
-                    else None,
-                    "lower_bound": float(forecast.lower_bound)
-                    if forecast.lower_bound
-                    else None,
-                    "upper_bound": float(forecast.upper_bound)
-                    if forecast.upper_bound
-                    else None,
-                    "forecast_metadata": forecast.forecast_metadata,
-                }
-                for forecast in forecasts
-            ]
-        )
+        return _forecast_listing(Forecast.query.filter_by(model_id=model_id))
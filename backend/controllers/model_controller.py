@@ -1,6 +1,9 @@
 from flask import request, jsonify
 from models import db, Model, Business
 from datetime import datetime
+from utils.serializer import serializer_for
+
+model_serializer = serializer_for(Model)
 
 
 class ModelController:
@@ -30,45 +33,12 @@ class ModelController:
         db.session.add(model)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": model.id,
-                "business_id": model.business_id,
-                "name": model.name,
-                "model_type": model.model_type,
-                "params": model.params,
-                "version": model.version,
-                "last_trained_at": model.last_trained_at.isoformat()
-                if model.last_trained_at
-                else None,
-                "created_at": model.created_at.isoformat()
-                if model.created_at
-                else None,
-            }
-        ), 201
+        return jsonify(model_serializer.one(model)), 201
 
     @staticmethod
     def get_models():
         models = Model.query.all()
-        return jsonify(
-            [
-                {
-                    "id": model.id,
-                    "business_id": model.business_id,
-                    "name": model.name,
-                    "model_type": model.model_type,
-                    "params": model.params,
-                    "version": model.version,
-                    "last_trained_at": model.last_trained_at.isoformat()
-                    if model.last_trained_at
-                    else None,
-                    "created_at": model.created_at.isoformat()
-                    if model.created_at
-                    else None,
-                }
-                for model in models
-            ]
-        )
+        return jsonify(model_serializer.many(models))
 
     @staticmethod
     def get_model(model_id):
@@ -76,22 +46,7 @@ class ModelController:
         if not model:
             return jsonify({"error": "Model not found"}), 404
 
-        return jsonify(
-            {
-                "id": model.id,
-                "business_id": model.business_id,
-                "name": model.name,
-                "model_type": model.model_type,
-                "params": model.params,
-                "version": model.version,
-                "last_trained_at": model.last_trained_at.isoformat()
-                if model.last_trained_at
-                else None,
-                "created_at": model.created_at.isoformat()
-                if model.created_at
-                else None,
-            }
-        )
+        return jsonify(model_serializer.one(model))
 
     @staticmethod
     def update_model(model_id):
@@ -129,22 +84,7 @@ class ModelController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": model.id,
-                "business_id": model.business_id,
-                "name": model.name,
-                "model_type": model.model_type,
-                "params": model.params,
-                "version": model.version,
-                "last_trained_at": model.last_trained_at.isoformat()
-                if model.last_trained_at
-                else None,
-                "created_at": model.created_at.isoformat()
-                if model.created_at
-                else None,
-            }
-        )
+        return jsonify(model_serializer.one(model))
 
     @staticmethod
     def delete_model(model_id):
@@ -164,45 +104,9 @@ class ModelController:
             return jsonify({"error": "Business not found"}), 404
 
         models = Model.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": model.id,
-                    "business_id": model.business_id,
-                    "name": model.name,
-                    "model_type": model.model_type,
-                    "params": model.params,
-                    "version": model.version,
-                    "last_trained_at": model.last_trained_at.isoformat()
-                    if model.last_trained_at
-                    else None,
-                    "created_at": model.created_at.isoformat()
-                    if model.created_at
-                    else None,
-                }
-                for model in models
-            ]
-        )
+        return jsonify(model_serializer.many(models))
 
     @staticmethod
     def get_models_by_type(model_type):
         models = Model.query.filter_by(model_type=model_type).all()
-        return jsonify(
-            [
-                {
-                    "id": model.id,
-                    "business_id": model.business_id,
-                    "name": model.name,
-                    "model_type": model.model_type,
-                    "params": model.params,
-                    "version": model.version,
-                    "last_trained_at": model.last_trained_at.isoformat()
-                    if model.last_trained_at
-                    else None,
-                    "created_at": model.created_at.isoformat()
-                    if model.created_at
-                    else None,
-                }
-                for model in models
-            ]
-        )
+        return jsonify(model_serializer.many(models))
@@ -1,5 +1,8 @@
 from flask import request, jsonify
 from models import db, ModelRun, Model
+from utils.serializer import serializer_for
+
+model_run_serializer = serializer_for(ModelRun)
 
 
 class ModelRunController:
@@ -25,35 +28,12 @@ class ModelRunController:
         db.session.add(model_run)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": model_run.id,
-                "model_id": model_run.model_id,
-                "run_at": model_run.run_at.isoformat() if model_run.run_at else None,
-                "input_summary": model_run.input_summary,
-                "output_summary": model_run.output_summary,
-                "run_status": model_run.run_status,
-                "notes": model_run.notes,
-            }
-        ), 201
+        return jsonify(model_run_serializer.one(model_run)), 201
 
     @staticmethod
     def get_model_runs():
         model_runs = ModelRun.query.all()
-        return jsonify(
-            [
-                {
-                    "id": run.id,
-                    "model_id": run.model_id,
-                    "run_at": run.run_at.isoformat() if run.run_at else None,
-                    "input_summary": run.input_summary,
-                    "output_summary": run.output_summary,
-                    "run_status": run.run_status,
-                    "notes": run.notes,
-                }
-                for run in model_runs
-            ]
-        )
+        return jsonify(model_run_serializer.many(model_runs))
 
     @staticmethod
     def get_model_run(run_id):
@@ -61,17 +41,7 @@ class ModelRunController:
         if not model_run:
             return jsonify({"error": "Model run not found"}), 404
 
-        return jsonify(
-            {
-                "id": model_run.id,
-                "model_id": model_run.model_id,
-                "run_at": model_run.run_at.isoformat() if model_run.run_at else None,
-                "input_summary": model_run.input_summary,
-                "output_summary": model_run.output_summary,
-                "run_status": model_run.run_status,
-                "notes": model_run.notes,
-            }
-        )
+        return jsonify(model_run_serializer.one(model_run))
 
     @staticmethod
     def update_model_run(run_id):
@@ -101,17 +71,7 @@ class ModelRunController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": model_run.id,
-                "model_id": model_run.model_id,
-                "run_at": model_run.run_at.isoformat() if model_run.run_at else None,
-                "input_summary": model_run.input_summary,
-                "output_summary": model_run.output_summary,
-                "run_status": model_run.run_status,
-                "notes": model_run.notes,
-            }
-        )
+        return jsonify(model_run_serializer.one(model_run))
 
     @staticmethod
     def delete_model_run(run_id):
@@ -131,35 +91,9 @@ class ModelRunController:
             return jsonify({"error": "Model not found"}), 404
 
         model_runs = ModelRun.query.filter_by(model_id=model_id).all()
-        return jsonify(
-            [
-                {
-                    "id": run.id,
-                    "model_id": run.model_id,
-                    "run_at": run.run_at.isoformat() if run.run_at else None,
-                    "input_summary": run.input_summary,
-                    "output_summary": run.output_summary,
-                    "run_status": run.run_status,
-                    "notes": run.notes,
-                }
-                for run in model_runs
-            ]
-        )
+        return jsonify(model_run_serializer.many(model_runs))
 
     @staticmethod
     def get_model_runs_by_status(run_status):
         model_runs = ModelRun.query.filter_by(run_status=run_status).all()
-        return jsonify(
-            [
-                {
-                    "id": run.id,
-                    "model_id": run.model_id,
-                    "run_at": run.run_at.isoformat() if run.run_at else None,
-                    "input_summary": run.input_summary,
-                    "output_summary": run.output_summary,
-                    "run_status": run.run_status,
-                    "notes": run.notes,
-                }
-                for run in model_runs
-            ]
-        )
+        return jsonify(model_run_serializer.many(model_runs))
@@ -1,6 +1,9 @@
 from flask import request, jsonify
 from models import db, OCRDocument, Business, User
 from decimal import Decimal
+from utils.serializer import serializer_for
+
+ocr_document_serializer = serializer_for(OCRDocument)
 
 
 class OCRDocumentController:
@@ -34,43 +37,12 @@ class OCRDocumentController:
         db.session.add(ocr_document)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": ocr_document.id,
-                "business_id": ocr_document.business_id,
-                "uploaded_by": ocr_document.uploaded_by,
-                "uploaded_at": ocr_document.uploaded_at.isoformat()
-                if ocr_document.uploaded_at
-                else None,
-                "raw_text": ocr_document.raw_text,
-                "parsed": ocr_document.parsed,
-                "confidence": float(ocr_document.confidence)
-                if ocr_document.confidence
-                else None,
-                "source_image_url": ocr_document.source_image_url,
-            }
-        ), 201
+        return jsonify(ocr_document_serializer.one(ocr_document)), 201
 
     @staticmethod
     def get_ocr_documents():
         ocr_documents = OCRDocument.query.all()
-        return jsonify(
-            [
-                {
-                    "id": doc.id,
-                    "business_id": doc.business_id,
-                    "uploaded_by": doc.uploaded_by,
-                    "uploaded_at": doc.uploaded_at.isoformat()
-                    if doc.uploaded_at
-                    else None,
-                    "raw_text": doc.raw_text,
-                    "parsed": doc.parsed,
-                    "confidence": float(doc.confidence) if doc.confidence else None,
-                    "source_image_url": doc.source_image_url,
-                }
-                for doc in ocr_documents
-            ]
-        )
+        return jsonify(ocr_document_serializer.many(ocr_documents))
 
     @staticmethod
     def get_ocr_document(document_id):
@@ -78,22 +50,7 @@ class OCRDocumentController:
         if not ocr_document:
             return jsonify({"error": "OCR document not found"}), 404
 
-        return jsonify(
-            {
-                "id": ocr_document.id,
-                "business_id": ocr_document.business_id,
-                "uploaded_by": ocr_document.uploaded_by,
-                "uploaded_at": ocr_document.uploaded_at.isoformat()
-                if ocr_document.uploaded_at
-                else None,
-                "raw_text": ocr_document.raw_text,
-                "parsed": ocr_document.parsed,
-                "confidence": float(ocr_document.confidence)
-                if ocr_document.confidence
-                else None,
-                "source_image_url": ocr_document.source_image_url,
-            }
-        )
+        return jsonify(ocr_document_serializer.one(ocr_document))
 
     @staticmethod
     def update_ocr_document(document_id):
@@ -132,22 +89,7 @@ class OCRDocumentController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": ocr_document.id,
-                "business_id": ocr_document.business_id,
-                "uploaded_by": ocr_document.uploaded_by,
-                "uploaded_at": ocr_document.uploaded_at.isoformat()
-                if ocr_document.uploaded_at
-                else None,
-                "raw_text": ocr_document.raw_text,
-                "parsed": ocr_document.parsed,
-                "confidence": float(ocr_document.confidence)
-                if ocr_document.confidence
-                else None,
-                "source_image_url": ocr_document.source_image_url,
-            }
-        )
+        return jsonify(ocr_document_serializer.one(ocr_document))
 
     @staticmethod
     def delete_ocr_document(document_id):
@@ -167,23 +109,7 @@ class OCRDocumentController:
             return jsonify({"error": "Business not found"}), 404
 
         ocr_documents = OCRDocument.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": doc.id,
-                    "business_id": doc.business_id,
-                    "uploaded_by": doc.uploaded_by,
-                    "uploaded_at": doc.uploaded_at.isoformat()
-                    if doc.uploaded_at
-                    else None,
-                    "raw_text": doc.raw_text,
-                    "parsed": doc.parsed,
-                    "confidence": float(doc.confidence) if doc.confidence else None,
-                    "source_image_url": doc.source_image_url,
-                }
-                for doc in ocr_documents
-            ]
-        )
+        return jsonify(ocr_document_serializer.many(ocr_documents))
 
     @staticmethod
     def get_ocr_documents_by_user(user_id):
@@ -192,20 +118,4 @@ class OCRDocumentController:
             return jsonify({"error": "User not found"}), 404
 
         ocr_documents = OCRDocument.query.filter_by(uploaded_by=user_id).all()
-        return jsonify(
-            [
-                {
-                    "id": doc.id,
-                    "business_id": doc.business_id,
-                    "uploaded_by": doc.uploaded_by,
-                    "uploaded_at": doc.uploaded_at.isoformat()
-                    if doc.uploaded_at
-                    else None,
-                    "raw_text": doc.raw_text,
-                    "parsed": doc.parsed,
-                    "confidence": float(doc.confidence) if doc.confidence else None,
-                    "source_image_url": doc.source_image_url,
-                }
-                for doc in ocr_documents
-            ]
-        )
+        return jsonify(ocr_document_serializer.many(ocr_documents))
@@ -1,6 +1,67 @@
-from flask import request, jsonify
+import os
+
+from flask import request, jsonify, g
 from models import db, RiskScore, Business, Forecast
 from decimal import Decimal
+from utils.streaming import requested_stream_format, stream_query
+from repositories.risk_score_repository import RiskScoreRepository
+from services.risk import RiskEngine
+from services.risk.engine import MAX_HORIZON_DAYS
+from utils.serializer import serializer_for
+
+risk_score_serializer = serializer_for(RiskScore)
+
+
+def _risk_score_listing(query):
+    query = RiskScoreRepository().read_only(query)
+
+    try:
+        stream = requested_stream_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        return stream_query(query.order_by(RiskScore.id), risk_score_serializer.one, stream)
+
+    return jsonify(risk_score_serializer.many(query))
+
+
+SCORE_FIELDS = ("liquidity_score", "cashflow_risk_score", "volatility_index", "drawdown_prob")
+
+# Simulation memory grows with paths x horizon, so cap what a request may ask for
+MAX_PATHS = int(os.getenv("RISK_MAX_PATHS", "50000"))
+
+
+def _bounded_option(options, key, maximum):
+    value = options.get(key)
+    if value is None:
+        return None
+
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= maximum:
+        raise ValueError(f"{key} must be an integer between 1 and {maximum}")
+    return value
+
+
+def _assess(business, forecast, options):
+    try:
+        paths = _bounded_option(options, "paths", MAX_PATHS)
+        horizon_days = _bounded_option(options, "horizon_days", MAX_HORIZON_DAYS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        risk_score = RiskEngine(paths=paths).assess_business(
+            business,
+            forecast,
+            horizon_days=horizon_days,
+            seed=options.get("seed"),
+        )
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+
+    db.session.commit()
+    return jsonify(risk_score_serializer.one(risk_score)), 201
 
 
 class RiskScoreController:
@@ -15,11 +76,16 @@ class RiskScoreController:
         if not business:
             return jsonify({"error": "Business not found"}), 404
 
+        forecast = None
         if "source_forecast_id" in data and data["source_forecast_id"]:
             forecast = Forecast.query.get(data["source_forecast_id"])
             if not forecast:
                 return jsonify({"error": "Forecast not found"}), 404
 
+        # Simulate the scores unless the client supplied them
+        if not any(data.get(field) is not None for field in SCORE_FIELDS):
+            return _assess(business, forecast, data)
+
         risk_score = RiskScore(
             business_id=data["business_id"],
             liquidity_score=Decimal(str(data["liquidity_score"]))
@@ -41,59 +107,23 @@ class RiskScoreController:
         db.session.add(risk_score)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": risk_score.id,
-                "business_id": risk_score.business_id,
-                "assessed_at": risk_score.assessed_at.isoformat()
-                if risk_score.assessed_at
-                else None,
-                "liquidity_score": float(risk_score.liquidity_score)
-                if risk_score.liquidity_score
-                else None,
-                "cashflow_risk_score": float(risk_score.cashflow_risk_score)
-                if risk_score.cashflow_risk_score
-                else None,
-                "volatility_index": float(risk_score.volatility_index)
-                if risk_score.volatility_index
-                else None,
-                "drawdown_prob": float(risk_score.drawdown_prob)
-                if risk_score.drawdown_prob
-                else None,
-                "source_forecast_id": risk_score.source_forecast_id,
-                "details": risk_score.details,
-            }
-        ), 201
+        return jsonify(risk_score_serializer.one(risk_score)), 201
+
+    @staticmethod
+    def assess_forecast(forecast_id):
+        forecast = Forecast.query.get(forecast_id)
+        if not forecast:
+            return jsonify({"error": "Forecast not found"}), 404
+
+        if g.current_user.role != "admin" and forecast.business_id not in g.current_user.business_ids:
+            return jsonify({"error": "Access denied. You can only assess your own businesses."}), 403
+
+        return _assess(forecast.business, forecast, request.get_json(silent=True) or {})
 
     @staticmethod
     def get_risk_scores():
-        risk_scores = RiskScore.query.all()
-        return jsonify(
-            [
-                {
-                    "id": score.id,
-                    "business_id": score.business_id,
-                    "assessed_at": score.assessed_at.isoformat()
-                    if score.assessed_at
-                    else None,
-                    "liquidity_score": float(score.liquidity_score)
-                    if score.liquidity_score
-                    else None,
-                    "cashflow_risk_score": float(score.cashflow_risk_score)
-                    if score.cashflow_risk_score
-                    else None,
-                    "volatility_index": float(score.volatility_index)
-                    if score.volatility_index
-                    else None,
-                    "drawdown_prob": float(score.drawdown_prob)
-                    if score.drawdown_prob
-                    else None,
-                    "source_forecast_id": score.source_forecast_id,
-                    "details": score.details,
-                }
-                for score in risk_scores
-            ]
-        )
+        query = RiskScore.query
+        return _risk_score_listing(query)
 
     @staticmethod
     def get_risk_score(risk_score_id):
@@ -101,29 +131,7 @@ class RiskScoreController:
         if not risk_score:
             return jsonify({"error": "Risk score not found"}), 404
 
-        return jsonify(
-            {
-                "id": risk_score.id,
-                "business_id": risk_score.business_id,
-                "assessed_at": risk_score.assessed_at.isoformat()
-                if risk_score.assessed_at
-                else None,
-                "liquidity_score": float(risk_score.liquidity_score)
-                if risk_score.liquidity_score
-                else None,
-                "cashflow_risk_score": float(risk_score.cashflow_risk_score)
-                if risk_score.cashflow_risk_score
-                else None,
-                "volatility_index": float(risk_score.volatility_index)
-                if risk_score.volatility_index
-                else None,
-                "drawdown_prob": float(risk_score.drawdown_prob)
-                if risk_score.drawdown_prob
-                else None,
-                "source_forecast_id": risk_score.source_forecast_id,
-                "details": risk_score.details,
-            }
-        )
+        return jsonify(risk_score_serializer.one(risk_score))
 
     @staticmethod
     def update_risk_score(risk_score_id):
@@ -177,29 +185,7 @@ class RiskScoreController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": risk_score.id,
-                "business_id": risk_score.business_id,
-                "assessed_at": risk_score.assessed_at.isoformat()
-                if risk_score.assessed_at
-                else None,
-                "liquidity_score": float(risk_score.liquidity_score)
-                if risk_score.liquidity_score
-                else None,
-                "cashflow_risk_score": float(risk_score.cashflow_risk_score)
-                if risk_score.cashflow_risk_score
-                else None,
-                "volatility_index": float(risk_score.volatility_index)
-                if risk_score.volatility_index
-                else None,
-                "drawdown_prob": float(risk_score.drawdown_prob)
-                if risk_score.drawdown_prob
-                else None,
-                "source_forecast_id": risk_score.source_forecast_id,
-                "details": risk_score.details,
-            }
-        )
+        return jsonify(risk_score_serializer.one(risk_score))
 
     @staticmethod
     def delete_risk_score(risk_score_id):
@@ -218,33 +204,8 @@ class RiskScoreController:
         if not business:
             return jsonify({"error": "Business not found"}), 404
 
-        risk_scores = RiskScore.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": score.id,
-                    "business_id": score.business_id,
-                    "assessed_at": score.assessed_at.isoformat()
-                    if score.assessed_at
-                    else None,
-                    "liquidity_score": float(score.liquidity_score)
-                    if score.liquidity_score
-                    else None,
-                    "cashflow_risk_score": float(score.cashflow_risk_score)
-                    if score.cashflow_risk_score
-                    else None,
-                    "volatility_index": float(score.volatility_index)
-                    if score.volatility_index
-                    else None,
-                    "drawdown_prob": float(score.drawdown_prob)
-                    if score.drawdown_prob
-                    else None,
-                    "source_forecast_id": score.source_forecast_id,
-                    "details": score.details,
-                }
-                for score in risk_scores
-            ]
-        )
+        query = RiskScore.query.filter_by(business_id=business_id)
+        return _risk_score_listing(query)
 
     @staticmethod
     def get_risk_scores_by_forecast(forecast_id):
@@ -252,30 +213,5 @@ class RiskScoreController:
         if not forecast:
             return jsonify({"error": "Forecast not found"}), 404
 
-        risk_scores = RiskScore.query.filter_by(source_forecast_id=forecast_id).all()
-        return jsonify(
-            [
-                {
-                    "id": score.id,
-                    "business_id": score.business_id,
-                    "assessed_at": score.assessed_at.isoformat()
-                    if score.assessed_at
-                    else None,
-                    "liquidity_score": float(score.liquidity_score)
-                    if score.liquidity_score
-                    else None,
-                    "cashflow_risk_score": float(score.cashflow_risk_score)
-                    if score.cashflow_risk_score
-                    else None,
-                    "volatility_index": float(score.volatility_index)
-                    if score.volatility_index
-                    else None,
-                    "drawdown_prob": float(score.drawdown_prob)
-                    if score.drawdown_prob
-                    else None,
-                    "source_forecast_id": score.source_forecast_id,
-                    "details": score.details,
-                }
-                for score in risk_scores
-            ]
-        )
+        query = RiskScore.query.filter_by(source_forecast_id=forecast_id)
+        return _risk_score_listing(query)
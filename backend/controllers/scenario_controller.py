@@ -1,5 +1,55 @@
-from flask import request, jsonify
+import os
+
+from flask import Response, request, jsonify, g, stream_with_context
 from models import db, Scenario, Business, User
+from services.scenarios import ScenarioEngine, grid_size, iter_grid
+from services.scenarios.sweep import sweep_pool
+from utils.serializer import dumps, serializer_for
+
+scenario_serializer = serializer_for(Scenario)
+
+# Upper bound on parameter sets evaluated by one batch request
+MAX_BATCH = int(os.getenv("SCENARIO_MAX_BATCH", "1000"))
+# Upper bound on grid combinations in one sweep
+MAX_SWEEP = int(os.getenv("SCENARIO_SWEEP_MAX", "100000"))
+
+
+def _can_access(business_id):
+    user = g.current_user
+    return user.role == "admin" or business_id in user.business_ids
+
+
+def _expand_batch(data):
+    """
+    (name, params) pairs for a batch request: each entry of "scenarios",
+    then every combination of the value lists in "grid". Shared "params"
+    are the base both are merged over.
+    """
+    base = data.get("params") or {}
+    items = data.get("scenarios") or []
+    if not isinstance(items, list):
+        raise ValueError("scenarios must be a list")
+
+    grid = _grid(data)
+    if len(items) + grid_size(grid) > MAX_BATCH:
+        raise ValueError(f"A batch can evaluate at most {MAX_BATCH} scenarios")
+
+    entries = [(item.get("name"), {**base, **(item.get("params") or {})}) for item in items]
+
+    prefix = data.get("name") or "Scenario"
+    for params in iter_grid(grid, base):
+        label = ", ".join(f"{name}={params[name]}" for name in sorted(grid))
+        entries.append((f"{prefix} ({label})", params))
+    return entries
+
+
+def _grid(data):
+    grid = data.get("grid") or {}
+    if not isinstance(grid, dict) or any(
+        not isinstance(values, list) or not values for values in grid.values()
+    ):
+        raise ValueError("grid must map parameter names to non-empty lists")
+    return grid
 
 
 class ScenarioController:
@@ -27,42 +77,146 @@ class ScenarioController:
             run_by=data.get("run_by"),
         )
 
+        # Evaluate the params unless the client supplied its own results
+        if scenario.result_summary is None:
+            try:
+                scenario.result_summary = ScenarioEngine().evaluate(
+                    business, [scenario.params]
+                )[0]
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
         db.session.add(scenario)
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": scenario.id,
-                "business_id": scenario.business_id,
-                "name": scenario.name,
-                "created_at": scenario.created_at.isoformat()
-                if scenario.created_at
-                else None,
-                "params": scenario.params,
-                "result_summary": scenario.result_summary,
-                "run_by": scenario.run_by,
-            }
-        ), 201
+        return jsonify(scenario_serializer.one(scenario)), 201
+
+    @staticmethod
+    def run_scenario(scenario_id):
+        scenario = Scenario.query.get(scenario_id)
+        if not scenario:
+            return jsonify({"error": "Scenario not found"}), 404
+
+        if not _can_access(scenario.business_id):
+            return jsonify({"error": "Access denied. You can only run your own scenarios."}), 403
+
+        try:
+            ScenarioEngine().run(scenario)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        db.session.commit()
+        return jsonify(scenario_serializer.one(scenario))
+
+    @staticmethod
+    def evaluate_batch():
+        data = request.get_json()
+
+        if not data or not data.get("business_id"):
+            return jsonify({"error": "business_id is required"}), 400
+
+        business = Business.query.get(data["business_id"])
+        if not business:
+            return jsonify({"error": "Business not found"}), 404
+
+        if not _can_access(business.id):
+            return jsonify({"error": "Access denied. You can only run scenarios for your own businesses."}), 403
+
+        try:
+            entries = _expand_batch(data)
+            if not entries:
+                return jsonify({"error": "scenarios or grid is required"}), 400
+            results = ScenarioEngine().evaluate(business, [params for _, params in entries])
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if not data.get("persist", True):
+            return jsonify(
+                [
+                    {"name": name, "params": params, "result_summary": result}
+                    for (name, params), result in zip(entries, results)
+                ]
+            )
+
+        scenarios = [
+            Scenario(
+                business_id=business.id,
+                name=name,
+                params=params,
+                result_summary=result,
+                run_by=g.current_user.id,
+            )
+            for (name, params), result in zip(entries, results)
+        ]
+        db.session.add_all(scenarios)
+        db.session.commit()
+
+        return jsonify(scenario_serializer.many(scenarios)), 201
+
+    @staticmethod
+    def sweep_scenarios():
+        data = request.get_json()
+
+        if not data or not data.get("business_id"):
+            return jsonify({"error": "business_id is required"}), 400
+
+        business = Business.query.get(data["business_id"])
+        if not business:
+            return jsonify({"error": "Business not found"}), 404
+
+        if not _can_access(business.id):
+            return jsonify({"error": "Access denied. You can only run scenarios for your own businesses."}), 403
+
+        try:
+            grid = _grid(data)
+            if not grid:
+                return jsonify({"error": "grid is required"}), 400
+            if grid_size(grid) > MAX_SWEEP:
+                raise ValueError(f"A sweep can evaluate at most {MAX_SWEEP} scenarios")
+            workers = int(data.get("workers") or sweep_pool.workers)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        # The worker pool is shared; turn sweeps away once it is busy
+        if not sweep_pool.acquire():
+            response = jsonify({"error": "Too many sweeps are running. Try again shortly."})
+            response.headers["Retry-After"] = "5"
+            return response, 503
+
+        try:
+            sweep = ScenarioEngine().sweep(
+                business,
+                grid,
+                base=data.get("params"),
+                workers=workers,
+                chunk_size=data.get("chunk_size"),
+            )
+        except (TypeError, ValueError) as e:
+            sweep_pool.release()
+            return jsonify({"error": str(e)}), 400
+
+        # The baseline is loaded; release the connection before streaming
+        db.session.close()
+
+        def lines():
+            # A client disconnect closes this generator, which cancels the
+            # chunks that have not started yet
+            for batch in sweep.run(iter_grid(grid, data.get("params"))):
+                yield "".join(
+                    dumps({"index": index, "params": params, "result_summary": result}) + "\n"
+                    for index, params, result in batch
+                )
+            yield dumps({"stats": sweep.stats}) + "\n"
+
+        response = Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+        # Runs once the response is closed, whether or not the stream was consumed
+        response.call_on_close(sweep_pool.release)
+        return response
 
     @staticmethod
     def get_scenarios():
         scenarios = Scenario.query.all()
-        return jsonify(
-            [
-                {
-                    "id": scenario.id,
-                    "business_id": scenario.business_id,
-                    "name": scenario.name,
-                    "created_at": scenario.created_at.isoformat()
-                    if scenario.created_at
-                    else None,
-                    "params": scenario.params,
-                    "result_summary": scenario.result_summary,
-                    "run_by": scenario.run_by,
-                }
-                for scenario in scenarios
-            ]
-        )
+        return jsonify(scenario_serializer.many(scenarios))
 
     @staticmethod
     def get_scenario(scenario_id):
@@ -70,19 +224,7 @@ class ScenarioController:
         if not scenario:
             return jsonify({"error": "Scenario not found"}), 404
 
-        return jsonify(
-            {
-                "id": scenario.id,
-                "business_id": scenario.business_id,
-                "name": scenario.name,
-                "created_at": scenario.created_at.isoformat()
-                if scenario.created_at
-                else None,
-                "params": scenario.params,
-                "result_summary": scenario.result_summary,
-                "run_by": scenario.run_by,
-            }
-        )
+        return jsonify(scenario_serializer.one(scenario))
 
     @staticmethod
     def update_scenario(scenario_id):
@@ -116,19 +258,7 @@ class ScenarioController:
 
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": scenario.id,
-                "business_id": scenario.business_id,
-                "name": scenario.name,
-                "created_at": scenario.created_at.isoformat()
-                if scenario.created_at
-                else None,
-                "params": scenario.params,
-                "result_summary": scenario.result_summary,
-                "run_by": scenario.run_by,
-            }
-        )
+        return jsonify(scenario_serializer.one(scenario))
 
     @staticmethod
     def delete_scenario(scenario_id):
@@ -148,22 +278,7 @@ class ScenarioController:
             return jsonify({"error": "Business not found"}), 404
 
         scenarios = Scenario.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": scenario.id,
-                    "business_id": scenario.business_id,
-                    "name": scenario.name,
-                    "created_at": scenario.created_at.isoformat()
-                    if scenario.created_at
-                    else None,
-                    "params": scenario.params,
-                    "result_summary": scenario.result_summary,
-                    "run_by": scenario.run_by,
-                }
-                for scenario in scenarios
-            ]
-        )
+        return jsonify(scenario_serializer.many(scenarios))
 
     @staticmethod
     def get_scenarios_by_user(user_id):
@@ -172,19 +287,4 @@ class ScenarioController:
             return jsonify({"error": "User not found"}), 404
 
         scenarios = Scenario.query.filter_by(run_by=user_id).all()
-        return jsonify(
-            [
-                {
-                    "id": scenario.id,
-                    "business_id": scenario.business_id,
-                    "name": scenario.name,
-                    "created_at": scenario.created_at.isoformat()
-                    if scenario.created_at
-                    else None,
-                    "params": scenario.params,
-                    "result_summary": scenario.result_summary,
-                    "run_by": scenario.run_by,
-                }
-                for scenario in scenarios
-            ]
-        )
+        return jsonify(scenario_serializer.many(scenarios))
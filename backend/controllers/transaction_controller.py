@@ -1,10 +1,104 @@
 from flask import request, jsonify, g
 from models import db, Transaction, Business, Category, OCRDocument, Alert
 from datetime import datetime, date
-from services.ai_service import AIService
+from services.job_queue import job_queue
+from services.transaction_scoring import enqueue_anomaly_check
+from services.transaction_import import TransactionImporter, detect_format, iter_records
+from repositories.daily_cashflow_repository import DailyCashflowRepository
+from repositories.transaction_repository import TransactionRepository
+from utils.serializer import serializer_for
+from utils.streaming import requested_stream_format, stream_query
 import json
 
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+transaction_serializer = serializer_for(Transaction)
+
+
+def _listing_args(allow_business=False):
+    """
+    Parse list filters and paging from the query string. Returns
+    (filters, page) where page is None for the legacy unpaginated response.
+    Raises ValueError with a client-facing message on bad input.
+    """
+    args = request.args
+    filters = {}
+
+    if allow_business and args.get("business_id"):
+        filters["business_id"] = _int_arg("business_id")
+
+    for name in ("start_date", "end_date"):
+        if args.get(name):
+            try:
+                filters[name] = datetime.fromisoformat(args[name]).date()
+            except ValueError:
+                raise ValueError(f"Invalid {name}. Use YYYY-MM-DD")
+
+    if args.get("direction"):
+        direction = args["direction"].lower()
+        direction = {"income": "inflow", "expense": "outflow"}.get(direction, direction)
+        if direction not in ("inflow", "outflow"):
+            raise ValueError("Invalid direction. Use 'inflow' or 'outflow'")
+        filters["direction"] = direction
+
+    if args.get("category_id"):
+        filters["category_id"] = _int_arg("category_id")
+
+    if args.get("is_anomalous"):
+        filters["is_anomalous"] = args["is_anomalous"].lower() in ("1", "true", "yes")
+
+    # Paging is opt-in so existing clients that expect a bare array keep working
+    if "limit" not in args and "cursor" not in args:
+        return filters, None
+
+    limit = _int_arg("limit") if args.get("limit") else DEFAULT_PAGE_SIZE
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return filters, {"limit": min(limit, MAX_PAGE_SIZE), "cursor": args.get("cursor") or None}
+
+
+def _int_arg(name):
+    try:
+        return int(request.args[name])
+    except ValueError:
+        raise ValueError(f"Invalid {name}")
+
+
+def _transaction_listing(filters, page):
+    repository = TransactionRepository()
+    query = repository.read_only(repository.filtered(**filters))
+
+    try:
+        stream = requested_stream_format()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        if page is not None:
+            return jsonify({"error": "stream cannot be combined with limit or cursor"}), 400
+        query = query.order_by(Transaction.date.desc(), Transaction.id.desc())
+        return stream_query(query, transaction_serializer.one, stream)
+
+    if page is None:
+        return jsonify(transaction_serializer.many(query))
+
+    try:
+        result = repository.findPage(query, limit=page["limit"], cursor=page["cursor"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify(
+        {
+            "transactions": transaction_serializer.many(result["data"]),
+            "next_cursor": result["next_cursor"],
+            "has_more": result["has_more"],
+            "limit": page["limit"],
+        }
+    )
+
+
 class TransactionController:
     @staticmethod
     def create_transaction():
@@ -67,37 +161,10 @@ class TransactionController:
         if isinstance(transaction_date, str):
             transaction_date = datetime.fromisoformat(transaction_date).date()
 
-        # AI Anomaly Detection
+        # Client-supplied flags are kept; the AI verdict arrives asynchronously
         is_anomalous = data.get("is_anomalous", False)
         ai_tag = data.get("ai_tag")
 
-        try:
-            ai_service = AIService()
-            analysis_data = {
-                "description": data.get("description", ""),
-                "amount": data["amount"],
-                "date": str(transaction_date),
-                "category": category.name if "category_id" in data and data["category_id"] else "Unknown",
-                "direction": data["direction"]
-            }
-            
-            ai_response = ai_service.analyze_transaction_anomaly(analysis_data)
-            
-            # Handle JSON response from AI Service
-            if isinstance(ai_response, dict):
-                if ai_response.get("is_anomalous"):
-                    is_anomalous = True
-                    ai_tag = ai_response.get("tag", "Anomalous")
-            elif isinstance(ai_response, str):
-                # Fallback for older text-based responses (just in case)
-                if "unusual" in ai_response.lower() or "anomaly" in ai_response.lower():
-                    is_anomalous = True
-                    ai_tag = ai_response[:50]
-            
-        except Exception as e:
-            print(f"AI Anomaly Detection Failed: {e}")
-            # Fail silently, don't block transaction creation
-
         transaction = Transaction(
             business_id=business.id,
             date=transaction_date,
@@ -116,7 +183,8 @@ class TransactionController:
         )
 
         db.session.add(transaction)
-        db.session.commit()
+        DailyCashflowRepository().addTransaction(transaction)
+        db.session.flush()
 
         # Automatically create an alert if anomalous
         if is_anomalous:
@@ -128,33 +196,35 @@ class TransactionController:
                 forecast_metadata={"ai_reason": ai_tag}
             )
             db.session.add(alert)
-            db.session.commit()
-
-        return jsonify(
-            {
-                "id": transaction.id,
-                "business_id": transaction.business_id,
-                "date": transaction.date.isoformat() if transaction.date else None,
-                "datetime": transaction.datetime.isoformat()
-                if transaction.datetime
-                else None,
-                "description": transaction.description,
-                "amount": float(transaction.amount) if transaction.amount else None,
-                "direction": transaction.direction,
-                "category_id": transaction.category_id,
-                "source": transaction.source,
-                "ocr_document_id": transaction.ocr_document_id,
-                "tags": transaction.tags,
-                "is_anomalous": transaction.is_anomalous,
-                "ai_tag": transaction.ai_tag,
-                "created_at": transaction.created_at.isoformat()
-                if transaction.created_at
-                else None,
-                "updated_at": transaction.updated_at.isoformat()
-                if transaction.updated_at
-                else None,
-            }
-        ), 201
+
+        # AI Anomaly Detection runs off the request path; the job row is
+        # committed together with the transaction so it cannot be lost
+        anomaly_job = enqueue_anomaly_check(transaction)
+        db.session.commit()
+        job_queue.dispatch(anomaly_job.id)
+
+        return jsonify(transaction_serializer.one(transaction)), 201
+
+    @staticmethod
+    def import_transactions():
+        # Verify user is authenticated
+        if not hasattr(g, 'current_user') or not g.current_user:
+            return jsonify({"error": "Authentication required"}), 401
+
+        fmt = detect_format(request.content_type, request.args.get("format"))
+        if not fmt:
+            return jsonify(
+                {"error": "Send text/csv or application/x-ndjson (or pass ?format=csv|ndjson)"}
+            ), 415
+
+        check_anomalies = request.args.get("check_anomalies", "true").lower() != "false"
+        importer = TransactionImporter(g.current_user, check_anomalies=check_anomalies)
+
+        # Rows are read straight from the request stream, chunk by chunk
+        summary = importer.run(iter_records(request.stream, fmt))
+
+        status = 201 if summary["imported"] else 400
+        return jsonify(summary), status
 
     @staticmethod
     def get_transactions():
@@ -162,40 +232,16 @@ class TransactionController:
         if not hasattr(g, 'current_user') or not g.current_user:
             return jsonify({"error": "Authentication required"}), 401
 
+        try:
+            filters, page = _listing_args(allow_business=True)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
         # Only return transactions for businesses the user owns or if user is admin
-        if g.current_user.role == "admin":
-            transactions = Transaction.query.all()
-        else:
-            transactions = Transaction.query.join(Business).filter(Business.owner_id == g.current_user.id).all()
-
-        return jsonify(
-            [
-                {
-                    "id": transaction.id,
-                    "business_id": transaction.business_id,
-                    "date": transaction.date.isoformat() if transaction.date else None,
-                    "datetime": transaction.datetime.isoformat()
-                    if transaction.datetime
-                    else None,
-                    "description": transaction.description,
-                    "amount": float(transaction.amount) if transaction.amount else None,
-                    "direction": transaction.direction,
-                    "category_id": transaction.category_id,
-                    "source": transaction.source,
-                    "ocr_document_id": transaction.ocr_document_id,
-                    "tags": transaction.tags,
-                    "is_anomalous": transaction.is_anomalous,
-                    "ai_tag": transaction.ai_tag,
-                    "created_at": transaction.created_at.isoformat()
-                    if transaction.created_at
-                    else None,
-                    "updated_at": transaction.updated_at.isoformat()
-                    if transaction.updated_at
-                    else None,
-                }
-                for transaction in transactions
-            ]
-        )
+        if g.current_user.role != "admin":
+            filters["business_ids"] = g.current_user.business_ids
+
+        return _transaction_listing(filters, page)
 
     @staticmethod
     def get_transaction(transaction_id):
@@ -208,31 +254,7 @@ class TransactionController:
             if not transaction:
                 return jsonify({"error": "Transaction not found"}), 404
 
-        return jsonify(
-            {
-                "id": transaction.id,
-                "business_id": transaction.business_id,
-                "date": transaction.date.isoformat() if transaction.date else None,
-                "datetime": transaction.datetime.isoformat()
-                if transaction.datetime
-                else None,
-                "description": transaction.description,
-                "amount": float(transaction.amount) if transaction.amount else None,
-                "direction": transaction.direction,
-                "category_id": transaction.category_id,
-                "source": transaction.source,
-                "ocr_document_id": transaction.ocr_document_id,
-                "tags": transaction.tags,
-                "is_anomalous": transaction.is_anomalous,
-                "ai_tag": transaction.ai_tag,
-                "created_at": transaction.created_at.isoformat()
-                if transaction.created_at
-                else None,
-                "updated_at": transaction.updated_at.isoformat()
-                if transaction.updated_at
-                else None,
-            }
-        )
+        return jsonify(transaction_serializer.one(transaction))
 
     @staticmethod
     def update_transaction(transaction_id):
@@ -246,6 +268,7 @@ class TransactionController:
                 return jsonify({"error": "Transaction not found"}), 404
 
         data = request.get_json()
+        previous = DailyCashflowRepository.snapshot(transaction)
 
         # Note: business_id changes are not allowed for security reasons
         # Only admin can change the business association of a transaction
@@ -304,33 +327,15 @@ class TransactionController:
             transaction.ai_tag = data["ai_tag"]
 
         transaction.updated_at = datetime.utcnow()
+
+        if DailyCashflowRepository.snapshot(transaction) != previous:
+            rollup_repository = DailyCashflowRepository()
+            rollup_repository.removeTransaction(previous)
+            rollup_repository.addTransaction(transaction)
+
         db.session.commit()
 
-        return jsonify(
-            {
-                "id": transaction.id,
-                "business_id": transaction.business_id,
-                "date": transaction.date.isoformat() if transaction.date else None,
-                "datetime": transaction.datetime.isoformat()
-                if transaction.datetime
-                else None,
-                "description": transaction.description,
-                "amount": float(transaction.amount) if transaction.amount else None,
-                "direction": transaction.direction,
-                "category_id": transaction.category_id,
-                "source": transaction.source,
-                "ocr_document_id": transaction.ocr_document_id,
-                "tags": transaction.tags,
-                "is_anomalous": transaction.is_anomalous,
-                "ai_tag": transaction.ai_tag,
-                "created_at": transaction.created_at.isoformat()
-                if transaction.created_at
-                else None,
-                "updated_at": transaction.updated_at.isoformat()
-                if transaction.updated_at
-                else None,
-            }
-        )
+        return jsonify(transaction_serializer.one(transaction))
 
     @staticmethod
     def delete_transaction(transaction_id):
@@ -343,6 +348,9 @@ class TransactionController:
             if not transaction:
                 return jsonify({"error": "Transaction not found"}), 404
 
+        DailyCashflowRepository().removeTransaction(
+            DailyCashflowRepository.snapshot(transaction)
+        )
         db.session.delete(transaction)
         db.session.commit()
 
@@ -362,35 +370,13 @@ class TransactionController:
         if business.owner_id != g.current_user.id and g.current_user.role != "admin":
             return jsonify({"error": "You can only view transactions for your own business"}), 403
 
-        transactions = Transaction.query.filter_by(business_id=business_id).all()
-        return jsonify(
-            [
-                {
-                    "id": transaction.id,
-                    "business_id": transaction.business_id,
-                    "date": transaction.date.isoformat() if transaction.date else None,
-                    "datetime": transaction.datetime.isoformat()
-                    if transaction.datetime
-                    else None,
-                    "description": transaction.description,
-                    "amount": float(transaction.amount) if transaction.amount else None,
-                    "direction": transaction.direction,
-                    "category_id": transaction.category_id,
-                    "source": transaction.source,
-                    "ocr_document_id": transaction.ocr_document_id,
-                    "tags": transaction.tags,
-                    "is_anomalous": transaction.is_anomalous,
-                    "ai_tag": transaction.ai_tag,
-                    "created_at": transaction.created_at.isoformat()
-                    if transaction.created_at
-                    else None,
-                    "updated_at": transaction.updated_at.isoformat()
-                    if transaction.updated_at
-                    else None,
-                }
-                for transaction in transactions
-            ]
-        )
+        try:
+            filters, page = _listing_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        filters["business_id"] = business_id
+        return _transaction_listing(filters, page)
 
     @staticmethod
     def get_transactions_by_category(category_id):
@@ -406,32 +392,10 @@ class TransactionController:
         if category.business.owner_id != g.current_user.id and g.current_user.role != "admin":
             return jsonify({"error": "You can only view transactions for your own business"}), 403
 
-        transactions = Transaction.query.filter_by(category_id=category_id).all()
-        return jsonify(
-            [
-                {
-                    "id": transaction.id,
-                    "business_id": transaction.business_id,
-                    "date": transaction.date.isoformat() if transaction.date else None,
-                    "datetime": transaction.datetime.isoformat()
-                    if transaction.datetime
-                    else None,
-                    "description": transaction.description,
-                    "amount": float(transaction.amount) if transaction.amount else None,
-                    "direction": transaction.direction,
-                    "category_id": transaction.category_id,
-                    "source": transaction.source,
-                    "ocr_document_id": transaction.ocr_document_id,
-                    "tags": transaction.tags,
-                    "is_anomalous": transaction.is_anomalous,
-                    "ai_tag": transaction.ai_tag,
-                    "created_at": transaction.created_at.isoformat()
-                    if transaction.created_at
-                    else None,
-                    "updated_at": transaction.updated_at.isoformat()
-                    if transaction.updated_at
-                    else None,
-                }
-                for transaction in transactions
-            ]
-        )
+        try:
+            filters, page = _listing_args()
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        filters["category_id"] = category_id
+        return _transaction_listing(filters, page)
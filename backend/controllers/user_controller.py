@@ -2,6 +2,8 @@ from flask import request, jsonify, g
 from models import db, User
 from repositories.user_repository import UserRepository
 from middleware import authenticate_request
+from middleware.auth_cache import auth_cache
+from utils.crypto import hash_password, verify_password
 
 
 class UserController:
@@ -31,7 +33,7 @@ class UserController:
         if self.user_repository.exists(email=data["email"]):
             return jsonify({"error": "Email already exists"}), 400
 
-        user = self.user_repository.create(data)
+        user = self.user_repository.createWithPassword(data, data["password"])
         return jsonify(self.user_repository.to_dict(user)), 201
 
     def bussinessOwnerStore(self):
@@ -63,7 +65,11 @@ class UserController:
             ):
                 return jsonify({"error": "Email already exists"}), 400
 
+        if data.get("password"):
+            data["password"] = hash_password(data["password"])
+
         updated_user = self.user_repository.update(user_id, data)
+        auth_cache.invalidate_user(user_id)
         return jsonify(self.user_repository.to_dict(updated_user))
 
     def destroy(self, user_id):
@@ -72,6 +78,7 @@ class UserController:
             return jsonify({"error": "User not found"}), 404
 
         self.user_repository.delete(user_id)
+        auth_cache.invalidate_user(user_id)
         return jsonify({"message": "User deleted successfully"})
 
     def profile(self):
@@ -142,6 +149,7 @@ class UserController:
                 return jsonify({"error": "Email already exists"}), 400
 
         updated_user = self.user_repository.update(g.current_user.id, update_data)
+        auth_cache.invalidate_user(g.current_user.id)
         return jsonify(self.user_repository.to_dict(updated_user))
 
     def change_password(self):
@@ -156,14 +164,13 @@ class UserController:
                 {"error": "Current password and new password are required"}
             ), 400
 
-        # In a real app, you'd verify the current password hash
-        # For now, we'll just update it
-        updated_user = self.user_repository.update(
-            g.current_user.id,
-            {
-                "password": data["new_password"]  # In real app, hash this!
-            },
-        )
+        # PasswordHasherBusy is answered with 503 by the app-level handler
+        user = self.user_repository.find(g.current_user.id)
+        if not user or not verify_password(data["current_password"], user.password):
+            return jsonify({"error": "Current password is incorrect"}), 400
+        self.user_repository.updatePassword(user.id, data["new_password"])
+
+        auth_cache.invalidate_user(g.current_user.id)
 
         return jsonify({"message": "Password updated successfully"})
 
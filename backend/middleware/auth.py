@@ -2,7 +2,9 @@ from flask import request, jsonify, g
 from functools import wraps
 import jwt
 from datetime import datetime, timedelta
-from models import User, APIKey
+from sqlalchemy.orm import joinedload, selectinload
+from models import User, APIKey, Business
+from middleware.auth_cache import APIKeyPrincipal, Principal, auth_cache
 import hashlib
 import hmac
 import os
@@ -39,44 +41,74 @@ class AuthenticationMiddleware:
         return hmac.compare_digest(api_key_hash, provided_hash)
 
 
-def authenticate_request(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        api_key_header = request.headers.get("X-API-Key")
-
-        user = None
-        auth_method = None
-
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            payload = AuthenticationMiddleware.verify_token(
-                token, os.getenv("SECRET_KEY")
+def _resolve_principal():
+    """
+    The principal for the request's Bearer token or X-API-Key header, as
+    (user, auth_method, api_key). Principals come from the auth cache when
+    possible; a miss loads the user (or key, business and owner) with the
+    owner's business ids and caches a detached snapshot.
+    """
+    auth_header = request.headers.get("Authorization")
+    api_key_header = request.headers.get("X-API-Key")
+
+    if auth_header and auth_header.startswith("Bearer "):
+        token = auth_header.split(" ")[1]
+        payload = AuthenticationMiddleware.verify_token(
+            token, os.getenv("SECRET_KEY")
+        )
+        if not payload:
+            return None, None, None
+
+        user = auth_cache.get_user(payload["user_id"])
+        if user is None:
+            row = (
+                User.query.options(selectinload(User.businesses))
+                .filter_by(id=payload["user_id"])
+                .first()
+            )
+            if row is None:
+                return None, None, None
+            user = Principal.from_user(row)
+            auth_cache.set_user(user)
+        return user, "token", None
+
+    if api_key_header:
+        key_hash = AuthenticationMiddleware.hash_api_key(api_key_header)
+        api_key = auth_cache.get_api_key(key_hash)
+        if api_key is None:
+            row = (
+                APIKey.query.options(
+                    joinedload(APIKey.business)
+                    .joinedload(Business.owner)
+                    .selectinload(User.businesses)
+                )
+                .filter_by(key_hash=key_hash, revoked=False)
+                .first()
             )
+            if row is None or row.business is None or row.business.owner is None:
+                return None, None, None
+            api_key = APIKeyPrincipal.from_api_key(
+                row, Principal.from_user(row.business.owner)
+            )
+            auth_cache.set_api_key(key_hash, api_key)
+        return api_key.owner, "api_key", api_key
 
-            if payload:
-                user = User.query.get(payload["user_id"])
-                auth_method = "token"
+    return None, None, None
 
-        elif api_key_header:
-            api_key = APIKey.query.filter_by(
-                key_hash=AuthenticationMiddleware.hash_api_key(api_key_header),
-                revoked=False,
-            ).first()
 
-            if api_key:
-                business = api_key.business
-                if business and business.owner:
-                    user = business.owner
-                    auth_method = "api_key"
-                    g.api_key = api_key
-                    g.scopes = api_key.scopes.split(",") if api_key.scopes else []
+def authenticate_request(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user, auth_method, api_key = _resolve_principal()
 
         if not user:
             return jsonify({
                 "error": "Authentication required", 
             }), 401
 
+        if api_key:
+            g.api_key = api_key
+            g.scopes = api_key.scopes
         g.current_user = user
         g.auth_method = auth_method
 
@@ -88,36 +120,11 @@ def authenticate_request(f):
 def optional_authenticate(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get("Authorization")
-        api_key_header = request.headers.get("X-API-Key")
-
-        user = None
-        auth_method = None
-
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header.split(" ")[1]
-            payload = AuthenticationMiddleware.verify_token(
-                token, "your-secret-key-here"
-            )
-
-            if payload:
-                user = User.query.get(payload["user_id"])
-                auth_method = "token"
-
-        elif api_key_header:
-            api_key = APIKey.query.filter_by(
-                key_hash=AuthenticationMiddleware.hash_api_key(api_key_header),
-                revoked=False,
-            ).first()
-
-            if api_key:
-                business = api_key.business
-                if business and business.owner:
-                    user = business.owner
-                    auth_method = "api_key"
-                    g.api_key = api_key
-                    g.scopes = api_key.scopes.split(",") if api_key.scopes else []
+        user, auth_method, api_key = _resolve_principal()
 
+        if api_key:
+            g.api_key = api_key
+            g.scopes = api_key.scopes
         g.current_user = user
         g.auth_method = auth_method
 
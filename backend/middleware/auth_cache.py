@@ -0,0 +1,194 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class Principal:
+    """
+    Detached snapshot of an authenticated user. Stands in for the User row
+    on ``g.current_user`` (id, email, name, role) and also carries the ids
+    of the businesses the user owns, so ownership checks need no query.
+    """
+
+    __slots__ = ("id", "email", "name", "role", "business_ids")
+
+    def __init__(self, id, email, name, role, business_ids=()):
+        self.id = id
+        self.email = email
+        self.name = name
+        self.role = role
+        self.business_ids = frozenset(business_ids)
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            user.id,
+            user.email,
+            user.name,
+            user.role,
+            [business.id for business in user.businesses],
+        )
+
+    def __repr__(self):
+        return f"<Principal {self.id} {self.role}>"
+
+
+class APIKeyPrincipal:
+    """Detached snapshot of an API key and the owner it acts for"""
+
+    __slots__ = ("id", "business_id", "name", "scopes", "owner")
+
+    def __init__(self, id, business_id, name, scopes, owner):
+        self.id = id
+        self.business_id = business_id
+        self.name = name
+        self.scopes = scopes
+        self.owner = owner
+
+    @classmethod
+    def from_api_key(cls, api_key, owner):
+        scopes = api_key.scopes.split(",") if api_key.scopes else []
+        return cls(api_key.id, api_key.business_id, api_key.name, scopes, owner)
+
+    def __repr__(self):
+        return f"<APIKeyPrincipal {self.id} business={self.business_id}>"
+
+
+class AuthCache:
+    """
+    Short-lived, size-bounded cache of authenticated principals, keyed by
+    user id for tokens and by key hash for API keys.
+
+    Entries are dropped explicitly when users, businesses or API keys
+    change. Each invalidation also rewrites a small epoch file; every
+    lookup compares that file's stat with the last one seen and clears the
+    whole cache when it changed, so other gunicorn workers on the host stop
+    serving a revoked key on their next request rather than after the TTL.
+    """
+
+    def __init__(self, max_entries=1024, ttl=60, epoch_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.epoch_path = epoch_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._epoch = self._read_epoch()
+
+    def get_user(self, user_id):
+        return self._get(("user", user_id))
+
+    def set_user(self, principal):
+        self._set(("user", principal.id), principal)
+
+    def get_api_key(self, key_hash):
+        return self._get(("api_key", key_hash))
+
+    def set_api_key(self, key_hash, principal):
+        self._set(("api_key", key_hash), principal)
+
+    def invalidate_user(self, user_id):
+        """Forget a user and every API key acting for them"""
+        self._invalidate(lambda value: _owner(value).id == user_id)
+
+    def invalidate_business(self, business_id):
+        """Forget the business's API keys and any owner whose business set includes it"""
+        self._invalidate(
+            lambda value: business_id in _owner(value).business_ids
+            or (isinstance(value, APIKeyPrincipal) and value.business_id == business_id)
+        )
+
+    def invalidate_api_key(self, api_key_id):
+        self._invalidate(
+            lambda value: isinstance(value, APIKeyPrincipal) and value.id == api_key_id
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._bump_epoch()
+
+    def _get(self, key):
+        if not self.ttl:
+            return None
+
+        epoch = self._read_epoch()
+        with self._lock:
+            if epoch != self._epoch:
+                self._entries.clear()
+                self._epoch = epoch
+                return None
+
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value):
+        if not self.ttl:
+            return
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _invalidate(self, matches):
+        with self._lock:
+            stale = [key for key, (value, _) in self._entries.items() if matches(value)]
+            for key in stale:
+                del self._entries[key]
+        self._bump_epoch()
+
+    def _read_epoch(self):
+        if not self.epoch_path:
+            return None
+        try:
+            stat = os.stat(self.epoch_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _bump_epoch(self):
+        if not self.epoch_path:
+            return
+
+        # Replacing the file gives it a new inode, so even filesystems with
+        # coarse mtimes register the change. This worker picks the change up
+        # like any other, which also covers concurrent bumps from elsewhere.
+        temporary = f"{self.epoch_path}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            with open(temporary, "w") as handle:
+                handle.write(str(time.time_ns()))
+            os.replace(temporary, self.epoch_path)
+        except OSError as e:
+            print(f"Auth cache epoch update failed: {e}")
+
+
+def _owner(value):
+    return value.owner if isinstance(value, APIKeyPrincipal) else value
+
+
+def _build_auth_cache():
+    epoch_path = os.getenv("AUTH_CACHE_EPOCH_PATH", "database/auth_cache.epoch")
+    if epoch_path and not os.path.isabs(epoch_path):
+        epoch_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), epoch_path)
+    if epoch_path:
+        os.makedirs(os.path.dirname(epoch_path), exist_ok=True)
+
+    return AuthCache(
+        max_entries=int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "1024")),
+        ttl=float(os.getenv("AUTH_CACHE_TTL", "60")),
+        epoch_path=epoch_path,
+    )
+
+
+auth_cache = _build_auth_cache()
@@ -1,5 +1,7 @@
+import os
 from functools import wraps
-from flask import request, jsonify, g
+from flask import request, jsonify, g, make_response
+from services.rate_limiter import rate_limiter
 from .auth import authenticate_request, optional_authenticate
 from .permissions import (
     require_permission,
@@ -8,39 +10,64 @@ from .permissions import (
     self_or_admin_required,
 )
 
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
 
-def rate_limit(max_requests=100, window_seconds=3600):
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            if not hasattr(g, "rate_limit_store"):
-                g.rate_limit_store = {}
-
-            client_ip = request.remote_addr
-            current_time = int(time.time())
-            window_start = current_time - window_seconds
 
-            if client_ip not in g.rate_limit_store:
-                g.rate_limit_store[client_ip] = []
+def rate_limit(max_requests=100, window_seconds=3600, key="ip", scope=None):
+    """
+    Limit a view to max_requests per sliding window_seconds, counted in the
+    shared rate limiter store so the limit holds across workers.
 
-            g.rate_limit_store[client_ip] = [
-                timestamp
-                for timestamp in g.rate_limit_store[client_ip]
-                if timestamp > window_start
-            ]
+    key picks who is limited: "ip", "user" (falls back to the IP when
+    unauthenticated), "api_key" (falls back to the user, then the IP) or a
+    callable returning a string. Each view has its own counters unless
+    several share a scope name.
+    """
 
-            if len(g.rate_limit_store[client_ip]) >= max_requests:
-                return jsonify({"error": "Rate limit exceeded"}), 429
+    def decorator(f):
+        limit_scope = scope or f.__name__
 
-            g.rate_limit_store[client_ip].append(current_time)
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED:
+                return f(*args, **kwargs)
 
-            return f(*args, **kwargs)
+            identity = key() if callable(key) else _rate_limit_identity(key)
+            try:
+                allowed, remaining, retry_after = rate_limiter.hit(
+                    f"{limit_scope}:{identity}", max_requests, window_seconds
+                )
+            except Exception as e:
+                # Fail open: an unavailable store must not take the API down
+                print(f"Rate limiter error: {e}")
+                return f(*args, **kwargs)
+
+            if not allowed:
+                response = jsonify({"error": "Rate limit exceeded"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(retry_after)
+            else:
+                response = make_response(f(*args, **kwargs))
+            response.headers["X-RateLimit-Limit"] = str(max_requests)
+            response.headers["X-RateLimit-Remaining"] = str(remaining)
+            return response
 
         return decorated_function
 
     return decorator
 
 
+def _rate_limit_identity(key):
+    if key in ("api_key", "user"):
+        api_key = g.get("api_key")
+        if key == "api_key" and api_key is not None:
+            return f"key:{api_key.id}"
+        user = g.get("current_user")
+        if user:
+            return f"user:{user.id}"
+    return f"ip:{request.remote_addr}"
+
+
 def validate_json(required_fields=None):
     def decorator(f):
         @wraps(f)
@@ -186,6 +213,3 @@ def secure_endpoint(
         return decorated_function
 
     return decorator
-
-
-import time
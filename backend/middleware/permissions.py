@@ -1,5 +1,6 @@
+import sys
 from flask import request, jsonify, g
-from functools import wraps
+from functools import lru_cache, wraps
 from models import Business, User, Transaction
 
 
@@ -195,6 +196,18 @@ class PermissionPolicies:
         ],
     }
 
+    # Compiled from the tables above by _compile_permission_masks() below.
+    # Each permission string maps to one bit; roles and API key scopes map
+    # to the OR of their permissions, so a check is a dict lookup and an AND.
+    PERMISSION_BITS = {}
+    ROLE_MASKS = {}
+    SCOPE_MASKS = {}
+
+    @classmethod
+    def permission_bit(cls, permission):
+        """Bit for a permission string; 0 (never granted) for unknown ones"""
+        return cls.PERMISSION_BITS.get(permission, 0)
+
     @classmethod
     def get_user_permissions(cls, user):
         if not user:
@@ -208,63 +221,111 @@ class PermissionPolicies:
         if not scopes:
             return []
 
-        permissions = []
-        for scope in scopes:
-            if scope in cls.API_KEY_SCOPES:
-                permissions.extend(cls.API_KEY_SCOPES[scope])
+        return list(cls._scope_permissions(tuple(scopes)))
 
-        return list(set(permissions))
+    @classmethod
+    def role_mask(cls, user):
+        return cls.ROLE_MASKS.get(user.role or "viewer", 0)
+
+    @classmethod
+    def scopes_mask(cls, scopes):
+        if not scopes:
+            return 0
+        return cls._scopes_mask(tuple(scopes))
 
     @classmethod
     def has_permission(cls, user, permission, business_id=None):
         if not user:
             return False
+        return cls.has_permission_bit(user, cls.permission_bit(permission), business_id)
 
-        user_permissions = cls.get_user_permissions(user)
-
-        if permission in user_permissions:
-            if business_id and user.role != "admin":
-                business = Business.query.get(business_id)
-                if business and business.owner_id != user.id:
-                    return False
-            return True
+    @classmethod
+    def has_permission_bit(cls, user, bit, business_id=None):
+        if not cls.role_mask(user) & bit:
+            return False
 
-        return False
+        if business_id and user.role != "admin":
+            if business_id in getattr(user, "business_ids", ()):
+                return True
+            business = Business.query.get(business_id)
+            if business and business.owner_id != user.id:
+                return False
+        return True
 
     @classmethod
     def has_api_key_permission(cls, scopes, permission, business_id=None):
-        if not scopes:
-            return False
+        return bool(cls.scopes_mask(scopes) & cls.permission_bit(permission))
 
-        api_permissions = cls.get_api_key_permissions(scopes)
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _scopes_mask(cls, scopes):
+        mask = 0
+        for scope in scopes:
+            mask |= cls.SCOPE_MASKS.get(scope, 0)
+        return mask
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _scope_permissions(cls, scopes):
+        return frozenset(
+            permission
+            for scope in scopes
+            for permission in cls.API_KEY_SCOPES.get(scope, ())
+        )
+
+
+def _compile_permission_masks(policies):
+    names = sorted(
+        {
+            permission
+            for table in (policies.ROLE_PERMISSIONS, policies.API_KEY_SCOPES)
+            for permissions in table.values()
+            for permission in permissions
+        }
+    )
+    policies.PERMISSION_BITS = {
+        sys.intern(name): 1 << index for index, name in enumerate(names)
+    }
+
+    def mask(permissions):
+        value = 0
+        for permission in permissions:
+            value |= policies.PERMISSION_BITS[permission]
+        return value
+
+    policies.ROLE_MASKS = {
+        role: mask(permissions) for role, permissions in policies.ROLE_PERMISSIONS.items()
+    }
+    policies.SCOPE_MASKS = {
+        scope: mask(permissions) for scope, permissions in policies.API_KEY_SCOPES.items()
+    }
 
-        if permission in api_permissions:
-            return True
 
-        return False
+_compile_permission_masks(PermissionPolicies)
 
 
 def require_permission(permission):
+    # Resolved once per decorated view, not per request
+    bit = PermissionPolicies.permission_bit(permission)
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not hasattr(g, "current_user") or not g.current_user:
+            # Resolve the g proxy once; each proxied attribute lookup costs
+            # more than the permission check itself
+            state = g._get_current_object()
+            user = getattr(state, "current_user", None)
+            if not user:
                 return jsonify({"error": "Authentication required"}), 401
 
-            business_id = kwargs.get("business_id") or request.view_args.get(
-                "business_id"
-            )
-
-            if g.auth_method == "api_key":
-                scopes = getattr(g, "scopes", [])
-                if not PermissionPolicies.has_api_key_permission(
-                    scopes, permission, business_id
-                ):
+            if state.auth_method == "api_key":
+                if not PermissionPolicies.scopes_mask(getattr(state, "scopes", None)) & bit:
                     return jsonify({"error": "Insufficient permissions"}), 403
             else:
-                if not PermissionPolicies.has_permission(
-                    g.current_user, permission, business_id
-                ):
+                business_id = kwargs.get("business_id") or request.view_args.get(
+                    "business_id"
+                )
+                if not PermissionPolicies.has_permission_bit(user, bit, business_id):
                     return jsonify({"error": "Insufficient permissions"}), 403
 
             return f(*args, **kwargs)
@@ -332,7 +393,7 @@ def transaction_access_required(f):
             return jsonify({"error": "Transaction not found"}), 404
 
         # Allow access if user is admin or owner of the business that owns the transaction
-        if g.current_user.role != "admin" and transaction.business.owner_id != g.current_user.id:
+        if g.current_user.role != "admin" and transaction.business_id not in g.current_user.business_ids:
             return jsonify({"error": "Transaction access denied"}), 403
 
         g.current_transaction = transaction
@@ -0,0 +1,30 @@
+"""Index transactions by the (date, id) listing order
+
+Revision ID: 3c8a5e1d7b92
+Revises: f2c7d9a41b58
+Create Date: 2026-10-17 10:04:37.261905
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8a5e1d7b92'
+down_revision = 'f2c7d9a41b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_business_id_date')
+        batch_op.create_index('ix_transactions_business_id_date_id', ['business_id', 'date', 'id'], unique=False)
+        batch_op.create_index('ix_transactions_date_id', ['date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_date_id')
+        batch_op.drop_index('ix_transactions_business_id_date_id')
+        batch_op.create_index('ix_transactions_business_id_date', ['business_id', 'date'], unique=False)
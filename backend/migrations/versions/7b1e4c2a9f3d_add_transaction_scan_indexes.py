@@ -0,0 +1,34 @@
+"""Add composite indexes for the transaction scan path
+
+Revision ID: 7b1e4c2a9f3d
+Revises: 35d9f62e24a6
+Create Date: 2026-10-16 09:12:05.418233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b1e4c2a9f3d'
+down_revision = '35d9f62e24a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_business_id_date', ['business_id', 'date'], unique=False)
+        batch_op.create_index('ix_transactions_business_id_direction_date', ['business_id', 'direction', 'date'], unique=False)
+        batch_op.create_index('ix_transactions_business_id_is_anomalous', ['business_id', 'is_anomalous'], unique=False)
+        batch_op.create_index('ix_transactions_category_id', ['category_id'], unique=False)
+        batch_op.create_index('ix_transactions_ocr_document_id', ['ocr_document_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_ocr_document_id')
+        batch_op.drop_index('ix_transactions_category_id')
+        batch_op.drop_index('ix_transactions_business_id_is_anomalous')
+        batch_op.drop_index('ix_transactions_business_id_direction_date')
+        batch_op.drop_index('ix_transactions_business_id_date')
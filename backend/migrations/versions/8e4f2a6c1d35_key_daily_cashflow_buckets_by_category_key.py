@@ -0,0 +1,54 @@
+"""Key daily_cashflow buckets by a non-null category_key
+
+Revision ID: 8e4f2a6c1d35
+Revises: 3c8a5e1d7b92
+Create Date: 2026-10-17 14:21:09.518327
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4f2a6c1d35'
+down_revision = '3c8a5e1d7b92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('daily_cashflow', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category_key', sa.Integer(), server_default='0', nullable=False))
+
+    connection = op.get_bind()
+    connection.execute(sa.text("UPDATE daily_cashflow SET category_key = COALESCE(category_id, 0)"))
+
+    # Uncategorized buckets were never unique; fold duplicates into the oldest row
+    duplicates = connection.execute(sa.text(
+        "SELECT MIN(id), SUM(total), SUM(count), business_id, date, direction "
+        "FROM daily_cashflow WHERE category_id IS NULL "
+        "GROUP BY business_id, date, direction HAVING COUNT(*) > 1"
+    )).fetchall()
+    for keep_id, total, count, business_id, date, direction in duplicates:
+        connection.execute(
+            sa.text("UPDATE daily_cashflow SET total = :total, count = :count WHERE id = :id"),
+            {"total": total, "count": count, "id": keep_id},
+        )
+        connection.execute(
+            sa.text(
+                "DELETE FROM daily_cashflow WHERE category_id IS NULL AND business_id = :business_id "
+                "AND date = :date AND direction = :direction AND id != :id"
+            ),
+            {"business_id": business_id, "date": date, "direction": direction, "id": keep_id},
+        )
+
+    with op.batch_alter_table('daily_cashflow', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_daily_cashflow_bucket', type_='unique')
+        batch_op.create_unique_constraint('uq_daily_cashflow_bucket', ['business_id', 'date', 'direction', 'category_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('daily_cashflow', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_daily_cashflow_bucket', type_='unique')
+        batch_op.create_unique_constraint('uq_daily_cashflow_bucket', ['business_id', 'date', 'direction', 'category_id'])
+        batch_op.drop_column('category_key')
@@ -0,0 +1,48 @@
+"""Add daily_cashflow rollup table
+
+Revision ID: c4d82f1e6a07
+Revises: 7b1e4c2a9f3d
+Create Date: 2026-10-16 10:03:41.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d82f1e6a07'
+down_revision = '7b1e4c2a9f3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_cashflow',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('business_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('direction', sa.String(length=10), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('total', sa.Numeric(precision=16, scale=2), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('business_id', 'date', 'direction', 'category_id', name='uq_daily_cashflow_bucket')
+    )
+    with op.batch_alter_table('daily_cashflow', schema=None) as batch_op:
+        batch_op.create_index('ix_daily_cashflow_business_id_date', ['business_id', 'date'], unique=False)
+
+    # Readers use only the rollup from here on, so fill it from existing transactions
+    op.execute(
+        "INSERT INTO daily_cashflow (business_id, date, direction, category_id, total, count) "
+        "SELECT business_id, date, direction, category_id, SUM(amount), COUNT(id) "
+        "FROM transactions GROUP BY business_id, date, direction, category_id"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('daily_cashflow', schema=None) as batch_op:
+        batch_op.drop_index('ix_daily_cashflow_business_id_date')
+
+    op.drop_table('daily_cashflow')
@@ -0,0 +1,45 @@
+"""Add forecast_states table for incremental forecast refresh
+
+Revision ID: f2c7d9a41b58
+Revises: e1a9b3f7c214
+Create Date: 2026-10-16 23:52:08.114530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c7d9a41b58'
+down_revision = 'e1a9b3f7c214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('forecast_states',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('business_id', sa.Integer(), nullable=False),
+    sa.Column('model_id', sa.Integer(), nullable=True),
+    sa.Column('method', sa.String(length=50), nullable=True),
+    sa.Column('state', sa.JSON(), nullable=True),
+    sa.Column('high_water_date', sa.Date(), nullable=True),
+    sa.Column('refitted_on', sa.Date(), nullable=True),
+    sa.Column('dirty', sa.Boolean(), nullable=False),
+    sa.Column('dirty_from', sa.Date(), nullable=True),
+    sa.Column('revision', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['model_id'], ['models.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('business_id')
+    )
+    with op.batch_alter_table('forecast_states', schema=None) as batch_op:
+        batch_op.create_index('ix_forecast_states_dirty', ['dirty'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('forecast_states', schema=None) as batch_op:
+        batch_op.drop_index('ix_forecast_states_dirty')
+
+    op.drop_table('forecast_states')
@@ -38,6 +38,8 @@ class Business(db.Model):
     alerts = db.relationship("Alert", backref="business", lazy=True, cascade="all, delete-orphan")
     scenarios = db.relationship("Scenario", backref="business", lazy=True, cascade="all, delete-orphan")
     api_keys = db.relationship("APIKey", backref="business", lazy=True, cascade="all, delete-orphan")
+    daily_cashflows = db.relationship("DailyCashflow", backref="business", lazy=True, cascade="all, delete-orphan")
+    forecast_state = db.relationship("ForecastState", backref="business", uselist=False, cascade="all, delete-orphan")
 
 
 class Category(db.Model):
@@ -53,6 +55,7 @@ class Category(db.Model):
         "Category", backref=db.backref("parent", remote_side=[id]), cascade="all, delete-orphan"
     )
     transactions = db.relationship("Transaction", backref="category", lazy=True, cascade="all, delete-orphan")
+    daily_cashflows = db.relationship("DailyCashflow", backref="category", lazy=True, cascade="all, delete-orphan")
 
 
 class Transaction(db.Model):
@@ -75,6 +78,62 @@ class Transaction(db.Model):
 
     alerts = db.relationship("Alert", backref="linked_transaction", lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Match the newest-first (date, id) listing order, per business and overall
+        db.Index("ix_transactions_business_id_date_id", "business_id", "date", "id"),
+        db.Index("ix_transactions_date_id", "date", "id"),
+        db.Index("ix_transactions_business_id_direction_date", "business_id", "direction", "date"),
+        db.Index("ix_transactions_business_id_is_anomalous", "business_id", "is_anomalous"),
+        db.Index("ix_transactions_category_id", "category_id"),
+        db.Index("ix_transactions_ocr_document_id", "ocr_document_id"),
+    )
+
+
+def _category_key(context):
+    return context.get_current_parameters().get("category_id") or 0
+
+
+class DailyCashflow(db.Model):
+    __tablename__ = "daily_cashflow"
+    id = db.Column(db.Integer, primary_key=True)
+    business_id = db.Column(db.Integer, db.ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    direction = db.Column(db.String(10), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey("categories.id", ondelete="CASCADE"))
+    # category_id with 0 for uncategorized: NULLs never collide in a unique
+    # key, so the bucket key needs a non-null column for upserts to hit
+    category_key = db.Column(db.Integer, nullable=False, default=_category_key, server_default="0")
+    total = db.Column(db.Numeric(16, 2), nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint("business_id", "date", "direction", "category_key", name="uq_daily_cashflow_bucket"),
+        db.Index("ix_daily_cashflow_business_id_date", "business_id", "date"),
+    )
+
+
+class ForecastState(db.Model):
+    """
+    Fitted forecasting state per business, so a refresh only has to absorb
+    the days after high_water_date. Transaction writes set dirty (and the
+    earliest changed date in dirty_from) through the daily_cashflow rollup.
+    """
+
+    __tablename__ = "forecast_states"
+    id = db.Column(db.Integer, primary_key=True)
+    business_id = db.Column(db.Integer, db.ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False, unique=True)
+    model_id = db.Column(db.Integer, db.ForeignKey("models.id", ondelete="SET NULL"))
+    method = db.Column(db.String(50))
+    state = db.Column(db.JSON)
+    high_water_date = db.Column(db.Date)
+    refitted_on = db.Column(db.Date)
+    dirty = db.Column(db.Boolean, nullable=False, default=False)
+    dirty_from = db.Column(db.Date)
+    revision = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (db.Index("ix_forecast_states_dirty", "dirty"),)
+
 
 class OCRDocument(db.Model):
     __tablename__ = "ocr_documents"
@@ -184,3 +243,19 @@ class APIKey(db.Model):
     scopes = db.Column(db.Text)
     revoked = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    run_after = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    __table_args__ = (db.Index("ix_jobs_status_run_after", "status", "run_after"),)
@@ -0,0 +1,16 @@
+from models import Alert
+from repositories.base_repository import BaseRepository
+from typing import List
+
+
+class AlertRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(Alert)
+
+    def findByBusiness(self, business_id: int) -> List[Alert]:
+        """Find alerts by business"""
+        return self.find_by(business_id=business_id)
+
+    def findUnresolved(self, business_id: int) -> List[Alert]:
+        """Find unresolved alerts for business"""
+        return self.find_by(business_id=business_id, resolved=False)
@@ -1,14 +1,18 @@
 from flask_sqlalchemy import SQLAlchemy
 from models import db
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence
 from datetime import datetime, date
 from decimal import Decimal
+import base64
+import json
+from utils.serializer import serializer_for
 
 
 class BaseRepository:
-    def __init__(self, model):
+    def __init__(self, model, serializer=None):
         self.model = model
         self.db = db
+        self.serializer = serializer or serializer_for(model)
 
     def all(self) -> List[Any]:
         """Get all records"""
@@ -157,6 +161,108 @@ class BaseRepository:
             "has_prev": paginated.has_prev,
         }
 
+    def keyset_paginate(
+        self,
+        query,
+        columns: Sequence[Any],
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+    ) -> Dict[str, Any]:
+        """Paginate by the last seen key instead of OFFSET/COUNT.
+
+        ``columns`` must identify a row uniquely (end with the primary key).
+        Each page is an index range scan no matter how deep it is.
+        """
+        if cursor:
+            values = self.decode_cursor(cursor, columns)
+            query = query.filter(self._after_key(columns, values, descending))
+
+        query = query.order_by(
+            *[column.desc() if descending else column.asc() for column in columns]
+        )
+
+        # One extra row tells us whether another page exists
+        rows = query.limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = self.encode_cursor(
+                [getattr(last, column.key) for column in columns]
+            )
+
+        return {"data": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+    @staticmethod
+    def _after_key(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+        """(c1, c2, ...) < (v1, v2, ...) spelled out for every backend"""
+        column, value = columns[0], values[0]
+        beyond = column < value if descending else column > value
+        if len(columns) == 1:
+            return beyond
+        return db.or_(
+            beyond,
+            db.and_(
+                column == value,
+                BaseRepository._after_key(columns[1:], values[1:], descending),
+            ),
+        )
+
+    @staticmethod
+    def encode_cursor(values: Sequence[Any]) -> str:
+        """Opaque cursor for a row key"""
+        payload = json.dumps(
+            [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values],
+            default=str,
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+        """Inverse of encode_cursor; raises ValueError on a malformed cursor"""
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            try:
+                if python_type is date:
+                    value = date.fromisoformat(value)
+                elif python_type is datetime:
+                    value = datetime.fromisoformat(value)
+                elif python_type is Decimal:
+                    value = Decimal(str(value))
+                else:
+                    value = python_type(value)
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            decoded.append(value)
+        return decoded
+
+    def read_only(self, query=None, fields: Optional[Sequence[str]] = None):
+        """Project a query onto plain columns for read-only listings.
+
+        Returns lightweight result rows (attribute access like the model)
+        instead of ORM instances, so there is no identity-map bookkeeping or
+        instance state per row. Defaults to the serializer's fields; filters,
+        joins and ordering already on ``query`` are kept.
+        """
+        if query is None:
+            query = self.model.query
+        names = fields or self.serializer.fields
+        return query.with_entities(*[getattr(self.model, name) for name in names])
+
     def with_relations(self, *relations) -> "BaseRepository":
         """Eager load relationships"""
         self.query = self.model.query.options(*relations)
@@ -164,19 +270,8 @@ class BaseRepository:
 
     def to_dict(self, instance: Any) -> Dict[str, Any]:
         """Convert model instance to dictionary"""
-        result = {}
-        for column in instance.__table__.columns:
-            value = getattr(instance, column.name)
-            if isinstance(value, datetime):
-                result[column.name] = value.isoformat()
-            elif isinstance(value, date):
-                result[column.name] = value.isoformat()
-            elif isinstance(value, Decimal):
-                result[column.name] = float(value)
-            else:
-                result[column.name] = value
-        return result
+        return self.serializer.one(instance)
 
     def to_dict_list(self, instances: List[Any]) -> List[Dict[str, Any]]:
         """Convert list of instances to list of dictionaries"""
-        return [self.to_dict(instance) for instance in instances]
+        return self.serializer.many(instances)
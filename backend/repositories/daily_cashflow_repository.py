@@ -0,0 +1,205 @@
+from models import db, DailyCashflow, Transaction
+from repositories.base_repository import BaseRepository
+from repositories.forecast_state_repository import ForecastStateRepository
+from typing import List, Optional, Dict, Any
+from datetime import date
+from decimal import Decimal
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+
+
+class DailyCashflowRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(DailyCashflow)
+
+    def findByDateRange(
+        self, business_id: int, start_date: date, end_date: date
+    ) -> List[DailyCashflow]:
+        """Find rollup buckets within date range"""
+        return self.model.query.filter(
+            self.model.business_id == business_id,
+            self.model.date >= start_date,
+            self.model.date <= end_date,
+        ).all()
+
+    def applyDelta(
+        self,
+        business_id: int,
+        bucket_date: date,
+        direction: str,
+        category_id: Optional[int],
+        amount: Decimal,
+        count: int,
+    ) -> None:
+        """Add amount/count to a (business, date, direction, category) bucket.
+
+        Runs inside the caller's session; nothing is committed here so the
+        rollup change lands in the same transaction as the row it mirrors.
+        The business's forecast state is marked dirty from bucket_date.
+        """
+        self.applyDeltas({(business_id, bucket_date, direction, category_id): (amount, count)})
+
+    def applyDeltas(self, deltas: Dict[tuple, tuple]) -> None:
+        """Apply many bucket deltas at once.
+
+        ``deltas`` maps (business_id, date, direction, category_id) to
+        (amount, count). Every bucket is written with one atomic upsert, so
+        concurrent writers adding to the same new bucket both land in it;
+        buckets left empty are then deleted. Nothing is committed here.
+        """
+        if not deltas:
+            return
+
+        changed = {}
+        for business_id, bucket_date, _, _ in deltas:
+            changed[business_id] = min(bucket_date, changed.get(business_id, bucket_date))
+        ForecastStateRepository().markDirtyMany(changed)
+
+        self._upsert(
+            [
+                {
+                    "business_id": business_id,
+                    "date": bucket_date,
+                    "direction": direction,
+                    "category_id": category_id,
+                    "category_key": category_id or 0,
+                    "total": amount,
+                    "count": count,
+                }
+                for (business_id, bucket_date, direction, category_id), (amount, count) in deltas.items()
+            ]
+        )
+
+        if any(count < 0 for _, count in deltas.values()):
+            dates = [key[1] for key in deltas]
+            self.model.query.filter(
+                self.model.business_id.in_(list(changed)),
+                self.model.date >= min(dates),
+                self.model.date <= max(dates),
+                self.model.count <= 0,
+            ).delete(synchronize_session=False)
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        """INSERT the buckets, adding to total/count where the bucket exists"""
+        table = self.model.__table__
+        dialect = self.db.session.get_bind().dialect.name
+
+        if dialect in ("mysql", "mariadb"):
+            statement = mysql.insert(table)
+            statement = statement.on_duplicate_key_update(
+                total=table.c.total + statement.inserted.total,
+                count=table.c.count + statement.inserted.count,
+            )
+        else:
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = insert(table)
+            statement = statement.on_conflict_do_update(
+                index_elements=["business_id", "date", "direction", "category_key"],
+                set_={
+                    "total": table.c.total + statement.excluded.total,
+                    "count": table.c.count + statement.excluded.count,
+                },
+            )
+
+        self.db.session.execute(statement, rows)
+
+    def addTransaction(self, transaction: Transaction) -> None:
+        """Add a transaction to its rollup bucket"""
+        self.applyDelta(
+            transaction.business_id,
+            transaction.date,
+            transaction.direction,
+            transaction.category_id,
+            Decimal(str(transaction.amount)),
+            1,
+        )
+
+    def removeTransaction(self, snapshot: Dict[str, Any]) -> None:
+        """Remove a transaction (as captured by snapshot()) from its bucket"""
+        self.applyDelta(
+            snapshot["business_id"],
+            snapshot["date"],
+            snapshot["direction"],
+            snapshot["category_id"],
+            -Decimal(str(snapshot["amount"])),
+            -1,
+        )
+
+    @staticmethod
+    def snapshot(transaction: Transaction) -> Dict[str, Any]:
+        """Capture the rollup key and amount of a transaction before it changes"""
+        return {
+            "business_id": transaction.business_id,
+            "date": transaction.date,
+            "direction": transaction.direction,
+            "category_id": transaction.category_id,
+            "amount": transaction.amount,
+        }
+
+    def rebuild(self, business_id: Optional[int] = None) -> int:
+        """Recompute rollup buckets from the transactions table.
+
+        Returns the number of buckets written.
+        """
+        delete_query = self.model.query
+        source_query = db.session.query(
+            Transaction.business_id,
+            Transaction.date,
+            Transaction.direction,
+            Transaction.category_id,
+            db.func.sum(Transaction.amount),
+            db.func.count(Transaction.id),
+        )
+
+        if business_id is not None:
+            delete_query = delete_query.filter(self.model.business_id == business_id)
+            source_query = source_query.filter(Transaction.business_id == business_id)
+
+        delete_query.delete(synchronize_session=False)
+        ForecastStateRepository().markForRefit(business_id)
+
+        buckets = [
+            {
+                "business_id": row[0],
+                "date": row[1],
+                "direction": row[2],
+                "category_id": row[3],
+                "total": row[4] or Decimal("0"),
+                "count": row[5],
+            }
+            for row in source_query.group_by(
+                Transaction.business_id,
+                Transaction.date,
+                Transaction.direction,
+                Transaction.category_id,
+            )
+        ]
+
+        if buckets:
+            self.db.session.bulk_insert_mappings(self.model, buckets)
+
+        self.db.session.commit()
+        return len(buckets)
+
+    def getTotalByDateRange(
+        self, business_id: int, start_date: date, end_date: date
+    ) -> Dict[str, Decimal]:
+        """Get total inflow and outflow by date range"""
+        totals = dict(
+            db.session.query(self.model.direction, db.func.sum(self.model.total))
+            .filter(
+                self.model.business_id == business_id,
+                self.model.date >= start_date,
+                self.model.date <= end_date,
+            )
+            .group_by(self.model.direction)
+            .all()
+        )
+
+        inflow_total = totals.get("inflow") or Decimal("0")
+        outflow_total = totals.get("outflow") or Decimal("0")
+
+        return {
+            "inflow": inflow_total,
+            "outflow": outflow_total,
+            "net": inflow_total - outflow_total,
+        }
@@ -0,0 +1,71 @@
+from models import db, Business, ForecastState
+from repositories.base_repository import BaseRepository
+from typing import Dict, List, Optional
+from datetime import date
+
+
+class ForecastStateRepository(BaseRepository):
+    def __init__(self):
+        super().__init__(ForecastState)
+
+    def findByBusinesses(self, business_ids: List[int]) -> Dict[int, ForecastState]:
+        """Forecast states of the given businesses, keyed by business id"""
+        states = self.model.query.filter(self.model.business_id.in_(business_ids))
+        return {state.business_id: state for state in states}
+
+    def findIdsToRefresh(self, run_date: date, refit_before: date) -> List[int]:
+        """
+        Businesses an incremental refresh as of run_date has to touch: no
+        state yet, marked dirty, not yet extended to run_date (clean ones
+        still need the quiet days rolled in), or last refitted from scratch
+        before refit_before
+        """
+        rows = (
+            db.session.query(Business.id)
+            .outerjoin(self.model, self.model.business_id == Business.id)
+            .filter(
+                db.or_(
+                    self.model.id.is_(None),
+                    self.model.dirty.is_(True),
+                    self.model.refitted_on < refit_before,
+                    self.model.high_water_date.is_(None),
+                    self.model.high_water_date < run_date,
+                )
+            )
+            .order_by(Business.id)
+        )
+        return [row.id for row in rows]
+
+    def markDirty(self, business_id: int, from_date: date) -> None:
+        """Flag a business's state as stale from from_date on; nothing is committed here"""
+        self.markDirtyMany({business_id: from_date})
+
+    def markDirtyMany(self, changes: Dict[int, date]) -> None:
+        """markDirty for {business_id: earliest changed date}, one UPDATE per business"""
+        for business_id, from_date in changes.items():
+            self.model.query.filter(self.model.business_id == business_id).update(
+                {
+                    self.model.dirty: True,
+                    self.model.dirty_from: db.case(
+                        (self.model.dirty_from.is_(None), from_date),
+                        (self.model.dirty_from > from_date, from_date),
+                        else_=self.model.dirty_from,
+                    ),
+                    self.model.revision: self.model.revision + 1,
+                },
+                synchronize_session=False,
+            )
+
+    def markForRefit(self, business_id: Optional[int] = None) -> None:
+        """Drop the high-water mark so the next refresh refits from scratch"""
+        query = self.model.query
+        if business_id is not None:
+            query = query.filter(self.model.business_id == business_id)
+        query.update(
+            {
+                self.model.dirty: True,
+                self.model.high_water_date: None,
+                self.model.revision: self.model.revision + 1,
+            },
+            synchronize_session=False,
+        )
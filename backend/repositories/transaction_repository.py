@@ -1,6 +1,6 @@
-from models import Transaction, Business, Category, OCRDocument
+from models import db, Transaction, Business, Category, OCRDocument
 from repositories.base_repository import BaseRepository
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, Iterable, List, Optional
 from datetime import datetime, date
 from decimal import Decimal
 
@@ -17,6 +17,50 @@ class TransactionRepository(BaseRepository):
         """Find transactions by category"""
         return self.find_by(category_id=category_id)
 
+    def filtered(
+        self,
+        business_id: Optional[int] = None,
+        business_ids: Optional[Iterable[int]] = None,
+        owner_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        direction: Optional[str] = None,
+        category_id: Optional[int] = None,
+        is_anomalous: Optional[bool] = None,
+    ):
+        """Build a transaction query from optional list filters"""
+        query = self.model.query
+        if business_ids is not None:
+            # A plain key filter keeps (business_id, date, id) usable for the ordering
+            query = query.filter(self.model.business_id.in_(sorted(business_ids)))
+        if owner_id is not None:
+            query = query.join(Business).filter(Business.owner_id == owner_id)
+        if business_id is not None:
+            query = query.filter(self.model.business_id == business_id)
+        if start_date is not None:
+            query = query.filter(self.model.date >= start_date)
+        if end_date is not None:
+            query = query.filter(self.model.date <= end_date)
+        if direction is not None:
+            query = query.filter(self.model.direction == direction)
+        if category_id is not None:
+            query = query.filter(self.model.category_id == category_id)
+        if is_anomalous:
+            query = query.filter(self.model.is_anomalous == True)  # noqa: E712
+        elif is_anomalous is not None:
+            query = query.filter(
+                db.or_(self.model.is_anomalous == False, self.model.is_anomalous.is_(None))  # noqa: E712
+            )
+        return query
+
+    def findPage(
+        self, query, limit: int = 50, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Newest-first page of transactions keyed on (date, id)"""
+        return self.keyset_paginate(
+            query, [self.model.date, self.model.id], limit=limit, cursor=cursor
+        )
+
     def findByDirection(self, direction: str) -> List[Transaction]:
         """Find transactions by direction (inflow/outflow)"""
         return self.find_by(direction=direction)
@@ -31,6 +75,25 @@ class TransactionRepository(BaseRepository):
             self.model.date <= end_date,
         ).all()
 
+    def findForAnalysis(self, business_id: int, start_date: date, end_date: date):
+        """Rows for AI analysis in a date range, category name joined in one query"""
+        return (
+            db.session.query(
+                self.model.date,
+                self.model.amount,
+                self.model.direction,
+                self.model.description,
+                Category.name.label("category"),
+            )
+            .outerjoin(Category, self.model.category_id == Category.id)
+            .filter(
+                self.model.business_id == business_id,
+                self.model.date >= start_date,
+                self.model.date <= end_date,
+            )
+            .all()
+        )
+
     def findByAmountRange(
         self, business_id: int, min_amount: Decimal, max_amount: Decimal
     ) -> List[Transaction]:
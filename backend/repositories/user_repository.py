@@ -5,10 +5,14 @@ from sqlalchemy.orm import joinedload
 from datetime import datetime, date
 from decimal import Decimal
 from utils.crypto import hash_password
+from utils.serializer import ModelSerializer
+
+# The password hash never leaves the repository
+user_serializer = ModelSerializer(User, exclude=("password",))
 
 class UserRepository(BaseRepository):
     def __init__(self):
-        super().__init__(User)
+        super().__init__(User, user_serializer)
 
     def findByEmail(self, email: str) -> Optional[User]:
         """Find user by email"""
@@ -24,6 +28,10 @@ class UserRepository(BaseRepository):
         user_data["password"] = hash_password(password)
         return self.create(user_data)
 
+    def updatePassword(self, user_id: int, password: str) -> Optional[User]:
+        """Replace a user's password hash"""
+        return self.update(user_id, {"password": hash_password(password)})
+
     def updateLastLogin(self, user_id: int) -> Optional[User]:
         """Update user last login"""
         from datetime import datetime
@@ -51,22 +59,3 @@ class UserRepository(BaseRepository):
             .filter_by(id=user_id)
             .first()
         )
-
-    def to_dict(self, instance: User) -> Dict[str, Any]:
-        """Convert user model instance to dictionary without password field"""
-        result = {}
-        for column in instance.__table__.columns:
-            # Skip the password field
-            if column.name == 'password':
-                continue
-
-            value = getattr(instance, column.name)
-            if isinstance(value, datetime):
-                result[column.name] = value.isoformat()
-            elif isinstance(value, date):
-                result[column.name] = value.isoformat()
-            elif isinstance(value, Decimal):
-                result[column.name] = float(value)
-            else:
-                result[column.name] = value
-        return result
@@ -4,7 +4,7 @@ from controllers.business_controller import BusinessController
 from middleware import validate_json
 from models import User
 from middleware.auth import AuthenticationMiddleware
-from utils.crypto import hash_password
+from utils.crypto import verify_password
 import os
 
 auth_bp = Blueprint("auth", __name__)
@@ -19,9 +19,9 @@ def login():
     data = request.get_json()
 
     user = User.query.filter_by(email=data["email"]).first()
-    hashed_password = hash_password(data["password"])
 
-    if not user or user.password != hashed_password:
+    # Hashes are salted, so compare with verify_password rather than rehashing
+    if not user or not verify_password(data["password"], user.password):
         return jsonify({"error": "Invalid credentials"}), 401
 
     token = AuthenticationMiddleware.generate_token(user.id, os.getenv("SECRET_KEY"))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Nightly batch forecasts (and risk scores) for every business.
+
+Safe to rerun: businesses already forecast for the date are skipped, so a
+run that crashed picks up where it stopped. Stored model states are
+extended with the new days where nothing older changed. Schedule it once a
+day, e.g.:
+
+    15 2 * * *  cd /app/backend && python run_forecasts.py --incremental
+
+Usage:
+    python run_forecasts.py                         # as of yesterday, settings from env
+    python run_forecasts.py --incremental           # only new days and due refits/risk scores
+    python run_forecasts.py --workers 4 --batch-size 200
+    python run_forecasts.py --date 2024-06-30 --restart --full-refit
+"""
+
+import argparse
+from datetime import date
+
+from app import app
+from services.forecasting.batch import NightlyForecaster
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run nightly batch forecasts")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="Last day of history to use (default: yesterday)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: FORECAST_BATCH_WORKERS)")
+    parser.add_argument("--batch-size", type=int, default=None, help="Businesses per transaction (default: FORECAST_BATCH_SIZE)")
+    parser.add_argument("--horizon-days", type=int, default=None)
+    parser.add_argument("--granularity", choices=("daily", "weekly", "monthly"), default=None)
+    parser.add_argument("--no-risk", action="store_true", help="Skip the Monte Carlo risk scores")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoints and forecast every business again")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip businesses already forecast for the date, and re-simulate risk only for "
+        "refitted businesses or scores older than FORECAST_RISK_DAYS",
+    )
+    parser.add_argument("--full-refit", action="store_true", help="Refit every model from scratch instead of extending stored states")
+    args = parser.parse_args()
+
+    forecaster = NightlyForecaster(
+        horizon_days=args.horizon_days,
+        granularity=args.granularity,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        risk=not args.no_risk,
+        incremental=args.incremental,
+        reuse_state=not args.full_refit,
+    )
+
+    with app.app_context():
+        print("📈 Nightly forecasting")
+        totals = forecaster.run(args.date, resume=not args.restart, progress=lambda line: print(f"   {line}"))
+
+    rate = (totals["forecasts"] / totals["elapsed_seconds"]) if totals["elapsed_seconds"] else 0
+    print(
+        f"✅ {totals['forecasts']} forecasts ({totals['extended']} from stored state) and "
+        f"{totals['risk_scores']} risk scores for {totals['run_date']} "
+        f"in {totals['elapsed_seconds']}s ({rate:.1f} businesses/s)"
+    )
+    if totals["failed_chunks"]:
+        print(f"⚠️  {totals['failed_chunks']} chunks failed; rerun to retry them.")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from utils.crypto import hash_password
+from repositories.daily_cashflow_repository import DailyCashflowRepository
 import random, hashlib
 
 from models import (
@@ -9,6 +10,7 @@ from models import (
     Business,
     Category,
     Transaction,
+    DailyCashflow,
     OCRDocument,
     Model,
     ModelRun,
@@ -42,6 +44,7 @@ class DatabaseSeeder:
         db.session.query(Forecast).delete()
         db.session.query(ModelRun).delete()
         db.session.query(Model).delete()
+        db.session.query(DailyCashflow).delete()
         db.session.query(Transaction).delete()
         db.session.query(OCRDocument).delete()
         db.session.query(Category).delete()
@@ -77,7 +80,7 @@ class DatabaseSeeder:
         ]
 
         for user_data in users_data:
-            # Hash password using SHA256 with 255 character limit
+            # Salted scrypt hash (see utils.crypto); fits the 255 character column
             password = user_data["password"]
             hashed_password = hash_password(password)
             user_data["password"] = hashed_password
@@ -307,6 +310,9 @@ class DatabaseSeeder:
         db.session.commit()
         print(f"Created {len(self.transactions)} transactions.")
 
+        buckets = DailyCashflowRepository().rebuild()
+        print(f"Rebuilt {buckets} daily cashflow buckets.")
+
     def seed_ocr_documents(self):
         print("Seeding OCR documents...")
 
@@ -0,0 +1,191 @@
+import os
+import random
+import threading
+import time
+
+import httpx
+import openai
+from openai import OpenAI
+
+from utils.instrumentation import instrumentation
+
+
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class AIClientMetrics:
+    """Process-wide counters for the shared LLM client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.clients_created = 0
+            self.client_reuses = 0
+            self.requests = 0
+            self.retries = 0
+            self.errors = 0
+            self.throttled = 0
+            self.total_latency = 0.0
+            self.max_latency = 0.0
+
+    def record(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self.requests += 1
+            self.total_latency += seconds
+            self.max_latency = max(self.max_latency, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            lookups = self.clients_created + self.client_reuses
+            return {
+                "clients_created": self.clients_created,
+                "client_reuses": self.client_reuses,
+                "pool_reuse_ratio": self.client_reuses / lookups if lookups else 0.0,
+                "requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "avg_latency_ms": (self.total_latency / self.requests * 1000)
+                if self.requests
+                else 0.0,
+                "max_latency_ms": self.max_latency * 1000,
+            }
+
+
+metrics = AIClientMetrics()
+
+
+class _Completions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, **kwargs):
+        return self._client._call(self._client.raw.chat.completions.create, **kwargs)
+
+
+class _Chat:
+    def __init__(self, client):
+        self.completions = _Completions(client)
+
+
+class PooledAIClient:
+    """
+    Thin wrapper around a shared OpenAI client. Exposes the same
+    ``chat.completions.create`` call, bounded by a process-wide concurrency
+    limit and retried with jittered exponential backoff on transient errors.
+    """
+
+    def __init__(self, raw, semaphore, max_retries, backoff_base, backoff_max, acquire_timeout):
+        self.raw = raw
+        self.chat = _Chat(self)
+        self._semaphore = semaphore
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._acquire_timeout = acquire_timeout
+
+    def _call(self, method, **kwargs):
+        attempt = 0
+        while True:
+            if not self._semaphore.acquire(timeout=self._acquire_timeout):
+                metrics.record(throttled=1)
+                raise RuntimeError("Too many concurrent AI requests")
+
+            started = time.perf_counter()
+            try:
+                return method(**kwargs)
+            except RETRYABLE_ERRORS:
+                if attempt >= self._max_retries:
+                    metrics.record(errors=1)
+                    raise
+            except Exception:
+                metrics.record(errors=1)
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                metrics.record_latency(elapsed)
+                instrumentation.add("ai", elapsed)
+                self._semaphore.release()
+
+            # Full jitter keeps workers that failed together from retrying together
+            delay = random.uniform(
+                0, min(self._backoff_max, self._backoff_base * (2 ** attempt))
+            )
+            attempt += 1
+            metrics.record(retries=1)
+            with instrumentation.timer("ai"):
+                time.sleep(delay)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+_semaphore = None
+
+
+def get_ai_client(api_key, base_url):
+    """
+    Return the process-wide client for this endpoint, creating it (and its
+    HTTP connection pool) on first use.
+    """
+    global _semaphore
+
+    # Keyed by pid so a forked worker never reuses its parent's sockets
+    key = (os.getpid(), api_key, base_url)
+    client = _clients.get(key)
+    if client is not None:
+        metrics.record(client_reuses=1)
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            metrics.record(client_reuses=1)
+            return client
+
+        if _semaphore is None:
+            _semaphore = threading.BoundedSemaphore(
+                int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+            )
+
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("AI_MAX_CONNECTIONS", "20")),
+                max_keepalive_connections=int(os.getenv("AI_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=float(os.getenv("AI_KEEPALIVE_EXPIRY", "60")),
+            ),
+            timeout=httpx.Timeout(
+                float(os.getenv("AI_TIMEOUT", "30")),
+                connect=float(os.getenv("AI_CONNECT_TIMEOUT", "5")),
+            ),
+        )
+        raw = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=http_client,
+            max_retries=0,  # retries are handled by PooledAIClient
+        )
+
+        client = PooledAIClient(
+            raw,
+            _semaphore,
+            max_retries=int(os.getenv("AI_MAX_RETRIES", "3")),
+            backoff_base=float(os.getenv("AI_BACKOFF_BASE", "0.5")),
+            backoff_max=float(os.getenv("AI_BACKOFF_MAX", "8")),
+            acquire_timeout=float(os.getenv("AI_ACQUIRE_TIMEOUT", "30")),
+        )
+        _clients[key] = client
+        metrics.record(clients_created=1)
+        return client
@@ -1,4 +1,5 @@
-from openai import OpenAI
+from services.ai_client import get_ai_client
+from services.insight_cache import fingerprint, insight_cache
 import os
 import json
 
@@ -9,10 +10,8 @@ class AIService:
         self.model = os.getenv("KOLOSAL_MODEL", "Llama 4 Maverick")
 
         if self.api_key:
-            self.client = OpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url
-            )
+            # Shared per process so keep-alive connections survive across requests
+            self.client = get_ai_client(self.api_key, self.base_url)
         else:
             self.client = None
             print("Warning: KOLOSAL_API_KEY not set. AI features will be disabled.")
@@ -57,6 +56,24 @@ class AIService:
         if not self.client:
             return "AI analysis unavailable (API Key missing)."
 
+        # Identical inputs get identical advice; skip the (up to two) completions
+        cache_key = fingerprint(["forecast_insight", self.model], forecast_data)
+        cached = insight_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        insight = self._request_forecast_insight(forecast_data)
+        if insight is not None:
+            insight_cache.set(cache_key, insight)
+            return insight
+
+        return self._last_insight_error
+
+    def _request_forecast_insight(self, forecast_data):
+        """
+        Runs the forecast insight completion(s). Returns None on failure and
+        leaves the user-facing error message in self._last_insight_error.
+        """
         tools = [
             {
                 "type": "function",
@@ -158,55 +175,156 @@ class AIService:
             Model: {self.model}
             Base URL: {self.base_url}
             """)
-            return f"AI analysis failed: {str(e)}"
+            self._last_insight_error = f"AI analysis failed: {str(e)}"
+            return None
 
     def analyze_transaction_anomaly(self, transaction_data):
-         """
-         Analyzes a transaction to determine if it's anomalous and why.
-         Returns a dictionary with keys: is_anomalous, tag, reason.
-         """
-         if not self.client:
-             return {"is_anomalous": False, "tag": "AI Unavailable", "reason": "API Key missing"}
-         
-         try:
-             prompt = f"""
-             Analyze this transaction for potential anomalies or fraud:
-             - Description: {transaction_data.get('description')}
-             - Amount: {transaction_data.get('amount')}
-             - Date: {transaction_data.get('date')}
-             - Category: {transaction_data.get('category')}
-             - Direction: {transaction_data.get('direction')}
-             
-             Determine if this is unusual.
-             
-             You must respond in valid JSON format only, with no extra text.
-             JSON Schema:
-             {{
+        """
+        Analyzes a transaction to determine if it's anomalous and why.
+        Returns a dictionary with keys: is_anomalous, tag, reason.
+        API errors and replies that are not JSON raise, so the calling job
+        backs off and retries instead of storing a placeholder verdict.
+        """
+        if not self.client:
+            return {"is_anomalous": False, "tag": "AI Unavailable", "reason": "API Key missing"}
+
+        prompt = f"""
+        Analyze this transaction for potential anomalies or fraud:
+        - Description: {transaction_data.get('description')}
+        - Amount: {transaction_data.get('amount')}
+        - Date: {transaction_data.get('date')}
+        - Category: {transaction_data.get('category')}
+        - Direction: {transaction_data.get('direction')}
+
+        Determine if this is unusual.
+
+        You must respond in valid JSON format only, with no extra text.
+        JSON Schema:
+        {{
+           "is_anomalous": boolean,
+           "tag": "string (Short classification, e.g. 'High Value', 'Unusual Category', 'Normal')",
+           "reason": "string (Brief explanation)"
+        }}
+        """
+
+        response = self.client.chat.completions.create(
+            model="Llama 4 Maverick",
+            messages=[
+                {"role": "system", "content": "You are a fraud detection AI. Respond only in JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=150
+        )
+
+        return self._parse_json_content(response.choices[0].message.content)
+
+    def analyze_transaction_anomalies(self, transactions, batch_size=20):
+        """
+        Analyzes many transactions with one chat completion per batch.
+        Returns a list of dictionaries (is_anomalous, tag, reason) aligned with
+        the input. Items the model skips or answers malformed are retried one
+        by one through analyze_transaction_anomaly.
+
+        A failed completion or a reply that is not JSON raises instead, as
+        in analyze_transaction_anomaly: the same outage would fail every
+        per-item retry too, so the caller's job backs off and tries the
+        whole batch again.
+        """
+        if not self.client:
+            return [
+                {"is_anomalous": False, "tag": "AI Unavailable", "reason": "API Key missing"}
+                for _ in transactions
+            ]
+
+        results = []
+        for start in range(0, len(transactions), batch_size):
+            chunk = transactions[start : start + batch_size]
+            parsed = self._analyze_anomaly_batch(chunk)
+
+            for index, transaction_data in enumerate(chunk):
+                result = parsed.get(index)
+                if result is None:
+                    result = self.analyze_transaction_anomaly(transaction_data)
+                results.append(result)
+
+        return results
+
+    def _analyze_anomaly_batch(self, transactions):
+        """
+        Sends one prompt for a batch of transactions and returns the valid
+        verdicts keyed by their index in the batch. API and JSON errors
+        propagate to the caller.
+        """
+        lines = "\n".join(
+            f"{index}. Description: {item.get('description')} | Amount: {item.get('amount')}"
+            f" | Date: {item.get('date')} | Category: {item.get('category')}"
+            f" | Direction: {item.get('direction')}"
+            for index, item in enumerate(transactions)
+        )
+
+        prompt = f"""
+        Analyze each of these transactions for potential anomalies or fraud:
+        {lines}
+
+        Determine for every transaction whether it is unusual.
+
+        You must respond in valid JSON format only, with no extra text: a JSON
+        array with exactly one object per transaction, using its number as "index".
+        JSON Schema:
+        [
+            {{
+                "index": integer,
                 "is_anomalous": boolean,
                 "tag": "string (Short classification, e.g. 'High Value', 'Unusual Category', 'Normal')",
                 "reason": "string (Brief explanation)"
-             }}
-             """
-             
-             response = self.client.chat.completions.create(
-                model="Llama 4 Maverick",
-                messages=[
-                    {"role": "system", "content": "You are a fraud detection AI. Respond only in JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150
-            )
-             
-             content = response.choices[0].message.content.strip()
-             
-             # Clean up markdown code blocks if present
-             if content.startswith("```json"):
-                 content = content[7:]
-             if content.endswith("```"):
-                 content = content[:-3]
-                 
-             return json.loads(content.strip())
-             
-         except Exception as e:
-             print(f"AI Anomaly Analysis Error: {e}")
-             return {"is_anomalous": False, "tag": "Analysis Failed", "reason": str(e)}
+            }}
+        ]
+        """
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a fraud detection AI. Respond only in JSON."},
+                {"role": "user", "content": prompt},
+            ],
+            max_tokens=60 + 80 * len(transactions),
+        )
+        items = self._parse_json_content(response.choices[0].message.content)
+
+        if isinstance(items, dict):
+            items = items.get("results", [])
+        if not isinstance(items, list):
+            return {}
+
+        parsed = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = item.get("index")
+            if (
+                not isinstance(index, int)
+                or not 0 <= index < len(transactions)
+                or not isinstance(item.get("is_anomalous"), bool)
+            ):
+                continue
+            parsed[index] = {
+                "is_anomalous": item["is_anomalous"],
+                "tag": str(item.get("tag") or ("Anomalous" if item["is_anomalous"] else "Normal")),
+                "reason": str(item.get("reason") or ""),
+            }
+
+        return parsed
+
+    @staticmethod
+    def _parse_json_content(content):
+        content = content.strip()
+
+        # Clean up markdown code blocks if present
+        if content.startswith("```json"):
+            content = content[7:]
+        elif content.startswith("```"):
+            content = content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+
+        return json.loads(content.strip())
@@ -0,0 +1,117 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+
+from models import db, Transaction
+
+
+NORMAL = "normal"
+OUTLIER = "outlier"
+ESCALATE = "escalate"
+
+
+class StatisticalAnomalyDetector:
+    """
+    In-process pre-filter for transaction anomaly scoring.
+
+    Each transaction is compared with the recent history of its business,
+    category and direction using a robust z-score (median/MAD) and Tukey IQR
+    fences. Clearly normal and clearly extreme amounts are decided locally;
+    only borderline cases, or groups without enough history, are escalated
+    to the LLM.
+    """
+
+    def __init__(self):
+        self.z_normal = float(os.getenv("ANOMALY_Z_NORMAL", "2.5"))
+        self.z_outlier = float(os.getenv("ANOMALY_Z_OUTLIER", "6.0"))
+        self.min_history = int(os.getenv("ANOMALY_MIN_HISTORY", "8"))
+        self.history_days = int(os.getenv("ANOMALY_HISTORY_DAYS", "365"))
+        self.history_limit = int(os.getenv("ANOMALY_HISTORY_LIMIT", "500"))
+
+    def score(self, transactions):
+        """
+        Returns a list of (decision, robust_z) tuples aligned with the input,
+        where decision is one of NORMAL, OUTLIER or ESCALATE. robust_z is
+        None when there was not enough history to compute it.
+        """
+        results = [(ESCALATE, None)] * len(transactions)
+        candidate_ids = [transaction.id for transaction in transactions]
+
+        groups = {}
+        for position, transaction in enumerate(transactions):
+            key = (transaction.business_id, transaction.category_id, transaction.direction)
+            groups.setdefault(key, []).append(position)
+
+        for (business_id, category_id, direction), positions in groups.items():
+            latest = max(transactions[p].date for p in positions)
+            history = self._load_history(
+                business_id, category_id, direction, latest, candidate_ids
+            )
+            if history.size < self.min_history:
+                continue
+
+            amounts = np.array(
+                [float(transactions[p].amount) for p in positions], dtype=np.float64
+            )
+            for position, result in zip(positions, self._classify(amounts, history)):
+                results[position] = result
+
+        return results
+
+    def _classify(self, amounts, history):
+        median = np.median(history)
+        mad = np.median(np.abs(history - median)) * 1.4826
+        if mad == 0:
+            # Degenerate history (e.g. a fixed subscription fee); fall back to
+            # mean absolute deviation so small changes still register
+            mad = np.mean(np.abs(history - median)) * 1.2533
+
+        q1, q3 = np.percentile(history, [25, 75])
+        iqr = q3 - q1
+
+        deviation = np.abs(amounts - median)
+        if mad > 0:
+            robust_z = deviation / mad
+        else:
+            robust_z = np.where(deviation == 0, 0.0, np.inf)
+
+        inside_inner = (amounts >= q1 - 1.5 * iqr) & (amounts <= q3 + 1.5 * iqr)
+        outside_outer = (amounts < q1 - 3 * iqr) | (amounts > q3 + 3 * iqr)
+
+        normal = (robust_z <= self.z_normal) & inside_inner
+        outlier = (robust_z >= self.z_outlier) & outside_outer
+
+        decisions = np.where(normal, NORMAL, np.where(outlier, OUTLIER, ESCALATE))
+        return [
+            (str(decision), float(z)) for decision, z in zip(decisions, robust_z)
+        ]
+
+    def _load_history(self, business_id, category_id, direction, latest, exclude_ids):
+        query = db.session.query(Transaction.amount).filter(
+            Transaction.business_id == business_id,
+            Transaction.direction == direction,
+            Transaction.date >= latest - timedelta(days=self.history_days),
+            Transaction.date <= latest,
+            Transaction.id.notin_(exclude_ids),
+        )
+        if category_id is None:
+            query = query.filter(Transaction.category_id.is_(None))
+        else:
+            query = query.filter(Transaction.category_id == category_id)
+
+        rows = (
+            query.order_by(Transaction.date.desc(), Transaction.id.desc())
+            .limit(self.history_limit)
+            .all()
+        )
+        return np.array([float(amount) for (amount,) in rows], dtype=np.float64)
+
+
+def format_tag(decision, robust_z):
+    """Compact ai_tag value (fits the 50-character column)"""
+    if robust_z is None:
+        return f"stat:{decision}"
+    if np.isinf(robust_z):
+        return f"stat:{decision} z=inf"
+    return f"stat:{decision} z={robust_z:.2f}"
@@ -0,0 +1,2 @@
+from services.forecasting.engine import ForecastEngine, resolve_business_model
+from services.forecasting.methods import ForecastResult, METHODS, resolve_method
@@ -0,0 +1,405 @@
+"""
+Nightly batch forecasting for every business.
+
+Businesses are processed in chunks. A chunk loads the daily history of all
+of its businesses with one query, fits each group of businesses that share
+a model type and params as one vectorized batch, and writes the ModelRuns,
+Forecasts and RiskScores in a single transaction together with a
+checkpoint row in the jobs table. A rerun for the same date skips the
+businesses whose chunk committed, so a crash resumes where it stopped.
+
+Fitted states are kept in forecast_states. When nothing changed at or
+before a business's high-water mark, its stored state is extended with
+just the newer days instead of being refitted over the whole history.
+That includes businesses with no new transactions: their quiet days are
+rolled in as zeros, so an incremental run leaves every business forecast
+from the same run date as a full one.
+
+Risk scores resample the whole history, so an incremental run only
+re-simulates the businesses it refits from scratch and those whose latest
+risk score is older than risk_days; history is loaded for just those.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from multiprocessing import get_context
+
+import numpy as np
+
+from models import db, Business, Forecast, ForecastState, Job, RiskScore
+from repositories.forecast_state_repository import ForecastStateRepository
+from services.forecasting.engine import (
+    ENGINE_VERSION,
+    ForecastEngine,
+    _scalar_state,
+    resolve_business_models,
+    to_decimal,
+)
+from services.forecasting.methods import METHODS, resolve_method
+from services.risk import RiskEngine
+
+
+CHECKPOINT_KIND = "forecast_batch"
+
+
+class NightlyForecaster:
+    """
+    Forecast the next horizon_days for every business as of run_date, with
+    a Monte Carlo risk score per forecast. Chunks of batch_size businesses
+    run on `workers` processes (in this process when workers is 1). With
+    incremental, businesses whose stored state already reaches run_date
+    are skipped; the rest (new transactions, no stored state, a refit due
+    every refit_days, or just days gone by) are forecast, and risk is
+    re-simulated only on a refit or once the last score is risk_days old.
+    """
+
+    def __init__(self, horizon_days=None, granularity=None, batch_size=None, workers=None,
+                 risk=True, incremental=False, reuse_state=True, refit_days=None, risk_days=None):
+        self.horizon_days = int(horizon_days or os.getenv("FORECAST_BATCH_HORIZON_DAYS", "30"))
+        self.granularity = granularity or os.getenv("FORECAST_BATCH_GRANULARITY", "weekly")
+        self.batch_size = int(batch_size or os.getenv("FORECAST_BATCH_SIZE", "100"))
+        self.workers = int(workers or os.getenv("FORECAST_BATCH_WORKERS", "1"))
+        self.refit_days = int(refit_days or os.getenv("FORECAST_REFIT_DAYS", "30"))
+        self.risk_days = int(risk_days or os.getenv("FORECAST_RISK_DAYS", "7"))
+        self.risk = risk
+        self.incremental = incremental
+        self.reuse_state = reuse_state
+
+    def options(self):
+        return {
+            "horizon_days": self.horizon_days,
+            "granularity": self.granularity,
+            "batch_size": self.batch_size,
+            "workers": 1,
+            "risk": self.risk,
+            "incremental": self.incremental,
+            "reuse_state": self.reuse_state,
+            "refit_days": self.refit_days,
+            "risk_days": self.risk_days,
+        }
+
+    def completed_ids(self, run_date):
+        """Businesses already forecast for run_date by a committed chunk"""
+        completed = set()
+        checkpoints = Job.query.with_entities(Job.payload).filter(
+            Job.kind == CHECKPOINT_KIND, Job.status == "completed"
+        )
+        for (payload,) in checkpoints:
+            if payload and payload.get("run_date") == run_date.isoformat():
+                completed.update(payload.get("business_ids") or ())
+        return completed
+
+    def run(self, run_date=None, resume=True, progress=print):
+        """
+        Forecast every pending business (only those not yet forecast from
+        run_date when incremental) as of run_date, by default yesterday, the
+        last complete day. Returns the run's totals.
+        """
+        run_date = run_date or date.today() - timedelta(days=1)
+        if self.incremental:
+            business_ids = ForecastStateRepository().findIdsToRefresh(
+                run_date, run_date - timedelta(days=self.refit_days - 1)
+            )
+        else:
+            business_ids = [row.id for row in Business.query.with_entities(Business.id).order_by(Business.id)]
+        skipped = self.completed_ids(run_date) if resume else set()
+        pending = [business_id for business_id in business_ids if business_id not in skipped]
+        chunks = [
+            pending[index : index + self.batch_size]
+            for index in range(0, len(pending), self.batch_size)
+        ]
+
+        totals = {
+            "run_date": run_date.isoformat(),
+            "businesses": len(business_ids),
+            "resumed": len(business_ids) - len(pending),
+            "forecasts": 0,
+            "extended": 0,
+            "risk_scores": 0,
+            "failed_chunks": 0,
+        }
+        progress(
+            f"Forecasting {len(pending)} businesses in {len(chunks)} chunks "
+            f"({totals['resumed']} already done for {run_date.isoformat()})"
+        )
+        started = time.perf_counter()
+
+        def record(chunk, outcome):
+            if isinstance(outcome, Exception):
+                totals["failed_chunks"] += 1
+                progress(f"Chunk starting at business {chunk[0]} failed: {outcome}")
+                return
+            for key in ("forecasts", "extended", "risk_scores"):
+                totals[key] += outcome[key]
+            progress(
+                f"Chunk starting at business {chunk[0]}: {outcome['forecasts']} forecasts "
+                f"({outcome['extended']} from stored state)"
+            )
+
+        if self.workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                try:
+                    outcome = self.forecast_chunk(chunk, run_date)
+                except Exception as e:
+                    outcome = e
+                record(chunk, outcome)
+        else:
+            # Workers open their own connections; do not hand them ours
+            db.session.remove()
+            db.engine.dispose()
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=get_context("fork"),
+                initializer=_init_worker,
+            ) as executor:
+                futures = {
+                    executor.submit(_forecast_chunk, self.options(), chunk, run_date): chunk
+                    for chunk in chunks
+                }
+                for future in as_completed(futures):
+                    try:
+                        outcome = future.result()
+                    except Exception as e:
+                        outcome = e
+                    record(futures[future], outcome)
+
+        totals["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+        return totals
+
+    def forecast_chunk(self, business_ids, run_date):
+        """Forecast one chunk of businesses and commit it with its checkpoint"""
+        started_at = datetime.utcnow()
+        try:
+            outcome = self._forecast_chunk(business_ids, run_date)
+            db.session.add(
+                Job(
+                    kind=CHECKPOINT_KIND,
+                    payload={"run_date": run_date.isoformat(), "business_ids": business_ids, **outcome},
+                    status="completed",
+                    attempts=1,
+                    started_at=started_at,
+                    finished_at=datetime.utcnow(),
+                )
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return outcome
+
+    def _forecast_chunk(self, business_ids, run_date):
+        engine = ForecastEngine()
+        period_start = run_date + timedelta(days=1)
+        period_end = run_date + timedelta(days=self.horizon_days)
+
+        businesses = Business.query.filter(Business.id.in_(business_ids)).order_by(Business.id).all()
+        models = resolve_business_models(businesses)
+        states = ForecastStateRepository().findByBusinesses(business_ids)
+        revisions = {business_id: state.revision for business_id, state in states.items()}
+
+        # Businesses sharing a model type and params are fitted as one batch;
+        # those extending a stored state are also grouped by high-water mark
+        groups = {}
+        for row, business in enumerate(businesses):
+            model = models[business.id]
+            key = (
+                (model.model_type or "").lower(),
+                json.dumps(model.params or {}, sort_keys=True),
+                self._reusable_high_water(states.get(business.id), model, run_date),
+            )
+            groups.setdefault(key, []).append(row)
+
+        # Full history is loaded only for full fits and due risk scores
+        refit_rows = {row for key, rows in groups.items() if key[-1] is None for row in rows}
+        risk_rows = self._risk_rows(businesses, refit_rows) if self.risk else set()
+        history_rows = sorted(refit_rows | risk_rows)
+        position = {row: index for index, row in enumerate(history_rows)}
+        Y = history_start = None
+        if history_rows:
+            Y, history_start = engine.load_history(
+                [businesses[row].id for row in history_rows], run_date
+            )
+
+        forecasts = []
+        extended = 0
+        for (_, _, high_water), rows in groups.items():
+            model = models[businesses[rows[0]].id]
+            if high_water is None:
+                result, method_name, notes = engine.fit_forecast(
+                    model.model_type, model.params, Y[[position[row] for row in rows]], self.horizon_days
+                )
+                first_day, observations = history_start, Y.shape[1]
+            else:
+                # Only the days after the high-water mark are loaded and smoothed
+                first_day = high_water + timedelta(days=1)
+                Y_new, _ = engine.load_history(
+                    [businesses[row].id for row in rows], run_date, start_date=first_day
+                )
+                method_name = states[businesses[rows[0]].id].method
+                result = METHODS[method_name]().update(
+                    _stack_states([states[businesses[row].id].state for row in rows]),
+                    Y_new,
+                    self.horizon_days,
+                )
+                notes = [f"Extended the stored state with {Y_new.shape[1]} new days."]
+                observations = Y_new.shape[1]
+                extended += len(rows)
+
+            for index, row in enumerate(rows):
+                business = businesses[row]
+                summary = engine.summarize(
+                    result.mean[index], result.variance[index], run_date,
+                    period_start, period_end, self.granularity,
+                )
+                model_run = engine.record_run(
+                    models[business.id], business.id, first_day, run_date, observations,
+                    period_start, period_end, self.granularity, summary, method_name,
+                    _scalar_state(result.state, index), notes,
+                )
+                summary["method"] = method_name
+                summary["engine_version"] = ENGINE_VERSION
+
+                forecast = Forecast(
+                    business_id=business.id,
+                    model_run=model_run,
+                    model_id=models[business.id].id,
+                    granularity=self.granularity,
+                    period_start=period_start,
+                    period_end=period_end,
+                    predicted_value=to_decimal(summary["predicted_value"]),
+                    lower_bound=to_decimal(summary["lower_bound"]),
+                    upper_bound=to_decimal(summary["upper_bound"]),
+                    forecast_metadata={"engine": summary, "batch_run": run_date.isoformat()},
+                )
+                db.session.add(forecast)
+                forecasts.append((row, business, forecast))
+
+                self._save_state(
+                    states, business, models[business.id], method_name,
+                    _state_row(result.state, index), run_date, refitted=high_water is None,
+                )
+        db.session.flush()
+
+        # Clear the dirty flag unless a transaction write bumped the revision
+        # after the state was read; that business is refreshed again next run
+        for business in businesses:
+            ForecastState.query.filter(
+                ForecastState.business_id == business.id,
+                ForecastState.revision == revisions.get(business.id, 0),
+            ).update({ForecastState.dirty: False, ForecastState.dirty_from: None}, synchronize_session=False)
+
+        risk_scores = 0
+        if risk_rows:
+            risk_engine = RiskEngine()
+            for row, business, forecast in forecasts:
+                if row not in risk_rows:
+                    continue
+                # Resample only from the business's own first day with data
+                history = Y[position[row]]
+                observed = np.flatnonzero(history)
+                if not observed.size:
+                    continue
+                first = int(observed[0])
+                risk_engine.assess_business(
+                    business,
+                    forecast,
+                    history=(history[first:], history_start + timedelta(days=first)),
+                )
+                risk_scores += 1
+
+        return {"forecasts": len(forecasts), "extended": extended, "risk_scores": risk_scores}
+
+    def _risk_rows(self, businesses, refit_rows):
+        """
+        Rows to re-simulate risk for: all of them in a full run; in an
+        incremental one the refitted rows and those without a risk score
+        from the last risk_days
+        """
+        if not self.incremental:
+            return set(range(len(businesses)))
+
+        cutoff = datetime.utcnow() - timedelta(days=self.risk_days)
+        recent = {
+            business_id
+            for (business_id,) in db.session.query(RiskScore.business_id)
+            .filter(
+                RiskScore.business_id.in_([business.id for business in businesses]),
+                RiskScore.assessed_at >= cutoff,
+            )
+            .distinct()
+        }
+        return refit_rows | {
+            row for row, business in enumerate(businesses) if business.id not in recent
+        }
+
+    def _reusable_high_water(self, record, model, run_date):
+        """
+        The high-water mark to extend a stored state from, or None when the
+        business needs a full fit: no usable state, a different model or
+        params, changes at or before the mark, or a refit is due.
+        """
+        if not self.reuse_state or record is None or not record.state:
+            return None
+        if record.high_water_date is None or record.high_water_date > run_date:
+            return None
+        if record.model_id != model.id or record.state.get("model_params") != (model.params or {}):
+            return None
+        if record.method != resolve_method(model.model_type)[0] or not hasattr(METHODS[record.method], "update"):
+            return None
+        if record.dirty and (record.dirty_from is None or record.dirty_from <= record.high_water_date):
+            return None
+        if record.refitted_on is None or (run_date - record.refitted_on).days >= self.refit_days:
+            return None
+        return record.high_water_date
+
+    @staticmethod
+    def _save_state(states, business, model, method_name, state, run_date, refitted):
+        record = states.get(business.id)
+        if record is None:
+            record = ForecastState(business_id=business.id, dirty=False, revision=0)
+            db.session.add(record)
+            states[business.id] = record
+
+        record.model_id = model.id
+        record.method = method_name
+        record.state = {**state, "model_params": model.params or {}}
+        record.high_water_date = run_date
+        if refitted:
+            record.refitted_on = run_date
+        record.updated_at = datetime.utcnow()
+
+
+def _state_row(state, row):
+    """One series' slice of a fitted state, as JSON-friendly values"""
+    values = {}
+    for key, value in state.items():
+        value = np.asarray(value)
+        values[key] = value.item() if value.ndim == 0 else value[row].tolist()
+    return values
+
+
+def _stack_states(rows):
+    """Stack per-series states saved by _state_row back into one batch state"""
+    stacked = {}
+    for key in rows[0]:
+        values = [row[key] for row in rows]
+        if isinstance(values[0], (dict, str)):
+            continue
+        if not isinstance(values[0], list) and all(value == values[0] for value in values):
+            stacked[key] = values[0]
+        else:
+            stacked[key] = np.array(values, dtype=np.float64)
+    return stacked
+
+
+def _init_worker():
+    from app import app
+
+    app.app_context().push()
+
+
+def _forecast_chunk(options, business_ids, run_date):
+    return NightlyForecaster(**options).forecast_chunk(business_ids, run_date)
@@ -0,0 +1,315 @@
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from statistics import NormalDist
+
+import numpy as np
+
+from models import db, DailyCashflow, Model, ModelRun
+from services.forecasting.methods import (
+    FALLBACKS,
+    METHODS,
+    MeanMethod,
+    minimum_history,
+    resolve_method,
+)
+
+
+FORECASTING_TYPES = set(METHODS) | set(FALLBACKS)
+ENGINE_VERSION = "native-1"
+GRANULARITIES = ("daily", "weekly", "monthly")
+# Days from the end of history to period_end; bounds the fit and the risk horizon
+MAX_HORIZON_DAYS = int(os.getenv("FORECAST_MAX_HORIZON_DAYS", "1095"))
+
+
+def validate_period(period_start, period_end, granularity):
+    """ValueError unless the period and granularity can be forecast"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if period_end < period_start:
+        raise ValueError("period_end must not be before period_start")
+
+    history_end = min(period_start - timedelta(days=1), date.today())
+    if (period_end - history_end).days > MAX_HORIZON_DAYS:
+        raise ValueError(
+            f"period_end must be at most {MAX_HORIZON_DAYS} days after "
+            "period_start or today, whichever is earlier"
+        )
+
+
+class ForecastEngine:
+    """
+    Server-side cashflow forecasting.
+
+    History comes from the daily_cashflow rollup as one net-flow value per
+    day (inflow minus outflow), so loading a business costs O(days). The
+    assigned Model's type picks the method; results are aggregated into the
+    requested period and granularity with prediction intervals.
+    """
+
+    def __init__(self, history_days=None, confidence=None):
+        self.history_days = int(history_days or os.getenv("FORECAST_HISTORY_DAYS", "1095"))
+        self.confidence = float(confidence or os.getenv("FORECAST_CONFIDENCE", "0.95"))
+        self.z = NormalDist().inv_cdf(0.5 + self.confidence / 2)
+
+    def load_history(self, business_ids, end_date, start_date=None):
+        """
+        Daily net cashflow for each business as a dense (n, days) matrix
+        ending at end_date. Days without transactions are zero. Returns
+        (Y, start_date); start_date is the first day with data in the batch,
+        or the given start_date when the window should start there.
+        """
+        window_start = start_date or end_date - timedelta(days=self.history_days - 1)
+        net_amount = db.func.sum(
+            db.case(
+                (DailyCashflow.direction == "inflow", DailyCashflow.total),
+                else_=-DailyCashflow.total,
+            )
+        )
+        rows = (
+            db.session.query(DailyCashflow.business_id, DailyCashflow.date, net_amount)
+            .filter(
+                DailyCashflow.business_id.in_(business_ids),
+                DailyCashflow.date >= window_start,
+                DailyCashflow.date <= end_date,
+            )
+            .group_by(DailyCashflow.business_id, DailyCashflow.date)
+            .all()
+        )
+
+        if not rows and start_date is None:
+            return np.zeros((len(business_ids), 0)), end_date + timedelta(days=1)
+
+        start_date = start_date or min(row[1] for row in rows)
+        days = (end_date - start_date).days + 1
+        position = {business_id: index for index, business_id in enumerate(business_ids)}
+
+        Y = np.zeros((len(business_ids), days))
+        for business_id, day, amount in rows:
+            Y[position[business_id], (day - start_date).days] = float(amount or 0)
+
+        return Y, start_date
+
+    def fit_forecast(self, model_type, params, Y, horizon):
+        """
+        Run the method for model_type over Y. Returns (result, method_name,
+        notes); falls back to the historical mean when history is too short.
+        """
+        method_name, substituted = resolve_method(model_type)
+        notes = []
+        if substituted:
+            notes.append(
+                f"No native '{model_type}' implementation; used {method_name}."
+            )
+            params = {}
+
+        params = params or {}
+        if Y.shape[1] < minimum_history(method_name, params):
+            notes.append(
+                f"Only {Y.shape[1]} days of history; used the historical mean."
+            )
+            method_name = "mean"
+
+        if Y.shape[1] == 0:
+            # No cashflow at all yet: forecast zero with zero spread
+            return MeanMethod().fit_forecast(np.zeros((Y.shape[0], 1)), horizon), method_name, notes
+
+        method = METHODS[method_name](**params)
+        return method.fit_forecast(Y, horizon), method_name, notes
+
+    def summarize(self, mean, variance, history_end, period_start, period_end, granularity):
+        """
+        Aggregate one series' daily forecast into the period total and its
+        granularity buckets. Forecast errors are summed as if independent.
+        """
+        first = (period_start - history_end).days - 1
+        last = (period_end - history_end).days - 1
+
+        def interval(lo, hi):
+            predicted = float(mean[lo : hi + 1].sum())
+            spread = self.z * float(np.sqrt(variance[lo : hi + 1].sum()))
+            return predicted, predicted - spread, predicted + spread
+
+        predicted, lower, upper = interval(first, last)
+
+        periods = []
+        bucket_start = first
+        for offset in range(first, last + 1):
+            day = history_end + timedelta(days=offset + 1)
+            next_day = day + timedelta(days=1)
+            if granularity == "weekly":
+                closes = (offset - first + 1) % 7 == 0
+            elif granularity == "monthly":
+                closes = next_day.month != day.month
+            else:
+                closes = True
+
+            if closes or offset == last:
+                p, lo, hi = interval(bucket_start, offset)
+                periods.append(
+                    {
+                        "period_start": (
+                            history_end + timedelta(days=bucket_start + 1)
+                        ).isoformat(),
+                        "period_end": day.isoformat(),
+                        "predicted_value": round(p, 2),
+                        "lower_bound": round(lo, 2),
+                        "upper_bound": round(hi, 2),
+                    }
+                )
+                bucket_start = offset + 1
+
+        return {
+            "predicted_value": round(predicted, 2),
+            "lower_bound": round(lower, 2),
+            "upper_bound": round(upper, 2),
+            "periods": periods,
+        }
+
+    def forecast_business(self, business, period_start, period_end, granularity, model=None):
+        """
+        Forecast net cashflow for one business over [period_start, period_end]
+        and record the run. Adds a ModelRun (and, if the business had no
+        forecasting model, a default Model) to the session without committing.
+        Returns (summary, model_run).
+        """
+        model = model or resolve_business_model(business)
+
+        history_end = min(period_start - timedelta(days=1), date.today())
+        horizon = (period_end - history_end).days
+
+        Y, history_start = self.load_history([business.id], history_end)
+        result, method_name, notes = self.fit_forecast(
+            model.model_type, model.params, Y, horizon
+        )
+        summary = self.summarize(
+            result.mean[0], result.variance[0], history_end, period_start, period_end, granularity
+        )
+
+        model_run = self.record_run(
+            model,
+            business.id,
+            history_start,
+            history_end,
+            Y.shape[1],
+            period_start,
+            period_end,
+            granularity,
+            summary,
+            method_name,
+            _scalar_state(result.state),
+            notes,
+        )
+        db.session.flush()
+
+        summary["method"] = method_name
+        summary["engine_version"] = ENGINE_VERSION
+        return summary, model_run
+
+    def record_run(self, model, business_id, history_start, history_end, observations,
+                   period_start, period_end, granularity, summary, method_name, parameters, notes):
+        """Add the ModelRun for one business's forecast to the session"""
+        model_run = ModelRun(
+            model_id=model.id,
+            input_summary={
+                "business_id": business_id,
+                "history_start": history_start.isoformat(),
+                "history_end": history_end.isoformat(),
+                "observations": int(observations),
+                "period_start": period_start.isoformat(),
+                "period_end": period_end.isoformat(),
+                "granularity": granularity,
+            },
+            output_summary={
+                "method": method_name,
+                "confidence": self.confidence,
+                "predicted_value": summary["predicted_value"],
+                "lower_bound": summary["lower_bound"],
+                "upper_bound": summary["upper_bound"],
+                "parameters": parameters,
+            },
+            run_status="completed",
+            notes=" ".join(notes) or None,
+        )
+        db.session.add(model_run)
+        model.last_trained_at = datetime.utcnow()
+        return model_run
+
+
+def resolve_business_model(business):
+    """
+    The business's most recent forecasting model; creates a default
+    Holt-Winters model (uncommitted) when it has none.
+    """
+    model = (
+        Model.query.filter(
+            Model.business_id == business.id,
+            db.func.lower(Model.model_type).in_(FORECASTING_TYPES),
+        )
+        .order_by(Model.created_at.desc(), Model.id.desc())
+        .first()
+    )
+    if model:
+        return model
+
+    model = Model(
+        business_id=business.id,
+        name=f"{business.name} Holt-Winters",
+        model_type="holt_winters",
+        params={},
+        version=ENGINE_VERSION,
+    )
+    db.session.add(model)
+    db.session.flush()
+    return model
+
+
+def resolve_business_models(businesses):
+    """
+    resolve_business_model for many businesses with one query; returns
+    {business_id: Model}. Default models are added (uncommitted) and flushed.
+    """
+    models = {}
+    rows = (
+        Model.query.filter(
+            Model.business_id.in_([business.id for business in businesses]),
+            db.func.lower(Model.model_type).in_(FORECASTING_TYPES),
+        )
+        .order_by(Model.created_at.desc(), Model.id.desc())
+        .all()
+    )
+    for model in rows:
+        models.setdefault(model.business_id, model)
+
+    for business in businesses:
+        if business.id not in models:
+            models[business.id] = Model(
+                business_id=business.id,
+                name=f"{business.name} Holt-Winters",
+                model_type="holt_winters",
+                params={},
+                version=ENGINE_VERSION,
+            )
+            db.session.add(models[business.id])
+    db.session.flush()
+    return models
+
+
+def to_decimal(value):
+    return Decimal(str(value)) if value is not None else None
+
+
+def _scalar_state(state, row=0):
+    """JSON-friendly view of one series' fitted parameters"""
+    summary = {}
+    for key in ("alpha", "beta", "gamma", "phi", "sigma2", "mean", "d"):
+        value = state.get(key)
+        if value is None:
+            continue
+        value = np.asarray(value, dtype=np.float64)
+        if value.ndim == 2:
+            summary[key] = [round(float(v), 6) for v in value[row]]
+        else:
+            value = value.reshape(-1)
+            summary[key] = round(float(value[row if value.size > 1 else 0]), 6)
+    return summary
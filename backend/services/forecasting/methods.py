@@ -0,0 +1,377 @@
+"""
+Vectorized forecasting methods.
+
+Every method works on a 2-D array ``Y`` of shape (n_series, n_days) so a
+whole batch of businesses is fitted with one pass over the time axis. A
+method returns a ``ForecastResult`` holding the per-day mean forecast and
+forecast-error variance for each series, plus the fitted state needed to
+extend the fit later without replaying the full history.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+import numpy as np
+
+
+WEEKLY_SEASON = 7
+
+
+@dataclass
+class ForecastResult:
+    mean: np.ndarray  # (n_series, horizon)
+    variance: np.ndarray  # (n_series, horizon)
+    state: Dict[str, Any] = field(default_factory=dict)
+
+
+def _residual_variance(residuals, dof=1):
+    """Per-series variance of in-sample one-step residuals (NaNs ignored)"""
+    count = np.sum(~np.isnan(residuals), axis=1)
+    sum_sq = np.nansum(residuals ** 2, axis=1)
+    return sum_sq / np.maximum(count - dof, 1)
+
+
+class MeanMethod:
+    """Historical mean; the fallback when there is too little history"""
+
+    name = "mean"
+
+    def __init__(self, **params):
+        pass
+
+    def fit_forecast(self, Y, horizon):
+        mean = Y.mean(axis=1)
+        sigma2 = Y.var(axis=1, ddof=1) if Y.shape[1] > 1 else np.zeros(len(Y))
+        n = max(Y.shape[1], 1)
+        return ForecastResult(
+            mean=np.repeat(mean[:, None], horizon, axis=1),
+            variance=np.repeat((sigma2 * (1 + 1 / n))[:, None], horizon, axis=1),
+            state={"mean": mean, "sigma2": sigma2},
+        )
+
+
+class SeasonalNaive:
+    """Repeat the last observed season (weekly by default)"""
+
+    name = "seasonal_naive"
+
+    def __init__(self, season_length=WEEKLY_SEASON, **params):
+        self.m = int(season_length)
+
+    def fit_forecast(self, Y, horizon):
+        m = self.m
+        last_season = Y[:, -m:]
+        steps = np.arange(horizon)
+        mean = last_season[:, steps % m]
+
+        residuals = Y[:, m:] - Y[:, :-m]
+        sigma2 = _residual_variance(residuals)
+        # Each additional full season ahead adds one more seasonal error
+        k = steps // m + 1
+        variance = sigma2[:, None] * k[None, :]
+
+        return ForecastResult(
+            mean=mean,
+            variance=variance,
+            state={"last_season": last_season, "sigma2": sigma2},
+        )
+
+
+class HoltWinters:
+    """
+    Additive Holt-Winters (ETS(A,Ad,A)) with a damped trend.
+
+    Smoothing parameters can be fixed through the model params; otherwise a
+    small grid is evaluated for every series at once and each series keeps
+    the combination with the lowest in-sample squared error.
+    """
+
+    name = "holt_winters"
+
+    ALPHA_GRID = (0.1, 0.3, 0.5)
+    BETA_GRID = (0.01, 0.1)
+    GAMMA_GRID = (0.05, 0.2)
+
+    def __init__(self, alpha=None, beta=None, gamma=None, phi=0.98,
+                 season_length=WEEKLY_SEASON, **params):
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.phi = float(phi)
+        self.m = int(season_length)
+
+    def _grid(self):
+        alphas = (self.alpha,) if self.alpha is not None else self.ALPHA_GRID
+        betas = (self.beta,) if self.beta is not None else self.BETA_GRID
+        gammas = (self.gamma,) if self.gamma is not None else self.GAMMA_GRID
+        return np.array(
+            [(a, b, g) for a in alphas for b in betas for g in gammas], dtype=np.float64
+        )
+
+    def initial_state(self, Y):
+        m = self.m
+        first = Y[:, :m].mean(axis=1)
+        second = Y[:, m : 2 * m].mean(axis=1)
+        level = first
+        trend = (second - first) / m
+        season = Y[:, :m] - first[:, None]
+        return level, trend, season
+
+    def smooth(self, Y, level, trend, season, alpha, beta, gamma, start=0):
+        """
+        Run the ETS recursions over Y. ``season`` is a (n, m) ring buffer
+        whose column ``t % m`` holds the seasonal term for step t. Returns
+        the final state and the one-step-ahead residuals.
+        """
+        m = self.m
+        phi = self.phi
+        level = level.copy()
+        trend = trend.copy()
+        season = season.copy()
+        residuals = np.empty_like(Y)
+
+        for t in range(Y.shape[1]):
+            slot = (start + t) % m
+            s = season[:, slot]
+            prediction = level + phi * trend + s
+            error = Y[:, t] - prediction
+            residuals[:, t] = error
+
+            new_level = level + phi * trend + alpha * error
+            trend = phi * trend + beta * error
+            season[:, slot] = s + gamma * error
+            level = new_level
+
+        return level, trend, season, residuals
+
+    def fit_forecast(self, Y, horizon):
+        n, length = Y.shape
+        m = self.m
+        grid = self._grid()
+        g = len(grid)
+
+        level, trend, season = self.initial_state(Y)
+        body = Y[:, 2 * m :]
+
+        # Stack every (series, parameter combination) pair into one batch
+        stacked = np.repeat(body, g, axis=0)
+        alpha = np.tile(grid[:, 0], n)
+        beta = np.tile(grid[:, 1], n)
+        gamma = np.tile(grid[:, 2], n)
+
+        # Season slot for the first smoothed step (t = 2m) is 0 again
+        final_level, final_trend, final_season, residuals = self.smooth(
+            stacked,
+            np.repeat(level, g),
+            np.repeat(trend, g),
+            np.repeat(season, g, axis=0),
+            alpha,
+            beta,
+            gamma,
+        )
+
+        sse = np.nansum(residuals ** 2, axis=1).reshape(n, g)
+        best = np.argmin(sse, axis=1)
+        pick = np.arange(n) * g + best
+
+        state = {
+            "level": final_level[pick],
+            "trend": final_trend[pick],
+            "season": final_season[pick],
+            "alpha": alpha[pick],
+            "beta": beta[pick],
+            "gamma": gamma[pick],
+            "phi": self.phi,
+            "season_length": m,
+            "position": body.shape[1] % m,
+            "sigma2": _residual_variance(residuals[pick], dof=3),
+            "observations": length,
+            "residual_count": body.shape[1],
+        }
+
+        mean, variance = self.forecast_from_state(state, horizon)
+        return ForecastResult(mean=mean, variance=variance, state=state)
+
+    def update(self, state, Y, horizon):
+        """
+        Extend a fitted state with the days in Y (the days right after the
+        state's last observation, one row per series) using the state's
+        smoothing parameters, then forecast from it. Costs O(new days)
+        rather than a refit over the whole history. Per-series values in
+        state may be arrays; "position" may differ between series.
+        """
+        n, length = Y.shape
+        m = self.m = int(state["season_length"])
+        self.phi = float(state["phi"])
+
+        def per_series(key, default=None):
+            value = state.get(key, default)
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)).copy()
+
+        # Rotate each series' season ring buffer so its next slot is column 0
+        position = per_series("position").astype(np.int64)
+        slots = (position[:, None] + np.arange(m)[None, :]) % m
+        season = np.asarray(state["season"], dtype=np.float64)[np.arange(n)[:, None], slots]
+
+        alpha = per_series("alpha")
+        beta = per_series("beta")
+        gamma = per_series("gamma")
+        level, trend, season, residuals = self.smooth(
+            Y, per_series("level"), per_series("trend"), season, alpha, beta, gamma
+        )
+
+        # Fold the new residuals into the running variance estimate
+        observations = per_series("observations")
+        count = per_series("residual_count", observations - 2 * m)
+        sse = per_series("sigma2") * np.maximum(count - 3, 1)
+        sigma2 = (sse + np.nansum(residuals ** 2, axis=1)) / np.maximum(count + length - 3, 1)
+
+        updated = {
+            "level": level,
+            "trend": trend,
+            "season": season,
+            "alpha": alpha,
+            "beta": beta,
+            "gamma": gamma,
+            "phi": self.phi,
+            "season_length": m,
+            "position": length % m,
+            "sigma2": sigma2,
+            "observations": observations + length,
+            "residual_count": count + length,
+        }
+
+        mean, variance = self.forecast_from_state(updated, horizon)
+        return ForecastResult(mean=mean, variance=variance, state=updated)
+
+    def forecast_from_state(self, state, horizon):
+        m = int(state["season_length"])
+        phi = float(state["phi"])
+        steps = np.arange(1, horizon + 1)
+
+        # Damped trend multiplier: phi + phi^2 + ... + phi^h
+        damp = np.cumsum(phi ** steps)
+        slots = (state["position"] + steps - 1) % m
+        mean = (
+            state["level"][:, None]
+            + state["trend"][:, None] * damp[None, :]
+            + state["season"][:, slots]
+        )
+
+        # Approximate ETS(A,Ad,A) h-step variance
+        alpha = state["alpha"][:, None]
+        beta = state["beta"][:, None]
+        gamma = state["gamma"][:, None]
+        c = alpha + beta * damp[None, :]
+        c_sq = np.concatenate(
+            [np.zeros((c.shape[0], 1)), np.cumsum(c[:, :-1] ** 2, axis=1)], axis=1
+        )
+        seasonal_hits = ((steps - 1) // m)[None, :]
+        variance = state["sigma2"][:, None] * (
+            1 + c_sq + seasonal_hits * gamma * (2 * alpha + gamma)
+        )
+
+        return mean, variance
+
+
+class DifferencedAR:
+    """
+    Simple ARIMA(p, d, 0): an AR(p) model fitted by least squares on the
+    d-times differenced series, with all series solved in one batched call.
+    """
+
+    name = "arima"
+
+    def __init__(self, p=1, d=1, **params):
+        self.p = max(int(p), 1)
+        self.d = min(max(int(d), 0), 1)
+
+    def fit_forecast(self, Y, horizon):
+        p = self.p
+        Z = np.diff(Y, axis=1) if self.d else Y
+        n, length = Z.shape
+
+        mu = Z.mean(axis=1, keepdims=True)
+        centered = Z - mu
+
+        # Lagged design matrices: X[:, t, k] = centered[:, t + p - k - 1]
+        X = np.stack(
+            [centered[:, p - k - 1 : length - k - 1] for k in range(p)], axis=2
+        )
+        target = centered[:, p:]
+
+        XtX = np.einsum("ntk,ntj->nkj", X, X) + 1e-6 * np.eye(p)
+        Xty = np.einsum("ntk,nt->nk", X, target)
+        phi = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+
+        # Keep the fit stationary so long horizons do not explode
+        phi = np.clip(phi, -0.98, 0.98)
+
+        residuals = target - np.einsum("ntk,nk->nt", X, phi)
+        sigma2 = _residual_variance(residuals, dof=p)
+
+        history = centered[:, -p:][:, ::-1].copy()  # most recent first
+        forecasts = np.empty((n, horizon))
+        for h in range(horizon):
+            step = np.sum(phi * history, axis=1)
+            forecasts[:, h] = step
+            history = np.concatenate([step[:, None], history[:, :-1]], axis=1)
+        forecasts += mu
+
+        # psi weights of the AR polynomial give the h-step error variance
+        psi = np.zeros((n, horizon))
+        psi[:, 0] = 1.0
+        for h in range(1, horizon):
+            for k in range(min(p, h)):
+                psi[:, h] += phi[:, k] * psi[:, h - k - 1]
+
+        if self.d:
+            mean = Y[:, -1:] + np.cumsum(forecasts, axis=1)
+            psi = np.cumsum(psi, axis=1)
+        else:
+            mean = forecasts
+
+        variance = sigma2[:, None] * np.cumsum(psi ** 2, axis=1)
+
+        return ForecastResult(
+            mean=mean,
+            variance=variance,
+            state={"phi": phi, "mu": mu[:, 0], "sigma2": sigma2, "d": self.d},
+        )
+
+
+METHODS = {
+    "mean": MeanMethod,
+    "seasonal_naive": SeasonalNaive,
+    "naive": SeasonalNaive,
+    "holt_winters": HoltWinters,
+    "ets": HoltWinters,
+    "arima": DifferencedAR,
+}
+
+# Model types that are stored in the models table but have no native
+# implementation are served by the closest available method
+FALLBACKS = {
+    "prophet": "holt_winters",
+    "lstm": "holt_winters",
+}
+
+
+def resolve_method(model_type):
+    """Return (method_name, substituted) for a Model.model_type value"""
+    key = (model_type or "holt_winters").lower()
+    if key in METHODS:
+        return key, False
+    return FALLBACKS.get(key, "holt_winters"), True
+
+
+def minimum_history(method_name, params=None):
+    params = params or {}
+    m = int(params.get("season_length", WEEKLY_SEASON))
+    if method_name in ("holt_winters", "ets"):
+        return 3 * m
+    if method_name in ("seasonal_naive", "naive"):
+        return 2 * m
+    if method_name == "arima":
+        return int(params.get("p", 1)) + 10
+    return 1
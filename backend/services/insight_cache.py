@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def fingerprint(namespace, payload):
+    """
+    Content hash of a JSON-like payload. Dates, Decimals and numeric strings
+    are normalized so the same forecast hashes identically whether it came
+    from a request body or from the database.
+    """
+    normalized = json.dumps(
+        [namespace, _normalize(payload)], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        items = [_normalize(item) for item in value]
+        # Row order from the database is not guaranteed
+        if all(isinstance(item, dict) for item in items):
+            items.sort(key=lambda item: json.dumps(item, sort_keys=True))
+        return items
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(Decimal(value))
+        except Exception:
+            return value
+    return str(value)
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries=512, ttl=86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, time.time() + (ttl or self.ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    On-disk cache tier shared by every worker process on the host. Uses one
+    connection per thread and WAL mode so readers do not block the writer.
+    """
+
+    def __init__(self, path, max_entries=5000, ttl=86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_entries_accessed_at"
+                " ON cache_entries (accessed_at)"
+            )
+
+    def get(self, key):
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is None:
+                return None
+
+            connection.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + (ttl or self.ttl), now),
+            )
+
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict(connection, now)
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache_entries")
+
+    def _evict(self, connection, now):
+        connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+        connection.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            " SELECT key FROM cache_entries ORDER BY accessed_at DESC"
+            " LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+class TieredCache:
+    """In-process LRU in front of an optional shared tier"""
+
+    def __init__(self, memory, shared=None):
+        self.memory = memory
+        self.shared = shared
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None or self.shared is None:
+            return value
+
+        try:
+            value = self.shared.get(key)
+        except sqlite3.Error as e:
+            print(f"Shared cache read failed: {e}")
+            return None
+
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.shared is None:
+            return
+
+        try:
+            self.shared.set(key, value)
+        except sqlite3.Error as e:
+            print(f"Shared cache write failed: {e}")
+
+    def clear(self):
+        self.memory.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+def _build_insight_cache():
+    ttl = int(os.getenv("AI_CACHE_TTL", "86400"))
+    memory = MemoryCache(
+        max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "512")), ttl=ttl
+    )
+
+    shared = None
+    path = os.getenv("AI_CACHE_PATH")
+    if path:
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+        shared = SQLiteCache(
+            path,
+            max_entries=int(os.getenv("AI_CACHE_SHARED_MAX_ENTRIES", "5000")),
+            ttl=ttl,
+        )
+
+    return TieredCache(memory, shared)
+
+
+insight_cache = _build_insight_cache()
@@ -0,0 +1,196 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, Job
+
+
+class JobQueue:
+    """
+    Database-backed background job queue.
+
+    Jobs are rows in the ``jobs`` table, so they are created in the same
+    transaction as the data they refer to and survive worker restarts. Each
+    gunicorn worker runs a small thread pool that executes jobs dispatched
+    from its own requests, plus a poller that picks up anything left pending
+    (retries, jobs from a crashed worker). Claiming a job is a conditional
+    UPDATE, so several processes can share the table safely.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.handlers = {}
+        self.executor = None
+        self.poller = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.max_workers = int(os.getenv("JOB_WORKERS", "2"))
+        self.max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.poll_interval = float(os.getenv("JOB_POLL_INTERVAL", "5"))
+        self.stale_after = int(os.getenv("JOB_STALE_SECONDS", "300"))
+        # Run jobs inline right after dispatch; handy for local debugging
+        self.eager = os.getenv("JOB_QUEUE_EAGER", "false").lower() == "true"
+
+        app.before_request(self._ensure_started)
+
+    def handler(self, kind):
+        """Register a function as the handler for a job kind"""
+
+        def decorator(f):
+            self.handlers[kind] = f
+            return f
+
+        return decorator
+
+    def enqueue(self, kind, payload=None):
+        """
+        Add a job to the current session. It is persisted by the caller's
+        commit; call dispatch() afterwards to start it right away.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+
+        job = Job(kind=kind, payload=payload or {}, status="pending", attempts=0)
+        db.session.add(job)
+        return job
+
+    def dispatch(self, job_id):
+        """Hand a committed job to the local worker pool"""
+        if self.eager:
+            self.run(job_id)
+            return
+
+        self._ensure_started()
+        self.executor.submit(self._run_in_context, job_id)
+
+    def run(self, job_id):
+        """Claim and execute a single job. Returns True if it was executed."""
+        now = datetime.utcnow()
+        claimed = (
+            Job.query.filter(
+                Job.id == job_id,
+                Job.status == "pending",
+                db.or_(Job.run_after.is_(None), Job.run_after <= now),
+            ).update(
+                {
+                    Job.status: "running",
+                    Job.attempts: Job.attempts + 1,
+                    Job.started_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.session.commit()
+
+        if not claimed:
+            return False
+
+        job = Job.query.get(job_id)
+
+        try:
+            self.handlers[job.kind](job.payload or {})
+        except Exception as e:
+            db.session.rollback()
+            print(f"Job {job_id} ({job.kind}) failed: {e}")
+
+            job = Job.query.get(job_id)
+            job.last_error = str(e)
+            if job.attempts < self.max_attempts:
+                job.status = "pending"
+                job.run_after = datetime.utcnow() + timedelta(
+                    seconds=self.poll_interval * (2 ** job.attempts)
+                )
+            else:
+                job.status = "failed"
+                job.finished_at = datetime.utcnow()
+            db.session.commit()
+            return True
+
+        job.status = "completed"
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        return True
+
+    def poll_once(self, limit=50):
+        """Requeue stale running jobs and dispatch due pending ones"""
+        now = datetime.utcnow()
+        stale = db.and_(
+            Job.status == "running",
+            Job.started_at < now - timedelta(seconds=self.stale_after),
+        )
+
+        # A job that keeps killing its worker must not be retried forever
+        Job.query.filter(stale, Job.attempts >= self.max_attempts).update(
+            {
+                Job.status: "failed",
+                Job.finished_at: now,
+                Job.last_error: "Worker stopped while running the job",
+            },
+            synchronize_session=False,
+        )
+        Job.query.filter(stale, Job.attempts < self.max_attempts).update(
+            {Job.status: "pending"}, synchronize_session=False
+        )
+        db.session.commit()
+
+        due_ids = [
+            job_id
+            for (job_id,) in db.session.query(Job.id)
+            .filter(
+                Job.status == "pending",
+                db.or_(Job.run_after.is_(None), Job.run_after <= now),
+            )
+            .order_by(Job.id)
+            .limit(limit)
+        ]
+
+        for job_id in due_ids:
+            self.dispatch(job_id)
+
+        return len(due_ids)
+
+    def shutdown(self):
+        self._stopped.set()
+        if self.executor:
+            self.executor.shutdown(wait=False)
+
+    def _ensure_started(self):
+        if self.executor is not None or self.eager:
+            return
+
+        with self._lock:
+            if self.executor is not None:
+                return
+
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="job-worker"
+            )
+            self.poller = threading.Thread(
+                target=self._poll_forever, name="job-poller", daemon=True
+            )
+            self.poller.start()
+
+    def _run_in_context(self, job_id):
+        with self.app.app_context():
+            try:
+                self.run(job_id)
+            except Exception as e:
+                print(f"Job worker error for job {job_id}: {e}")
+
+    def _poll_forever(self):
+        while not self._stopped.wait(self.poll_interval):
+            with self.app.app_context():
+                try:
+                    self.poll_once()
+                except Exception as e:
+                    print(f"Job poller error: {e}")
+
+
+job_queue = JobQueue()
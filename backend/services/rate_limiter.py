@@ -0,0 +1,223 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+
+
+class MemoryCounterStore:
+    """
+    In-process stand-in for the Redis commands the limiter uses (GET, INCR,
+    EXPIRE). Only shared between threads, so use it for tests and single
+    process development servers.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, name):
+        with self._lock:
+            entry = self._live(name, time.time())
+            return None if entry is None else str(entry[0]).encode()
+
+    def incr(self, name, amount=1):
+        now = time.time()
+        with self._lock:
+            entry = self._live(name, now)
+            value = (entry[0] if entry else 0) + amount
+            self._values[name] = (value, entry[1] if entry else None)
+
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                self._values = {
+                    key: item
+                    for key, item in self._values.items()
+                    if item[1] is None or item[1] > now
+                }
+            return value
+
+    def expire(self, name, time_seconds, nx=False):
+        with self._lock:
+            entry = self._live(name, time.time())
+            if entry is None or (nx and entry[1] is not None):
+                return False
+            self._values[name] = (entry[0], time.time() + time_seconds)
+            return True
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(self._values.pop(name, None) is not None for name in names)
+
+    def _live(self, name, now):
+        entry = self._values.get(name)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._values[name]
+            return None
+        return entry
+
+
+class SQLiteCounterStore:
+    """
+    The same GET/INCR/EXPIRE subset backed by a SQLite file, so every
+    gunicorn worker on the host shares one set of counters. Connections are
+    per thread in WAL mode; INCR runs in an immediate transaction so
+    concurrent workers never lose an increment.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters ("
+            " key TEXT PRIMARY KEY,"
+            " value INTEGER NOT NULL,"
+            " expires_at REAL)"
+        )
+
+    def get(self, name):
+        row = self._connection().execute(
+            "SELECT value FROM rate_limit_counters"
+            " WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (name, time.time()),
+        ).fetchone()
+        return None if row is None else str(row[0]).encode()
+
+    def incr(self, name, amount=1):
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT INTO rate_limit_counters (key, value, expires_at) VALUES (?, ?, NULL)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                "  value = CASE WHEN expires_at IS NOT NULL AND expires_at <= ?"
+                "          THEN excluded.value ELSE value + excluded.value END,"
+                "  expires_at = CASE WHEN expires_at IS NOT NULL AND expires_at <= ?"
+                "               THEN NULL ELSE expires_at END",
+                (name, amount, now, now),
+            )
+            value = connection.execute(
+                "SELECT value FROM rate_limit_counters WHERE key = ?", (name,)
+            ).fetchone()[0]
+
+            self._writes += 1
+            if self._writes % 1000 == 0:
+                connection.execute(
+                    "DELETE FROM rate_limit_counters WHERE expires_at <= ?", (now,)
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return value
+
+    def expire(self, name, time_seconds, nx=False):
+        condition = " AND expires_at IS NULL" if nx else ""
+        cursor = self._connection().execute(
+            "UPDATE rate_limit_counters SET expires_at = ? WHERE key = ?" + condition,
+            (time.time() + time_seconds, name),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, *names):
+        cursor = self._connection().executemany(
+            "DELETE FROM rate_limit_counters WHERE key = ?", [(name,) for name in names]
+        )
+        return cursor.rowcount
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+class SlidingWindowLimiter:
+    """
+    Sliding-window counter rate limiter over a Redis-compatible store.
+
+    Each key keeps one counter per fixed window. The request rate is
+    estimated as the current window's count plus the previous window's count
+    weighted by how much of it still overlaps the sliding window. A check is
+    one GET and one INCR (plus a compensating decrement when rejected),
+    whatever the limit, and the counters expire on their own two windows
+    later.
+    """
+
+    def __init__(self, store, prefix="rate_limit"):
+        self.store = store
+        self.prefix = prefix
+
+    def hit(self, key, limit, window_seconds, now=None):
+        """
+        Count one request for key. Returns (allowed, remaining, retry_after);
+        rejected requests are not counted.
+        """
+        now = time.time() if now is None else now
+        window = int(now // window_seconds)
+        elapsed = (now % window_seconds) / window_seconds
+
+        current_key = f"{self.prefix}:{key}:{window}"
+        previous = _count(self.store.get(f"{self.prefix}:{key}:{window - 1}"))
+        weighted = previous * (1 - elapsed)
+
+        # Increment first and judge the count INCR returned, so concurrent
+        # workers can never admit more than the limit between them
+        count = self.store.incr(current_key)
+        if count == 1:
+            self.store.expire(current_key, window_seconds * 2, nx=True)
+
+        if weighted + count <= limit:
+            return True, max(0, math.floor(limit - weighted - count)), 0
+
+        self.store.incr(current_key, -1)
+        current = count - 1
+        if previous and current + 1 <= limit:
+            # Wait until enough of the previous window has slid out
+            retry = min((weighted + count - limit) / previous, 1 - elapsed)
+        else:
+            # Wait for this window to end and then slide far enough past it
+            retry = (1 - elapsed) + max(0.0, 1 - (limit - 1) / current if current else 0.0)
+        return False, 0, max(1, math.ceil(retry * window_seconds))
+
+
+def _count(value):
+    return int(value) if value is not None else 0
+
+
+def create_store(url):
+    """
+    Counter store for a RATE_LIMIT_STORAGE url: memory://, sqlite:///<path>
+    (relative paths are under the backend directory) or redis://...
+    """
+    if url.startswith("memory://"):
+        return MemoryCounterStore()
+
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        if not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.dirname(__file__)), path)
+        return SQLiteCounterStore(path)
+
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        import redis  # optional; only needed for a Redis store
+
+        return redis.Redis.from_url(url)
+
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE: {url}")
+
+
+rate_limiter = SlidingWindowLimiter(
+    create_store(os.getenv("RATE_LIMIT_STORAGE", "sqlite:///database/rate_limit.db"))
+)
@@ -0,0 +1,2 @@
+from services.risk.engine import RiskEngine
+from services.risk.simulation import SimulationResult, bootstrap_paths, simulate
@@ -0,0 +1,148 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from models import db, RiskScore
+from services.forecasting import ForecastEngine
+from services.forecasting.engine import to_decimal
+from services.risk.simulation import simulate
+
+
+ENGINE_VERSION = "montecarlo-1"
+
+# Simulation memory grows with paths x horizon, so no horizon may exceed this
+MAX_HORIZON_DAYS = int(os.getenv("RISK_MAX_HORIZON_DAYS", "1095"))
+
+
+class RiskEngine:
+    """
+    Monte Carlo cashflow risk assessment.
+
+    Simulates the business's cash balance from Business.settings
+    ["current_cash"] forward by bootstrapping its daily net cashflow history
+    (the same daily_cashflow series the forecasting engine uses). When a
+    source forecast is given, the simulation covers its period and is
+    centred on its predicted value.
+    """
+
+    def __init__(self, paths=None, horizon_days=None, confidence=None, block_days=None):
+        self.paths = int(paths or os.getenv("RISK_PATHS", "10000"))
+        self.horizon_days = int(horizon_days or os.getenv("RISK_HORIZON_DAYS", "365"))
+        self.confidence = float(confidence or os.getenv("RISK_CONFIDENCE", "0.95"))
+        self.block_days = int(block_days or os.getenv("RISK_BLOCK_DAYS", "7"))
+
+    def assess_business(self, business, forecast=None, horizon_days=None, seed=None, history=None):
+        """
+        Simulate one business and add the resulting RiskScore to the
+        session without committing. history, a (Y, start_date) pair from
+        ForecastEngine.load_history, skips loading it again. With a forecast
+        the horizon runs to its period_end, or horizon_days if shorter.
+        Raises ValueError when there is no cashflow history to resample or
+        the horizon exceeds MAX_HORIZON_DAYS.
+        """
+        if forecast is not None:
+            history_end = min(forecast.period_start - timedelta(days=1), date.today())
+            horizon = (forecast.period_end - history_end).days
+            if horizon_days:
+                horizon = min(horizon, int(horizon_days))
+        else:
+            history_end = date.today()
+            horizon = int(horizon_days or self.horizon_days)
+
+        if horizon > MAX_HORIZON_DAYS:
+            raise ValueError(
+                f"Risk horizon of {horizon} days exceeds the {MAX_HORIZON_DAYS} day maximum; "
+                "pass a smaller horizon_days"
+            )
+
+        if history is None:
+            Y, history_start = ForecastEngine().load_history([business.id], history_end)
+            history = Y[0]
+        else:
+            history, history_start = history
+        if len(history) == 0:
+            raise ValueError("No cashflow history to simulate")
+
+        drift = None
+        if forecast is not None and forecast.predicted_value is not None:
+            period_days = (forecast.period_end - forecast.period_start).days + 1
+            drift = float(forecast.predicted_value) / period_days
+
+        settings = business.settings or {}
+        current_cash = settings.get("current_cash")
+        starting_cash = float(current_cash) if current_cash is not None else 0.0
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2**32)
+
+        result = simulate(
+            history,
+            starting_cash,
+            horizon,
+            paths=self.paths,
+            block_days=self.block_days,
+            confidence=self.confidence,
+            drift=drift,
+            seed=seed,
+        )
+
+        risk_score = RiskScore(
+            business_id=business.id,
+            liquidity_score=to_decimal(round(100 * (1 - result.drawdown_prob), 2)),
+            cashflow_risk_score=to_decimal(round(100 * result.cashflow_risk, 2)),
+            volatility_index=to_decimal(round(result.volatility_index, 4)),
+            drawdown_prob=to_decimal(round(result.drawdown_prob, 4)),
+            source_forecast_id=forecast.id if forecast is not None else None,
+            details={
+                "engine_version": ENGINE_VERSION,
+                "method": "block_bootstrap",
+                "paths": self.paths,
+                "horizon_days": horizon,
+                "block_days": self.block_days,
+                "confidence": self.confidence,
+                "seed": seed,
+                "starting_cash": starting_cash,
+                "current_cash_known": current_cash is not None,
+                "history_start": history_start.isoformat(),
+                "history_end": history_end.isoformat(),
+                "observations": int(len(history)),
+                "daily_drift": drift,
+                "var": round(result.var, 2),
+                "cvar": round(result.cvar, 2),
+                "days_to_zero": result.days_to_zero,
+                "overall_risk": _overall_risk(result),
+                "recommendations": _recommendations(result, current_cash is not None),
+                **result.details,
+            },
+        )
+        db.session.add(risk_score)
+        db.session.flush()
+        return risk_score
+
+
+def _overall_risk(result):
+    if result.drawdown_prob >= 0.25:
+        return "High"
+    if result.drawdown_prob >= 0.05 or result.cashflow_risk >= 0.5:
+        return "Medium"
+    return "Low"
+
+
+def _recommendations(result, cash_known):
+    recommendations = []
+    if not cash_known:
+        recommendations.append(
+            "Set current_cash in the business settings; risk was simulated from a zero balance."
+        )
+    if result.days_to_zero is not None:
+        recommendations.append(
+            f"Cash runs out in about {int(result.days_to_zero)} days in the median scenario."
+        )
+    elif result.drawdown_prob >= 0.05:
+        recommendations.append(
+            f"{result.drawdown_prob:.0%} of scenarios run out of cash; "
+            f"a buffer of {result.details['max_drawdown']['p95']:,.0f} covers 95% of drawdowns."
+        )
+    if result.cashflow_risk >= 0.5:
+        recommendations.append("Net cashflow is more likely negative than positive over the horizon.")
+    return recommendations or ["Monitor"]
@@ -0,0 +1,96 @@
+"""
+Vectorized Monte Carlo cash balance simulation.
+
+Future daily net cashflows are drawn by block bootstrap from a business's
+own history: whole runs of ``block_days`` consecutive days are resampled,
+which keeps weekly patterns and short-range correlation that independent
+daily draws would wash out. All paths are simulated at once as a
+(paths, horizon) array, so 10k paths over a year is a handful of NumPy
+operations.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+@dataclass
+class SimulationResult:
+    drawdown_prob: float  # P(cash balance goes below zero within the horizon)
+    cashflow_risk: float  # P(net cashflow over the horizon is negative)
+    var: float  # value at risk of the horizon net cashflow (loss, >= 0)
+    cvar: float  # expected loss beyond the VaR
+    volatility_index: float  # 0..1, spread of horizon net cashflow vs its size
+    days_to_zero: Optional[float]  # median first day below zero, None if most paths never get there
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+def bootstrap_paths(history, paths, horizon, block_days=7, drift=None, rng=None):
+    """
+    (paths, horizon) matrix of simulated daily net flows. drift, when
+    given, recentres the draws on that mean daily flow while keeping the
+    historical spread.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    history = np.asarray(history, dtype=np.float64)
+    if drift is not None:
+        history = history - history.mean() + drift
+
+    block_days = max(1, min(block_days, len(history)))
+    blocks = -(-horizon // block_days)
+    starts = rng.integers(0, len(history) - block_days + 1, size=(paths, blocks))
+    index = (starts[:, :, None] + np.arange(block_days)).reshape(paths, -1)[:, :horizon]
+    return history[index]
+
+
+def simulate(history, starting_cash, horizon, paths=10000, block_days=7,
+             confidence=0.95, drift=None, seed=None):
+    """Simulate cash balances and summarize their risk"""
+    rng = np.random.default_rng(seed)
+    flows = bootstrap_paths(history, paths, horizon, block_days, drift, rng)
+
+    # Running balance, computed in place over the flow matrix
+    balance = np.cumsum(flows, axis=1, out=flows)
+    net = balance[:, -1].copy()
+    balance += starting_cash
+
+    below = balance < 0
+    hit = below.any(axis=1)
+    first_day = np.where(hit, below.argmax(axis=1) + 1, np.inf)
+
+    peak = np.maximum.accumulate(balance, axis=1)
+    np.maximum(peak, starting_cash, out=peak)
+    max_drawdown = (peak - balance).max(axis=1)
+
+    tail = 1 - confidence
+    cutoff = np.quantile(net, tail)
+    var = max(0.0, -float(cutoff))
+    cvar = max(0.0, -float(net[net <= cutoff].mean()))
+
+    spread = float(net.std())
+    volatility_index = spread / (spread + abs(float(net.mean()))) if spread else 0.0
+
+    def quantiles(values):
+        p5, p50, p95 = np.quantile(values, [0.05, 0.5, 0.95])
+        return {"p5": round(float(p5), 2), "p50": round(float(p50), 2), "p95": round(float(p95), 2)}
+
+    return SimulationResult(
+        drawdown_prob=float(hit.mean()),
+        cashflow_risk=float((net < 0).mean()),
+        var=var,
+        cvar=cvar,
+        volatility_index=volatility_index,
+        days_to_zero=_finite_or_none(np.median(first_day)),
+        details={
+            "ending_balance": quantiles(balance[:, -1]),
+            "net_cashflow": quantiles(net),
+            "max_drawdown": quantiles(max_drawdown),
+            "days_to_zero_p10": _finite_or_none(np.quantile(first_day, 0.1)),
+        },
+    )
+
+
+def _finite_or_none(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
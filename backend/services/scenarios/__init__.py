@@ -0,0 +1,3 @@
+from services.scenarios.engine import ScenarioEngine
+from services.scenarios.model import PARAMETERS, evaluate, timeline_days
+from services.scenarios.sweep import ScenarioSweep, grid_size, iter_grid
@@ -0,0 +1,116 @@
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from models import db, DailyCashflow
+from services.scenarios.model import PARAMETERS, evaluate, timeline_days, validate_params, weekly_profile
+from services.scenarios.sweep import ScenarioSweep
+
+
+ENGINE_VERSION = "scenario-1"
+
+
+class ScenarioEngine:
+    """
+    Evaluates Scenario params against a business's baseline cashflow.
+
+    The baseline projection repeats the average inflow and outflow of each
+    weekday over the last SCENARIO_BASELINE_DAYS of the daily_cashflow
+    rollup. Parameter shocks are applied on top of it for every scenario
+    in the batch at once (see services.scenarios.model).
+    """
+
+    def __init__(self, baseline_days=None, horizon_days=None):
+        self.baseline_days = int(baseline_days or os.getenv("SCENARIO_BASELINE_DAYS", "365"))
+        self.horizon_days = int(horizon_days or os.getenv("SCENARIO_HORIZON_DAYS", "365"))
+
+    def load_history(self, business_id, end_date):
+        """Daily (inflow, outflow) arrays over the baseline window ending at end_date"""
+        window_start = end_date - timedelta(days=self.baseline_days - 1)
+        rows = (
+            db.session.query(
+                DailyCashflow.date, DailyCashflow.direction, db.func.sum(DailyCashflow.total)
+            )
+            .filter(
+                DailyCashflow.business_id == business_id,
+                DailyCashflow.date >= window_start,
+                DailyCashflow.date <= end_date,
+            )
+            .group_by(DailyCashflow.date, DailyCashflow.direction)
+            .all()
+        )
+        if not rows:
+            raise ValueError("No cashflow history to build a baseline from")
+
+        history = np.zeros((2, self.baseline_days))
+        for day, direction, total in rows:
+            history[0 if direction == "inflow" else 1, (day - window_start).days] = float(total or 0)
+        return history[0], history[1], window_start
+
+    def baseline(self, business_id, days, end_date=None):
+        """
+        Projected daily (inflow, outflow) for the days after end_date
+        (default today), built from the weekday profile of the history.
+        """
+        end_date = end_date or date.today()
+        inflow, outflow, window_start = self.load_history(business_id, end_date)
+        return self.project(inflow, outflow, window_start, end_date, days)
+
+    @staticmethod
+    def project(inflow, outflow, window_start, end_date, days):
+        first_weekday = (end_date + timedelta(days=1)).weekday()
+        weekdays = (first_weekday + np.arange(days)) % 7
+        in_profile = weekly_profile(inflow, window_start.weekday())
+        out_profile = weekly_profile(outflow, window_start.weekday())
+        return in_profile[weekdays], out_profile[weekdays]
+
+    def evaluate(self, business, params_list, end_date=None):
+        """One result summary per params dict, evaluated in a single pass"""
+        params_list = [params or {} for params in params_list]
+        days = max(timeline_days(params.get("timeline"), self.horizon_days) for params in params_list)
+        inflow, outflow = self.baseline(business.id, days, end_date)
+
+        settings = business.settings or {}
+        starting_cash = float(settings.get("current_cash") or 0)
+        results = evaluate(inflow, outflow, params_list, starting_cash, self.horizon_days)
+
+        evaluated_at = datetime.utcnow().isoformat()
+        for params, result in zip(params_list, results):
+            ignored = sorted(key for key in params if key not in PARAMETERS)
+            if ignored:
+                result["ignored_params"] = ignored
+            result["starting_cash"] = starting_cash
+            result["baseline_days"] = self.baseline_days
+            result["engine_version"] = ENGINE_VERSION
+            result["evaluated_at"] = evaluated_at
+        return results
+
+    def run(self, scenario):
+        """Evaluate one Scenario and store its result_summary (not committed)"""
+        scenario.result_summary = self.evaluate(scenario.business, [scenario.params])[0]
+        return scenario.result_summary
+
+    def sweep(self, business, grid, base=None, workers=None, chunk_size=None, end_date=None, pool=None):
+        """
+        A ScenarioSweep over every combination of grid values merged over
+        base. Values are checked up front so a bad one fails before any
+        worker starts; the baseline covers the longest timeline.
+        """
+        base = base or {}
+        days = validate_params(base, self.horizon_days)
+        for name, values in grid.items():
+            for value in values:
+                days = max(days, validate_params({**base, name: value}, self.horizon_days))
+
+        inflow, outflow = self.baseline(business.id, days, end_date)
+        settings = business.settings or {}
+        return ScenarioSweep(
+            inflow,
+            outflow,
+            starting_cash=float(settings.get("current_cash") or 0),
+            default_days=self.horizon_days,
+            workers=workers,
+            chunk_size=chunk_size,
+            pool=pool,
+        )
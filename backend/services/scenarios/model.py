@@ -0,0 +1,189 @@
+"""
+Vectorized what-if evaluation of scenario parameters.
+
+A batch of parameter sets is turned into per-scenario arrays and applied
+to one baseline projection in a single pass: every intermediate is a
+(scenarios, days) matrix, so hundreds of scenarios cost about as much as
+a few NumPy operations over a year of days.
+
+Supported parameters (all optional):
+
+- ``market_growth``, ``online_channel_growth``: inflow growth reached by
+  the end of the timeline, ramping up linearly from day one
+- ``price_increase``: inflow uplift from day one, scaled by
+  ``customer_retention`` (share of revenue kept, default 1.0)
+- ``cost_reduction_target``: share of outflows cut from day one
+- ``investment``, ``implementation_cost``: one-off outflow on day one
+- ``timeline``: horizon as days or "<n>_days|weeks|months|years"
+
+Numeric parameters must be finite and within PARAMETER_RANGES.
+"""
+
+import math
+import os
+import re
+
+import numpy as np
+
+
+PARAMETERS = (
+    "market_growth",
+    "online_channel_growth",
+    "price_increase",
+    "customer_retention",
+    "cost_reduction_target",
+    "investment",
+    "implementation_cost",
+    "timeline",
+)
+# Accepted (min, max) per numeric parameter; rates are fractions (0.1 = 10%)
+PARAMETER_RANGES = {
+    "market_growth": (-1.0, 10.0),
+    "online_channel_growth": (-1.0, 10.0),
+    "price_increase": (-1.0, 10.0),
+    "customer_retention": (0.0, 1.0),
+    "cost_reduction_target": (-1.0, 1.0),
+    "investment": (0.0, 1e12),
+    "implementation_cost": (0.0, 1e12),
+}
+DAYS_PER_UNIT = {"day": 1, "week": 7, "month": 30, "year": 365}
+# Every intermediate is (scenarios, days), so the horizon bounds memory per scenario
+MAX_HORIZON_DAYS = int(os.getenv("SCENARIO_MAX_HORIZON_DAYS", "1825"))
+_TIMELINE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*_?\s*(day|week|month|year)s?\s*$", re.IGNORECASE)
+
+
+def timeline_days(value, default):
+    """Horizon in days for a timeline parameter; ValueError when unreadable"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        days = float(value)
+    else:
+        match = _TIMELINE.match(str(value))
+        if not match:
+            raise ValueError(f"Invalid timeline '{value}'. Use days or e.g. '18_months'")
+        days = round(float(match.group(1)) * DAYS_PER_UNIT[match.group(2).lower()])
+    # Compare as floats so "1e400" style values fail here rather than in int()
+    if not 1 <= days <= MAX_HORIZON_DAYS:
+        raise ValueError(f"timeline must be between 1 and {MAX_HORIZON_DAYS} days")
+    return int(days)
+
+
+def validate_params(params, default_days):
+    """Horizon in days for one params dict; ValueError for unreadable values"""
+    for name in PARAMETERS[:-1]:
+        _column([params], name, 0.0)
+    return timeline_days(params.get("timeline"), default_days)
+
+
+def weekly_profile(history, start_weekday):
+    """Mean flow for each weekday (Monday first) of a daily series starting on start_weekday"""
+    profile = np.zeros(7)
+    if len(history):
+        weekdays = (start_weekday + np.arange(len(history))) % 7
+        sums = np.bincount(weekdays, weights=history, minlength=7)
+        counts = np.bincount(weekdays, minlength=7)
+        profile = np.divide(sums, counts, out=profile, where=counts > 0)
+    return profile
+
+
+def _column(params_list, name, default):
+    low, high = PARAMETER_RANGES[name]
+    values = []
+    for params in params_list:
+        value = params.get(name)
+        if value is None:
+            values.append(default)
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name} must be a number")
+        # float() also reads "nan" and "inf"
+        if isinstance(value, bool) or not math.isfinite(number):
+            raise ValueError(f"{name} must be a number")
+        if not low <= number <= high:
+            raise ValueError(f"{name} must be between {low:g} and {high:g}")
+        values.append(number)
+    return np.array(values, dtype=np.float64)
+
+
+def evaluate(baseline_inflow, baseline_outflow, params_list, starting_cash=0.0, default_days=365):
+    """
+    Apply each parameter set to the baseline daily inflow/outflow projection
+    (arrays at least as long as the longest timeline) and summarize the
+    outcome against the unchanged baseline. Returns one dict per scenario.
+    """
+    horizons = np.array(
+        [timeline_days(params.get("timeline"), default_days) for params in params_list]
+    )
+    days_total = int(horizons.max())
+    base_in = np.asarray(baseline_inflow, dtype=np.float64)[:days_total]
+    base_out = np.asarray(baseline_outflow, dtype=np.float64)[:days_total]
+
+    growth = _column(params_list, "market_growth", 0.0) + _column(
+        params_list, "online_channel_growth", 0.0
+    )
+    price = (1 + _column(params_list, "price_increase", 0.0)) * _column(
+        params_list, "customer_retention", 1.0
+    )
+    cost_cut = _column(params_list, "cost_reduction_target", 0.0)
+    upfront = _column(params_list, "investment", 0.0) + _column(
+        params_list, "implementation_cost", 0.0
+    )
+
+    days = np.arange(1, days_total + 1)
+    active = days[None, :] <= horizons[:, None]
+    ramp = np.minimum(days[None, :] / horizons[:, None], 1.0)
+
+    inflow = base_in * (1 + growth[:, None] * ramp) * price[:, None] * active
+    outflow = base_out * (1 - cost_cut[:, None]) * active
+    baseline_net = (base_in - base_out) * active
+
+    projected = np.cumsum(inflow - outflow, axis=1)
+    incremental = np.cumsum((inflow - outflow) - baseline_net, axis=1) - upfront[:, None]
+    balance = starting_cash - upfront[:, None] + projected
+
+    projected_net = projected[:, -1] - upfront
+    baseline_total = baseline_net.sum(axis=1)
+    savings = (base_out * active).sum(axis=1) - outflow.sum(axis=1)
+    gain = incremental[:, -1]
+
+    paid_back = (incremental >= 0) & active
+    break_even = np.where(
+        (upfront > 0) & paid_back.any(axis=1), paid_back.argmax(axis=1) + 1, 0
+    )
+    min_balance = np.where(active, balance, np.inf).min(axis=1)
+
+    results = []
+    for index in range(len(params_list)):
+        roi = float(gain[index] / upfront[index]) if upfront[index] > 0 else None
+        if upfront[index] <= 0:
+            break_even_label = None
+        elif break_even[index]:
+            break_even_label = f"{-(-int(break_even[index]) // 30)}_months"
+        else:
+            break_even_label = "not_within_timeline"
+
+        if min_balance[index] < 0 or gain[index] < 0:
+            risk_level = "high" if min_balance[index] < 0 else "medium"
+        else:
+            risk_level = "low"
+
+        results.append(
+            {
+                "horizon_days": int(horizons[index]),
+                "projected_net_cashflow": round(float(projected_net[index]), 2),
+                "baseline_net_cashflow": round(float(baseline_total[index]), 2),
+                "incremental_cashflow": round(float(gain[index]), 2),
+                "projected_savings": round(float(savings[index]), 2),
+                "implementation_cost": round(float(upfront[index]), 2),
+                "projected_roi": round(roi, 4) if roi is not None else None,
+                "break_even": break_even_label,
+                "break_even_days": int(break_even[index]) or None,
+                "ending_cash": round(float(balance[index, horizons[index] - 1]), 2),
+                "min_cash": round(float(min_balance[index]), 2),
+                "risk_level": risk_level,
+            }
+        )
+    return results
@@ -0,0 +1,221 @@
+"""
+Parameter sweeps over a process pool.
+
+Each process keeps one lazily started worker pool that every sweep shares,
+so requests neither pay for starting workers nor multiply them; a small
+number of slots bounds how many sweeps run at once. Workers are started
+with forkserver (or spawn) rather than forked from a threaded server.
+
+The baseline projection is copied once per sweep into a shared memory
+block that workers map read-only, so tasks only carry its name and their
+chunk of parameter dicts. Chunks are submitted a few at a time per worker
+and their results are yielded as they finish; closing the generator or
+calling cancel() drops the chunks that have not started.
+"""
+
+import atexit
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice, product
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from services.scenarios.model import evaluate
+
+
+DEFAULT_WORKERS = int(os.getenv("SCENARIO_SWEEP_WORKERS", "0")) or os.cpu_count() or 1
+DEFAULT_CHUNK_SIZE = int(os.getenv("SCENARIO_SWEEP_CHUNK_SIZE", "500"))
+START_METHOD = os.getenv("SCENARIO_SWEEP_START_METHOD") or (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# Sweeps one process runs at once; the rest are turned away rather than queued
+MAX_CONCURRENT = int(os.getenv("SCENARIO_SWEEP_CONCURRENCY", "2"))
+# Chunks queued per worker; keeps every worker busy without materializing the sweep
+CHUNKS_PER_WORKER = 2
+# Baselines a worker keeps mapped between chunks
+ATTACHED_BASELINES = 4
+
+
+def grid_size(grid):
+    """Number of combinations in a grid of {name: [values]}"""
+    return math.prod(len(values) for values in grid.values()) if grid else 0
+
+
+def iter_grid(grid, base=None):
+    """Lazily yield base params merged with every combination of the grid values"""
+    base = base or {}
+    names = sorted(grid)
+    if not names:
+        return
+    for values in product(*(grid[name] for name in names)):
+        yield {**base, **dict(zip(names, values))}
+
+
+_attached = OrderedDict()
+
+
+def _init_worker():
+    # Ctrl-C is handled by the parent, which cancels the sweep
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _baseline(name):
+    shared = _attached.get(name)
+    if shared is None:
+        shared = _attached[name] = SharedMemory(name=name)
+        # Earlier sweeps have unlinked their blocks; drop the oldest mappings
+        while len(_attached) > ATTACHED_BASELINES:
+            _attached.popitem(last=False)[1].close()
+    _attached.move_to_end(name)
+    return shared
+
+
+def _evaluate_chunk(name, shape, starting_cash, default_days, start, params_list):
+    baseline = np.ndarray(shape, dtype=np.float64, buffer=_baseline(name).buf)
+    baseline.flags.writeable = False
+    try:
+        return start, evaluate(baseline[0], baseline[1], params_list, starting_cash, default_days)
+    finally:
+        # Release the buffer export so the mapping can be closed later
+        del baseline
+
+
+class SweepPool:
+    """
+    A process pool started on first use and shared by every sweep in this
+    process, with slots bounding how many sweeps may use it at once.
+    """
+
+    def __init__(self, workers=None, start_method=None, concurrency=None):
+        self.workers = max(1, int(workers or DEFAULT_WORKERS))
+        self.start_method = start_method or START_METHOD
+        self.slots = threading.BoundedSemaphore(max(1, int(concurrency or MAX_CONCURRENT)))
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a sweep slot without waiting; False when all are in use"""
+        return self.slots.acquire(blocking=False)
+
+    def release(self):
+        self.slots.release()
+
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def reset(self):
+        """Drop a broken pool so the next sweep starts a fresh one"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+sweep_pool = SweepPool()
+atexit.register(sweep_pool.shutdown)
+
+
+class ScenarioSweep:
+    """
+    Evaluate a stream of parameter sets against one baseline across
+    worker processes. Iterate run() for (index, params, result) batches;
+    stats holds the throughput once it finishes or is cancelled.
+    """
+
+    def __init__(
+        self, inflow, outflow, starting_cash=0.0, default_days=365, workers=None, chunk_size=None, pool=None
+    ):
+        self.baseline = np.ascontiguousarray(np.vstack([inflow, outflow]), dtype=np.float64)
+        self.starting_cash = float(starting_cash)
+        self.default_days = int(default_days)
+        self.pool = pool or sweep_pool
+        # A sweep may use fewer of the pool's workers, never more
+        self.workers = min(max(1, int(workers or self.pool.workers)), self.pool.workers)
+        self.chunk_size = max(1, int(chunk_size or DEFAULT_CHUNK_SIZE))
+        self.stats = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop submitting chunks; run() returns after the running ones"""
+        self._cancelled.set()
+
+    def run(self, params_iter):
+        params_iter = iter(params_iter)
+        executor = self.pool.executor()
+        shared = SharedMemory(create=True, size=self.baseline.nbytes)
+        np.ndarray(self.baseline.shape, dtype=np.float64, buffer=shared.buf)[:] = self.baseline
+        task = (shared.name, self.baseline.shape, self.starting_cash, self.default_days)
+
+        started = time.perf_counter()
+        completed = 0
+        pending = {}
+        next_index = 0
+
+        def submit():
+            nonlocal next_index
+            while len(pending) < self.workers * CHUNKS_PER_WORKER and not self._cancelled.is_set():
+                chunk = list(islice(params_iter, self.chunk_size))
+                if not chunk:
+                    return
+                future = executor.submit(_evaluate_chunk, *task, next_index, chunk)
+                pending[future] = chunk
+                next_index += len(chunk)
+
+        try:
+            submit()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    start, results = future.result()
+                    completed += len(results)
+                    yield [
+                        (start + offset, params, result)
+                        for offset, (params, result) in enumerate(zip(chunk, results))
+                    ]
+                submit()
+        except GeneratorExit:
+            self._cancelled.set()
+            raise
+        except BrokenProcessPool:
+            self.pool.reset()
+            raise
+        finally:
+            # The pool outlives the sweep: drop queued chunks and let the
+            # running ones finish before the baseline block goes away
+            running = [future for future in pending if not future.cancel()]
+            wait(running)
+            shared.close()
+            shared.unlink()
+
+            elapsed = time.perf_counter() - started
+            rate = completed / elapsed if elapsed > 0 else 0.0
+            self.stats = {
+                "scenarios": completed,
+                "cancelled": self._cancelled.is_set(),
+                "workers": self.workers,
+                "elapsed_seconds": round(elapsed, 3),
+                "scenarios_per_second": round(rate, 1),
+                "scenarios_per_second_per_core": round(rate / self.workers, 1),
+            }
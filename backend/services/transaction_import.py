@@ -0,0 +1,463 @@
+import codecs
+import csv
+import json
+import os
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from models import db, Transaction, Business, Category, OCRDocument, Alert
+from repositories.daily_cashflow_repository import DailyCashflowRepository
+from services.job_queue import job_queue
+from services.transaction_scoring import enqueue_anomaly_checks_by_id
+
+
+CSV_TYPES = ("text/csv", "application/csv")
+NDJSON_TYPES = (
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+    "application/x-jsonlines",
+)
+CENT = Decimal("0.01")
+# Transaction.amount is Numeric(14, 2)
+MAX_AMOUNT = Decimal("1e12")
+TRUE_VALUES = ("1", "true", "yes", "y")
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def detect_format(content_type, requested=None):
+    """Return "csv" or "ndjson" for a request, or None if unsupported"""
+    if requested:
+        requested = requested.lower()
+        if requested in ("csv", "ndjson", "jsonl"):
+            return "csv" if requested == "csv" else "ndjson"
+        return None
+
+    mimetype = (content_type or "").split(";")[0].strip().lower()
+    if mimetype in CSV_TYPES:
+        return "csv"
+    if mimetype in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+def iter_records(stream, fmt):
+    """
+    Yield (row_number, record) pairs from a binary stream without reading it
+    all into memory. A line that cannot be decoded or parsed yields an
+    ImportRowError in place of the record and the import carries on.
+    """
+    undecodable = []
+    lines = _decode_lines(stream, undecodable)
+
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        while True:
+            try:
+                record = next(reader)
+                # Row 1 is the header
+                row_number = reader.line_num
+            except StopIteration:
+                break
+            except csv.Error as e:
+                # line_num still points at the last line read in full
+                record = ImportRowError(f"Invalid CSV: {e}")
+                row_number = reader.line_num + 1
+            yield from _drain(undecodable)
+            yield row_number, record
+        yield from _drain(undecodable)
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        yield from _drain(undecodable)
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, ImportRowError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield line_number, ImportRowError("Each line must be a JSON object")
+            continue
+        yield line_number, record
+    yield from _drain(undecodable)
+
+
+def _decode_lines(stream, undecodable):
+    """
+    Decode a binary stream as UTF-8 one line at a time. A line that is not
+    valid UTF-8 is replaced by a blank one, which both readers skip, and
+    its line number is appended to undecodable.
+    """
+    for line_number, raw in enumerate(stream, start=1):
+        if line_number == 1:
+            raw = raw.removeprefix(codecs.BOM_UTF8)
+        try:
+            yield raw.decode("utf-8")
+        except UnicodeDecodeError:
+            undecodable.append(line_number)
+            yield "\n"
+
+
+def _drain(undecodable):
+    while undecodable:
+        yield undecodable.pop(0), ImportRowError("Line is not valid UTF-8")
+
+
+class TransactionImporter:
+    """
+    Bulk transaction ingestion.
+
+    Records are validated and written in chunks; each chunk is one database
+    transaction holding the inserted rows, their rollup deltas, any alerts
+    for client-flagged rows and the anomaly-check jobs. Business, category
+    and OCR document lookups are cached for the whole import so each id is
+    queried at most once.
+    """
+
+    def __init__(self, user, chunk_size=None, max_errors=None, check_anomalies=True):
+        self.user = user
+        self.chunk_size = int(chunk_size or os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+        self.max_errors = int(max_errors or os.getenv("IMPORT_MAX_ERRORS", "1000"))
+        self.check_anomalies = check_anomalies
+
+        self.rollup = DailyCashflowRepository()
+        self.default_business_id = None
+        self._businesses = {}  # business_id -> allowed (bool)
+        self._categories = {}  # category_id -> business_id (None if missing)
+        self._category_names = {}  # business_id -> {lower name: category_id}
+        self._ocr_documents = {}  # ocr_document_id -> business_id (None if missing)
+
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.chunks = 0
+
+    def run(self, records):
+        """Import (row_number, record) pairs; returns a summary dict"""
+        owned = Business.query.filter_by(owner_id=self.user.id).first()
+        if owned:
+            self.default_business_id = owned.id
+            self._businesses[owned.id] = True
+
+        chunk = []
+        for item in records:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def _import_chunk(self, chunk):
+        self.chunks += 1
+        parsed = []
+        for row_number, record in chunk:
+            if isinstance(record, Exception):
+                self._record_error(row_number, str(record))
+                continue
+            try:
+                parsed.append((row_number, self._parse(record)))
+            except ImportRowError as e:
+                self._record_error(row_number, str(e))
+
+        self._prefetch(mapping for _, mapping in parsed)
+
+        rows = []
+        for row_number, mapping in parsed:
+            try:
+                self._check_references(mapping)
+            except ImportRowError as e:
+                self._record_error(row_number, str(e))
+                continue
+            rows.append((row_number, mapping))
+
+        if not rows:
+            return
+
+        mappings = [mapping for _, mapping in rows]
+        try:
+            transaction_ids = self._insert(
+                [mapping for mapping in mappings if not mapping["is_anomalous"]]
+            )
+
+            # Client-flagged rows need their own id back for the alert link,
+            # which costs ordered RETURNING; they are rare
+            flagged = [mapping for mapping in mappings if mapping["is_anomalous"]]
+            flagged_ids = self._insert(flagged, ordered=True)
+            if flagged:
+                db.session.bulk_insert_mappings(
+                    Alert,
+                    [
+                        {
+                            "business_id": mapping["business_id"],
+                            "level": "warning",
+                            "message": f"Suspicious Transaction Detected: {mapping['description']}",
+                            "linked_transaction_id": transaction_id,
+                            "forecast_metadata": {"ai_reason": mapping["ai_tag"]},
+                        }
+                        for mapping, transaction_id in zip(flagged, flagged_ids)
+                    ],
+                )
+            transaction_ids.extend(flagged_ids)
+
+            self.rollup.applyDeltas(self._rollup_deltas(mappings))
+
+            jobs = []
+            if self.check_anomalies:
+                jobs = enqueue_anomaly_checks_by_id(transaction_ids)
+                db.session.flush()
+
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            print(f"Transaction import chunk failed: {e}")
+            for row_number, _ in rows:
+                self._record_error(row_number, "Database error while saving this chunk")
+            return
+
+        self.imported += len(mappings)
+        for job in jobs:
+            job_queue.dispatch(job.id)
+
+    @staticmethod
+    def _insert(mappings, ordered=False):
+        """executemany INSERT returning the new ids (in input order if ordered)"""
+        if not mappings:
+            return []
+
+        # render_nulls keeps rows with and without optional values in one batch
+        return list(
+            db.session.scalars(
+                insert(Transaction)
+                .returning(Transaction.id, sort_by_parameter_order=ordered)
+                .execution_options(render_nulls=True),
+                mappings,
+            )
+        )
+
+    def _parse(self, record):
+        record = {
+            key.strip().lower(): value
+            for key, value in record.items()
+            if key is not None
+        }
+
+        direction = _blank_to_none(record.get("direction"))
+        if direction is None and _blank_to_none(record.get("type")) is not None:
+            transaction_type = str(record["type"]).strip().lower()
+            if transaction_type in ("income", "inflow"):
+                direction = "inflow"
+            elif transaction_type in ("expense", "outflow"):
+                direction = "outflow"
+            else:
+                raise ImportRowError("Invalid transaction type. Use 'income' or 'expense'")
+        if direction is None:
+            raise ImportRowError("direction (or type) is required")
+        direction = str(direction).strip().lower()
+        if direction not in ("inflow", "outflow"):
+            raise ImportRowError("direction must be 'inflow' or 'outflow'")
+
+        raw_date = _blank_to_none(record.get("date"))
+        if raw_date is None:
+            raise ImportRowError("date is required")
+        try:
+            transaction_date = datetime.fromisoformat(str(raw_date).strip()).date()
+        except ValueError:
+            raise ImportRowError(f"Invalid date: {raw_date}")
+
+        transaction_datetime = _blank_to_none(record.get("datetime"))
+        if transaction_datetime is not None:
+            try:
+                transaction_datetime = datetime.fromisoformat(str(transaction_datetime).strip())
+            except ValueError:
+                raise ImportRowError(f"Invalid datetime: {transaction_datetime}")
+
+        raw_amount = _blank_to_none(record.get("amount"))
+        if raw_amount is None:
+            raise ImportRowError("amount is required")
+        try:
+            amount = Decimal(str(raw_amount).strip()).quantize(CENT)
+        except InvalidOperation:
+            raise ImportRowError(f"Invalid amount: {raw_amount}")
+        if not amount.is_finite():
+            raise ImportRowError(f"Invalid amount: {raw_amount}")
+        if abs(amount) >= MAX_AMOUNT:
+            raise ImportRowError("amount must have at most 12 digits before the decimal point")
+
+        source = _blank_to_none(record.get("source"))
+        if source is not None and len(str(source)) > 100:
+            raise ImportRowError("source must be at most 100 characters")
+        ai_tag = _blank_to_none(record.get("ai_tag"))
+        if ai_tag is not None and len(str(ai_tag)) > 50:
+            raise ImportRowError("ai_tag must be at most 50 characters")
+
+        is_anomalous = record.get("is_anomalous")
+        if isinstance(is_anomalous, str):
+            is_anomalous = is_anomalous.strip().lower() in TRUE_VALUES
+
+        return {
+            "business_id": _to_int(record.get("business_id"), "business_id"),
+            "date": transaction_date,
+            "datetime": transaction_datetime,
+            "description": _blank_to_none(record.get("description")),
+            "amount": amount,
+            "direction": direction,
+            "category_id": _to_int(record.get("category_id"), "category_id"),
+            "category_name": _blank_to_none(record.get("category")),
+            "source": source,
+            "ocr_document_id": _to_int(record.get("ocr_document_id"), "ocr_document_id"),
+            "tags": _parse_tags(record.get("tags")),
+            "is_anomalous": bool(is_anomalous),
+            "ai_tag": ai_tag,
+        }
+
+    def _prefetch(self, mappings):
+        """Load every business, category and OCR document this chunk needs"""
+        business_ids, category_ids, ocr_ids = set(), set(), set()
+        for mapping in mappings:
+            if mapping["business_id"] is not None:
+                business_ids.add(mapping["business_id"])
+            if mapping["category_id"] is not None:
+                category_ids.add(mapping["category_id"])
+            if mapping["ocr_document_id"] is not None:
+                ocr_ids.add(mapping["ocr_document_id"])
+            if mapping["category_name"] is not None:
+                business_ids.add(mapping["business_id"] or self.default_business_id)
+
+        business_ids.discard(None)
+        missing = business_ids - self._businesses.keys()
+        if missing:
+            for business_id in missing:
+                self._businesses[business_id] = None
+            for business_id, owner_id in db.session.query(
+                Business.id, Business.owner_id
+            ).filter(Business.id.in_(missing)):
+                self._businesses[business_id] = (
+                    self.user.role == "admin" or owner_id == self.user.id
+                )
+
+        missing = category_ids - self._categories.keys()
+        if missing:
+            for category_id in missing:
+                self._categories[category_id] = None
+            for category_id, business_id in db.session.query(
+                Category.id, Category.business_id
+            ).filter(Category.id.in_(missing)):
+                self._categories[category_id] = business_id
+
+        missing = {
+            business_id
+            for business_id in business_ids
+            if self._businesses.get(business_id)
+        } - self._category_names.keys()
+        if missing:
+            for business_id in missing:
+                self._category_names[business_id] = {}
+            for category_id, business_id, name in db.session.query(
+                Category.id, Category.business_id, Category.name
+            ).filter(Category.business_id.in_(missing)):
+                self._category_names[business_id].setdefault(name.lower(), category_id)
+
+        missing = ocr_ids - self._ocr_documents.keys()
+        if missing:
+            for document_id in missing:
+                self._ocr_documents[document_id] = None
+            for document_id, business_id in db.session.query(
+                OCRDocument.id, OCRDocument.business_id
+            ).filter(OCRDocument.id.in_(missing)):
+                self._ocr_documents[document_id] = business_id
+
+    def _check_references(self, mapping):
+        business_id = mapping["business_id"] or self.default_business_id
+        if business_id is None:
+            raise ImportRowError(
+                "No business found for this user. Please create a business profile first."
+            )
+
+        allowed = self._businesses.get(business_id)
+        if allowed is None:
+            raise ImportRowError("Business not found")
+        if not allowed:
+            raise ImportRowError("You can only create transactions for your own business")
+        mapping["business_id"] = business_id
+
+        category_name = mapping.pop("category_name")
+        if mapping["category_id"] is not None:
+            if self._categories.get(mapping["category_id"]) != business_id:
+                raise ImportRowError("Category not found")
+        elif category_name is not None:
+            category_id = self._category_names[business_id].get(category_name.lower())
+            if category_id is None:
+                raise ImportRowError(f"Category not found: {category_name}")
+            mapping["category_id"] = category_id
+
+        if mapping["ocr_document_id"] is not None:
+            if self._ocr_documents.get(mapping["ocr_document_id"]) != business_id:
+                raise ImportRowError("OCR document not found")
+
+    @staticmethod
+    def _rollup_deltas(mappings):
+        deltas = {}
+        for mapping in mappings:
+            key = (
+                mapping["business_id"],
+                mapping["date"],
+                mapping["direction"],
+                mapping["category_id"],
+            )
+            amount, count = deltas.get(key, (Decimal("0"), 0))
+            deltas[key] = (amount + mapping["amount"], count + 1)
+        return deltas
+
+    def _record_error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_number, "error": message})
+
+
+def _blank_to_none(value):
+    if isinstance(value, str) and not value.strip():
+        return None
+    return value
+
+
+def _to_int(value, field):
+    value = _blank_to_none(value)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"Invalid {field}: {value}")
+
+
+def _parse_tags(value):
+    """Tags arrive as JSON in NDJSON and as JSON or comma-separated text in CSV"""
+    value = _blank_to_none(value)
+    if not isinstance(value, str):
+        return value
+
+    value = value.strip()
+    if value[:1] in ("[", "{"):
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
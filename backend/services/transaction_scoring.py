@@ -0,0 +1,162 @@
+import os
+
+from models import db, Transaction, Alert
+from services.ai_service import AIService
+from services.anomaly_detector import (
+    StatisticalAnomalyDetector,
+    ESCALATE,
+    OUTLIER,
+    format_tag,
+)
+from services.job_queue import job_queue
+
+
+ANOMALY_JOB = "transaction_anomaly"
+ANOMALY_BATCH_JOB = "transaction_anomaly_batch"
+ANOMALY_BATCH_SIZE = int(os.getenv("AI_ANOMALY_BATCH_SIZE", "20"))
+ANOMALY_PREFILTER = os.getenv("ANOMALY_PREFILTER", "true").lower() == "true"
+
+
+def build_analysis_data(transaction):
+    """Shape a transaction the way AIService.analyze_transaction_anomaly expects"""
+    return {
+        "description": transaction.description or "",
+        "amount": float(transaction.amount),
+        "date": str(transaction.date),
+        "category": transaction.category.name if transaction.category else "Unknown",
+        "direction": transaction.direction,
+    }
+
+
+def apply_anomaly_result(transaction, ai_response):
+    """
+    Copy an AI verdict onto the transaction and raise an alert the first time
+    it is flagged. Returns True when the transaction is (now) anomalous.
+    """
+    is_anomalous = False
+    ai_tag = None
+
+    # Handle JSON response from AI Service
+    if isinstance(ai_response, dict):
+        if ai_response.get("is_anomalous"):
+            is_anomalous = True
+            ai_tag = ai_response.get("tag", "Anomalous")
+    elif isinstance(ai_response, str):
+        # Fallback for older text-based responses (just in case)
+        if "unusual" in ai_response.lower() or "anomaly" in ai_response.lower():
+            is_anomalous = True
+            ai_tag = ai_response[:50]
+
+    if not is_anomalous:
+        return bool(transaction.is_anomalous)
+
+    already_flagged = bool(transaction.is_anomalous)
+    transaction.is_anomalous = True
+    transaction.ai_tag = ai_tag
+
+    if not already_flagged:
+        db.session.add(
+            Alert(
+                business_id=transaction.business_id,
+                level="warning",
+                message=f"Suspicious Transaction Detected: {transaction.description}",
+                linked_transaction_id=transaction.id,
+                forecast_metadata={"ai_reason": ai_tag},
+            )
+        )
+
+    return True
+
+
+def enqueue_anomaly_check(transaction):
+    """Queue an anomaly check for a flushed transaction (commit is up to the caller)"""
+    return job_queue.enqueue(ANOMALY_JOB, {"transaction_id": transaction.id})
+
+
+def enqueue_anomaly_checks(transactions, batch_size=ANOMALY_BATCH_SIZE):
+    """
+    Queue anomaly checks for many flushed transactions, one job per batch so
+    each job costs a single LLM call (commit is up to the caller)
+    """
+    return enqueue_anomaly_checks_by_id(
+        [transaction.id for transaction in transactions], batch_size
+    )
+
+
+def enqueue_anomaly_checks_by_id(transaction_ids, batch_size=ANOMALY_BATCH_SIZE):
+    """Same as enqueue_anomaly_checks for rows inserted without ORM objects"""
+    return [
+        job_queue.enqueue(
+            ANOMALY_BATCH_JOB,
+            {"transaction_ids": transaction_ids[start : start + batch_size]},
+        )
+        for start in range(0, len(transaction_ids), batch_size)
+    ]
+
+
+def score_transactions(transactions):
+    """
+    Score transactions in place: the statistical pre-filter decides the
+    clear-cut ones and only the rest are sent to the LLM, in one batch.
+    Commit is up to the caller.
+    """
+    escalated = transactions
+
+    if ANOMALY_PREFILTER:
+        escalated = []
+        decisions = StatisticalAnomalyDetector().score(transactions)
+
+        for transaction, (decision, robust_z) in zip(transactions, decisions):
+            tag = format_tag(decision, robust_z)
+            if decision == OUTLIER:
+                apply_anomaly_result(transaction, {"is_anomalous": True, "tag": tag})
+                continue
+
+            # Keep any tag the client or an earlier verdict already set
+            if not transaction.ai_tag:
+                transaction.ai_tag = tag
+            if decision == ESCALATE:
+                escalated.append(transaction)
+
+    if not escalated:
+        return
+
+    ai_service = AIService()
+    if len(escalated) == 1:
+        ai_responses = [
+            ai_service.analyze_transaction_anomaly(build_analysis_data(escalated[0]))
+        ]
+    else:
+        ai_responses = ai_service.analyze_transaction_anomalies(
+            [build_analysis_data(transaction) for transaction in escalated],
+            batch_size=len(escalated),
+        )
+
+    for transaction, ai_response in zip(escalated, ai_responses):
+        apply_anomaly_result(transaction, ai_response)
+
+
+@job_queue.handler(ANOMALY_JOB)
+def score_transaction_anomaly(payload):
+    transaction = Transaction.query.get(payload["transaction_id"])
+    if not transaction:
+        # Deleted before we got to it
+        return
+
+    score_transactions([transaction])
+    db.session.commit()
+
+
+@job_queue.handler(ANOMALY_BATCH_JOB)
+def score_transaction_anomaly_batch(payload):
+    transactions = (
+        Transaction.query.options(db.joinedload(Transaction.category))
+        .filter(Transaction.id.in_(payload["transaction_ids"]))
+        .order_by(Transaction.id)
+        .all()
+    )
+    if not transactions:
+        return
+
+    score_transactions(transactions)
+    db.session.commit()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Stub OpenAI-compatible LLM server for exercising the job queue offline.
+
+Answers POST .../chat/completions with the JSON verdicts the anomaly
+prompts ask for: a transaction is anomalous when its amount reaches
+--threshold. Batch prompts get one verdict per numbered line. Point the
+app at it and background scoring runs without an API key or network:
+
+    KOLOSAL_BASE_URL=http://127.0.0.1:8089/v1 KOLOSAL_API_KEY=stub
+
+Usage:
+    python stub_llm_server.py                          # port 8089, instant answers
+    python stub_llm_server.py --port 9000 --latency 800 --threshold 5000
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_BATCH_LINE = re.compile(r"^\s*(\d+)\. Description: .*?\| Amount: ([-\d.eE+]+)", re.MULTILINE)
+_SINGLE_AMOUNT = re.compile(r"- Amount: ([-\d.eE+]+)")
+
+
+def verdict(amount, threshold):
+    if abs(amount) >= threshold:
+        return {"is_anomalous": True, "tag": "High Value", "reason": "Amount above stub threshold"}
+    return {"is_anomalous": False, "tag": "Normal", "reason": "Amount within stub threshold"}
+
+
+def answer(prompt, threshold):
+    """(reply content, verdict count) for an anomaly prompt, batch or single"""
+    batch = _BATCH_LINE.findall(prompt)
+    if batch:
+        verdicts = [{"index": int(index), **verdict(float(amount), threshold)} for index, amount in batch]
+        return json.dumps(verdicts), len(verdicts)
+
+    match = _SINGLE_AMOUNT.search(prompt)
+    if match:
+        return json.dumps(verdict(float(match.group(1)), threshold)), 1
+    return json.dumps({"message": "stub response"}), 0
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 8089), threshold=10000.0, latency=0.0):
+        super().__init__(address, _Handler)
+        self.threshold = threshold
+        self.latency = latency
+        self.requests = 0
+        self.verdicts = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve from a daemon thread; returns self for use in tests"""
+        threading.Thread(target=self.serve_forever, name="stub-llm", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        prompt = "\n".join(
+            message.get("content") or ""
+            for message in body.get("messages", [])
+            if message.get("role") == "user"
+        )
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        content, verdicts = answer(prompt, self.server.threshold)
+        with self.server._lock:
+            self.server.requests += 1
+            self.server.verdicts += verdicts
+        payload = json.dumps(
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+        ).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--threshold", type=float, default=10000.0, help="Amount at which transactions are anomalous")
+    parser.add_argument("--latency", type=float, default=0.0, help="Milliseconds to wait before each answer")
+    args = parser.parse_args()
+
+    server = StubLLMServer((args.host, args.port), args.threshold, args.latency / 1000)
+    print(f"🤖 Stub LLM listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+# Configure the app for tests before it is imported: a throwaway SQLite
+# database, in-process rate limit counters, inline jobs and cheap hashing
+_database = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_scratch = tempfile.mkdtemp()
+atexit.register(os.unlink, _database.name)
+atexit.register(shutil.rmtree, _scratch, True)
+os.environ["DATABASE_URL"] = f"sqlite:///{_database.name}"
+os.environ["SECRET_KEY"] = "test-secret"
+os.environ["RATE_LIMIT_STORAGE"] = "memory://"
+os.environ["AUTH_CACHE_EPOCH_PATH"] = os.path.join(_scratch, "auth_cache.epoch")
+os.environ["JOB_QUEUE_EAGER"] = "true"
+os.environ["PASSWORD_SCRYPT_N"] = "1024"
+os.environ.pop("KOLOSAL_API_KEY", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+from middleware.auth import AuthenticationMiddleware  # noqa: E402
+from middleware.auth_cache import auth_cache  # noqa: E402
+from models import db, Business, DailyCashflow, User  # noqa: E402
+from services.rate_limiter import MemoryCounterStore, rate_limiter  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    rate_limiter.store = MemoryCounterStore()
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+    auth_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make(email, role="business_owner", business_names=()):
+        user = User(email=email, password="unused", name=email.split("@")[0], role=role)
+        db.session.add(user)
+        db.session.flush()
+        for name in business_names:
+            db.session.add(Business(owner_id=user.id, name=name, currency="IDR", timezone="Asia/Jakarta"))
+        db.session.commit()
+        return user
+
+    return make
+
+
+def auth_headers(user):
+    token = AuthenticationMiddleware.generate_token(user.id, "test-secret")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def seed_cashflow(business, days=60, start=None):
+    """Daily in/out buckets with a weekly pattern, by default ending yesterday"""
+    start = start or date.today() - timedelta(days=days)
+    for day in range(days):
+        for direction, total in (("inflow", 100 + day % 7 * 10), ("outflow", 90)):
+            db.session.add(
+                DailyCashflow(
+                    business_id=business.id,
+                    date=start + timedelta(days=day),
+                    direction=direction,
+                    total=total,
+                    count=1,
+                )
+            )
+    db.session.commit()
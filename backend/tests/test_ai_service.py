@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from models import Job, Transaction
+from services import ai_service
+from services.ai_service import AIService
+from tests.conftest import auth_headers
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions, replaying canned replies"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+
+def _service(replies):
+    service = AIService()
+    completions = FakeCompletions(replies)
+    service.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return service, completions
+
+
+def _transactions(n):
+    return [{"description": f"item {i}", "amount": 100 + i} for i in range(n)]
+
+
+def test_failed_batch_call_is_not_retried_per_item():
+    service, completions = _service([ConnectionError("upstream down")] * 21)
+
+    with pytest.raises(ConnectionError):
+        service.analyze_transaction_anomalies(_transactions(20))
+    assert completions.calls == 1
+
+
+def test_unparseable_batch_reply_is_not_retried_per_item():
+    service, completions = _service(["Sorry, I can't help with that."])
+
+    with pytest.raises(ValueError):
+        service.analyze_transaction_anomalies(_transactions(3))
+    assert completions.calls == 1
+
+
+def test_only_missing_items_fall_back_to_single_calls():
+    batch = json.dumps(
+        [
+            {"index": 0, "is_anomalous": False, "tag": "Normal", "reason": ""},
+            {"index": 2, "is_anomalous": True, "tag": "High Value", "reason": "large"},
+        ]
+    )
+    single = json.dumps({"is_anomalous": False, "tag": "Normal", "reason": "retried"})
+    service, completions = _service([batch, single])
+
+    results = service.analyze_transaction_anomalies(_transactions(3))
+
+    assert completions.calls == 2
+    assert [result["tag"] for result in results] == ["Normal", "Normal", "High Value"]
+    assert results[1]["reason"] == "retried"
+
+
+def test_failed_single_call_raises():
+    service, completions = _service([ConnectionError("upstream down")])
+
+    with pytest.raises(ConnectionError):
+        service.analyze_transaction_anomaly(_transactions(1)[0])
+    assert completions.calls == 1
+
+
+def test_failed_fallback_call_raises():
+    batch = json.dumps([{"index": 0, "is_anomalous": False, "tag": "Normal", "reason": ""}])
+    service, completions = _service([batch, ConnectionError("upstream down")])
+
+    with pytest.raises(ConnectionError):
+        service.analyze_transaction_anomalies(_transactions(2))
+    assert completions.calls == 2
+
+
+def test_scoring_job_is_retried_when_the_llm_fails(client, make_user, monkeypatch):
+    completions = FakeCompletions([ConnectionError("upstream down")])
+    monkeypatch.setenv("KOLOSAL_API_KEY", "fake")
+    monkeypatch.setattr(
+        ai_service,
+        "get_ai_client",
+        lambda api_key, base_url: SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+    )
+    owner = make_user("owner@example.com", business_names=["Shop"])
+
+    response = client.post(
+        "/api/transactions",
+        json={
+            "business_id": owner.businesses[0].id,
+            "date": "2024-03-01",
+            "amount": 40,
+            "direction": "outflow",
+            "description": "Team lunch",
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 201
+    job = Job.query.one()
+    assert (job.status, job.attempts, job.last_error) == ("pending", 1, "upstream down")
+    assert Transaction.query.one().ai_tag is None
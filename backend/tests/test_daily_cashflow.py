@@ -0,0 +1,74 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Category, DailyCashflow
+from repositories.daily_cashflow_repository import DailyCashflowRepository
+
+DAY = date(2024, 3, 1)
+
+
+@pytest.fixture
+def shop(make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    return owner.businesses[0]
+
+
+def buckets(business_id):
+    return [
+        (bucket.category_id, bucket.total, bucket.count)
+        for bucket in DailyCashflow.query.filter_by(business_id=business_id, date=DAY).order_by(DailyCashflow.id)
+    ]
+
+
+def test_uncategorized_bucket_cannot_be_duplicated(shop):
+    db.session.add(DailyCashflow(business_id=shop.id, date=DAY, direction="inflow", total=1, count=1))
+    db.session.commit()
+
+    db.session.add(DailyCashflow(business_id=shop.id, date=DAY, direction="inflow", total=2, count=1))
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_deltas_add_to_a_bucket_another_writer_created(shop):
+    sales = Category(business_id=shop.id, name="Sales", type="income")
+    db.session.add(sales)
+    db.session.commit()
+
+    # Committed by another connection, as a concurrent request would
+    with db.engine.begin() as other:
+        other.execute(
+            DailyCashflow.__table__.insert(),
+            [
+                {"business_id": shop.id, "date": DAY, "direction": "inflow", "category_id": None, "total": 10, "count": 1},
+                {"business_id": shop.id, "date": DAY, "direction": "inflow", "category_id": sales.id, "total": 5, "count": 1},
+            ],
+        )
+
+    repository = DailyCashflowRepository()
+    repository.applyDelta(shop.id, DAY, "inflow", None, Decimal("2.50"), 1)
+    repository.applyDeltas(
+        {
+            (shop.id, DAY, "inflow", None): (Decimal("1"), 1),
+            (shop.id, DAY, "inflow", sales.id): (Decimal("4"), 2),
+        }
+    )
+    db.session.commit()
+
+    assert buckets(shop.id) == [(None, Decimal("13.50"), 3), (sales.id, Decimal("9.00"), 3)]
+
+
+def test_emptied_bucket_is_removed(shop):
+    repository = DailyCashflowRepository()
+    repository.applyDelta(shop.id, DAY, "outflow", None, Decimal("7"), 1)
+    repository.applyDelta(shop.id, DAY, "outflow", None, Decimal("3"), 1)
+    repository.applyDelta(shop.id, DAY, "outflow", None, Decimal("-7"), -1)
+    db.session.commit()
+    assert buckets(shop.id) == [(None, Decimal("3.00"), 1)]
+
+    repository.applyDeltas({(shop.id, DAY, "outflow", None): (Decimal("-3"), -1)})
+    db.session.commit()
+    assert buckets(shop.id) == []
@@ -0,0 +1,147 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from controllers.dashboard_controller import DashboardController
+from models import db, Category, RiskScore, Transaction
+from repositories.daily_cashflow_repository import DailyCashflowRepository
+from tests.conftest import auth_headers
+
+
+def legacy_metrics(business_id, prev_start, current_start, end):
+    """The dashboard queries before they were folded into one statement"""
+    repository = DailyCashflowRepository()
+    current = repository.getTotalByDateRange(business_id, current_start, end)
+    previous = repository.getTotalByDateRange(
+        business_id, prev_start, current_start - timedelta(days=1)
+    )
+    latest = (
+        RiskScore.query.filter_by(business_id=business_id)
+        .order_by(RiskScore.assessed_at.desc(), RiskScore.id.desc())
+        .first()
+    )
+    totals = {
+        "current_inflow": current["inflow"],
+        "current_outflow": current["outflow"],
+        "prev_inflow": previous["inflow"],
+        "prev_outflow": previous["outflow"],
+    }
+    return totals, latest
+
+
+@pytest.fixture
+def business(make_user):
+    owner = make_user("owner@example.com", business_names=["Shop", "Other"])
+    shop, other = owner.businesses
+    sales = Category(business_id=shop.id, name="Sales", type="income")
+    rent = Category(business_id=shop.id, name="Rent", type="expense")
+    db.session.add_all([sales, rent])
+    db.session.flush()
+
+    today = datetime.utcnow().date()
+    rows = [
+        # (days ago, amount, direction, category)
+        (0, "120.50", "inflow", sales),
+        (0, "80.25", "outflow", None),
+        (3, "40.00", "inflow", None),
+        (3, "15.10", "outflow", rent),
+        (3, "9.90", "outflow", rent),
+        (29, "300.00", "inflow", sales),
+        (30, "77.00", "outflow", None),  # first day of the current period
+        (31, "55.00", "inflow", None),  # last day of the previous period
+        (45, "210.00", "inflow", sales),
+        (45, "130.00", "outflow", rent),
+        (60, "999.00", "inflow", None),  # first day of the previous period
+        (61, "5000.00", "outflow", rent),  # outside both periods
+    ]
+    for days_ago, amount, direction, category in rows:
+        db.session.add(
+            Transaction(
+                business_id=shop.id,
+                date=today - timedelta(days=days_ago),
+                amount=Decimal(amount),
+                direction=direction,
+                category_id=category.id if category else None,
+            )
+        )
+    # Another business's rows must not leak into the totals
+    db.session.add(
+        Transaction(business_id=other.id, date=today, amount=Decimal("1000"), direction="inflow")
+    )
+
+    assessed = datetime.utcnow() - timedelta(days=1)
+    db.session.add_all(
+        [
+            RiskScore(business_id=shop.id, assessed_at=assessed - timedelta(days=3), liquidity_score=10,
+                      cashflow_risk_score=10, volatility_index=Decimal("0.1"), details={"overall_risk": "Old"}),
+            # Two scores share the newest timestamp; the later row wins
+            RiskScore(business_id=shop.id, assessed_at=assessed, liquidity_score=20,
+                      cashflow_risk_score=20, volatility_index=Decimal("0.2"), details={"overall_risk": "Tied"}),
+            RiskScore(business_id=shop.id, assessed_at=assessed, liquidity_score=30,
+                      cashflow_risk_score=30, volatility_index=Decimal("0.3"),
+                      details={"overall_risk": "High", "recommendations": ["Cut costs"]}),
+            RiskScore(business_id=other.id, assessed_at=datetime.utcnow(), liquidity_score=90,
+                      cashflow_risk_score=90, volatility_index=Decimal("0.9"), details={"overall_risk": "Low"}),
+        ]
+    )
+    db.session.commit()
+    DailyCashflowRepository().rebuild(shop.id)
+    DailyCashflowRepository().rebuild(other.id)
+    db.session.commit()
+    return owner, shop
+
+
+def _window():
+    end = datetime.utcnow().date()
+    current_start = end - timedelta(days=30)
+    return current_start - timedelta(days=30), current_start, end
+
+
+def test_single_statement_matches_legacy_queries(app, business):
+    _, shop = business
+    prev_start, current_start, end = _window()
+
+    totals, latest = DashboardController._fetch_period_metrics(shop.id, prev_start, current_start, end)
+    legacy_totals, legacy_latest = legacy_metrics(shop.id, prev_start, current_start, end)
+
+    assert totals == legacy_totals
+    assert totals == {
+        "current_inflow": Decimal("460.50"),
+        "current_outflow": Decimal("182.25"),
+        "prev_inflow": Decimal("1264.00"),
+        "prev_outflow": Decimal("130.00"),
+    }
+    assert latest.risk_score_id == legacy_latest.id
+    assert latest.details == {"overall_risk": "High", "recommendations": ["Cut costs"]}
+    assert (latest.liquidity_score, latest.cashflow_risk_score, latest.volatility_index) == (
+        legacy_latest.liquidity_score,
+        legacy_latest.cashflow_risk_score,
+        legacy_latest.volatility_index,
+    )
+
+
+def test_business_without_rows_or_scores(app, make_user):
+    owner = make_user("empty@example.com", business_names=["Empty"])
+    prev_start, current_start, end = _window()
+
+    totals, latest = DashboardController._fetch_period_metrics(
+        owner.businesses[0].id, prev_start, current_start, end
+    )
+
+    assert totals == legacy_metrics(owner.businesses[0].id, prev_start, current_start, end)[0]
+    assert set(totals.values()) == {Decimal("0")}
+    assert latest is None
+
+
+def test_metrics_endpoint(client, business):
+    owner, shop = business
+    body = client.get(
+        f"/api/dashboard/metrics?business_id={shop.id}", headers=auth_headers(owner)
+    ).get_json()
+
+    assert body["net_cashflow"] == pytest.approx(460.50 - 182.25)
+    assert body["net_cashflow_trend"] == "down"
+    assert body["projected_risk"] == "High"
+    assert body["projected_risk_status"] == ["Cut costs"]
+    assert [item["level"] for item in body["risk_breakdown"]] == [30.0, 30.0, 30.0]
@@ -0,0 +1,149 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from models import db, DailyCashflow, Forecast, ForecastState, RiskScore
+from services.forecasting import ForecastEngine
+from services.forecasting.batch import NightlyForecaster
+from tests.conftest import auth_headers, seed_cashflow
+
+LAST_DAY = date(2024, 3, 31)
+
+
+def latest_forecast(business_id):
+    return Forecast.query.filter_by(business_id=business_id).order_by(Forecast.id.desc()).first()
+
+
+def seed_history(shop):
+    for day in range(60):
+        db.session.add(
+            DailyCashflow(
+                business_id=shop.id,
+                date=LAST_DAY - timedelta(days=day),
+                direction="inflow",
+                total=100 + day % 7 * 10,
+                count=1,
+            )
+        )
+    db.session.commit()
+
+
+def test_incremental_run_rolls_quiet_businesses_forward(make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    shop = owner.businesses[0]
+    seed_history(shop)
+
+    forecaster = NightlyForecaster(risk=False, incremental=True, refit_days=30)
+    assert forecaster.run(LAST_DAY, progress=lambda line: None)["forecasts"] == 1
+
+    # No transactions since: the state is extended over the quiet days
+    run_date = LAST_DAY + timedelta(days=3)
+    totals = forecaster.run(run_date, progress=lambda line: None)
+    assert (totals["forecasts"], totals["extended"]) == (1, 1)
+
+    forecast = latest_forecast(shop.id)
+    assert forecast.period_start == run_date + timedelta(days=1)
+    assert ForecastState.query.filter_by(business_id=shop.id).one().high_water_date == run_date
+    assert "3 new days" in forecast.model_run.notes
+
+    # Already current for the date, so a rerun has nothing to do
+    assert forecaster.run(run_date, resume=False, progress=lambda line: None)["businesses"] == 0
+
+
+def test_incremental_run_refreshes_risk_on_its_own_schedule(make_user, monkeypatch):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    shop = owner.businesses[0]
+    shop.settings = {"current_cash": 1000}
+    seed_history(shop)
+
+    full_loads = []
+    load_history = ForecastEngine.load_history
+
+    def recording_load_history(self, business_ids, end_date, start_date=None):
+        if start_date is None:
+            full_loads.append(list(business_ids))
+        return load_history(self, business_ids, end_date, start_date)
+
+    monkeypatch.setattr(ForecastEngine, "load_history", recording_load_history)
+    forecaster = NightlyForecaster(incremental=True, refit_days=30, risk_days=7)
+    quiet = lambda line: None
+
+    assert forecaster.run(LAST_DAY, progress=quiet)["risk_scores"] == 1
+    assert full_loads == [[shop.id]]
+
+    # Extended from stored state with a fresh risk score: no full history read
+    totals = forecaster.run(LAST_DAY + timedelta(days=1), progress=quiet)
+    assert (totals["extended"], totals["risk_scores"]) == (1, 0)
+    assert full_loads == [[shop.id]]
+
+    RiskScore.query.update({RiskScore.assessed_at: datetime.utcnow() - timedelta(days=8)})
+    db.session.commit()
+    totals = forecaster.run(LAST_DAY + timedelta(days=2), progress=quiet)
+    assert (totals["extended"], totals["risk_scores"]) == (1, 1)
+    assert RiskScore.query.count() == 2
+
+
+@pytest.mark.parametrize(
+    "period",
+    [
+        {"granularity": "weird"},
+        {"period_end": "2126-11-01"},
+        {"period_start": "2024-02-01", "period_end": "2024-01-01"},
+        {"period_start": "yesterday"},
+    ],
+)
+def test_create_forecast_rejects_unsupported_periods(client, make_user, period):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    response = client.post(
+        "/api/forecasts",
+        json={
+            "business_id": owner.businesses[0].id,
+            "granularity": "weekly",
+            "period_start": "2024-01-01",
+            "period_end": "2024-03-31",
+            **period,
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 400
+    assert Forecast.query.count() == 0
+
+
+def test_create_forecast_within_the_horizon(client, make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    seed_cashflow(owner.businesses[0])
+    start = date.today()
+    response = client.post(
+        "/api/forecasts",
+        json={
+            "business_id": owner.businesses[0].id,
+            "granularity": "monthly",
+            "period_start": start.isoformat(),
+            "period_end": (start + timedelta(days=89)).isoformat(),
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()["forecast_metadata"]["engine"]["periods"]
+
+
+def test_update_forecast_rejects_an_unbounded_period(client, make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    forecast = Forecast(
+        business_id=owner.businesses[0].id,
+        granularity="daily",
+        period_start=date(2024, 1, 1),
+        period_end=date(2024, 1, 31),
+    )
+    db.session.add(forecast)
+    db.session.commit()
+
+    response = client.put(
+        f"/api/forecasts/{forecast.id}", json={"period_end": "2124-01-01"}, headers=auth_headers(owner)
+    )
+
+    assert response.status_code == 400
+    db.session.expire_all()
+    assert Forecast.query.get(forecast.id).period_end == date(2024, 1, 31)
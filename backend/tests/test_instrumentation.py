@@ -0,0 +1,18 @@
+import logging
+
+from tests.conftest import auth_headers
+from utils.instrumentation import instrumentation
+
+
+def test_slow_queries_are_logged(client, make_user, caplog, monkeypatch):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    monkeypatch.setattr(instrumentation, "slow_query_seconds", 1e-9)
+    before = instrumentation.slow_queries
+
+    with caplog.at_level(logging.WARNING, logger="utils.instrumentation"):
+        response = client.get("/api/transactions", headers=auth_headers(owner))
+
+    assert response.status_code == 200
+    slow = [record for record in caplog.records if record.name == "utils.instrumentation"]
+    assert slow and all("during GET /api/transactions: SELECT" in record.getMessage() for record in slow)
+    assert instrumentation.slow_queries - before == len(slow)
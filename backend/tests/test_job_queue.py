@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Job, Transaction
+from services.job_queue import job_queue
+from stub_llm_server import StubLLMServer
+from tests.conftest import auth_headers
+
+ran = []
+
+
+@job_queue.handler("test_record")
+def record(payload):
+    ran.append(payload["n"])
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    server = StubLLMServer(("127.0.0.1", 0), threshold=10000).start()
+    monkeypatch.setenv("KOLOSAL_API_KEY", "stub")
+    monkeypatch.setenv("KOLOSAL_BASE_URL", server.base_url)
+    yield server
+    server.stop()
+
+
+def _stale_job(n, attempts):
+    job = Job(
+        kind="test_record",
+        payload={"n": n},
+        status="running",
+        attempts=attempts,
+        started_at=datetime.utcnow() - timedelta(seconds=job_queue.stale_after + 60),
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+def test_stale_jobs_are_retried_until_max_attempts(app):
+    ran.clear()
+    retry_id = _stale_job(1, attempts=job_queue.max_attempts - 1)
+    exhausted_id = _stale_job(2, attempts=job_queue.max_attempts)
+
+    job_queue.poll_once()
+
+    retried, exhausted = db.session.get(Job, retry_id), db.session.get(Job, exhausted_id)
+    assert retried.status == "completed"
+    assert exhausted.status == "failed"
+    assert exhausted.finished_at is not None
+    assert ran == [1]
+
+    # Nothing left for a later poll to pick up
+    assert job_queue.poll_once() == 0
+    assert ran == [1]
+
+
+def test_transaction_is_scored_in_the_background(client, make_user, stub_llm):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    headers = auth_headers(owner)
+
+    for amount in (25000, 40):
+        response = client.post(
+            "/api/transactions",
+            json={
+                "business_id": owner.businesses[0].id,
+                "date": "2024-03-01",
+                "amount": amount,
+                "direction": "outflow",
+                "description": f"Payment {amount}",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+
+    flagged = {t.description: (t.is_anomalous, t.ai_tag) for t in Transaction.query}
+    assert flagged["Payment 25000"] == (True, "High Value")
+    assert flagged["Payment 40"][0] is False
+    assert stub_llm.requests == 2
+    assert {job.status for job in Job.query} == {"completed"}
+
+
+def test_scoring_keeps_a_client_supplied_tag(client, make_user, stub_llm):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+
+    response = client.post(
+        "/api/transactions",
+        json={
+            "business_id": owner.businesses[0].id,
+            "date": "2024-03-01",
+            "amount": 40,
+            "direction": "outflow",
+            "description": "Team lunch",
+            "ai_tag": "Reimbursable",
+        },
+        headers=auth_headers(owner),
+    )
+    assert response.status_code == 201
+
+    transaction = Transaction.query.one()
+    assert (transaction.is_anomalous, transaction.ai_tag) == (False, "Reimbursable")
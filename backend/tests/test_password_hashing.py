@@ -0,0 +1,62 @@
+import pytest
+
+from models import db
+from utils import crypto
+from utils.crypto import PasswordHasherBusy, hash_password
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def busy_hasher(monkeypatch):
+    def refuse(function, *args):
+        raise PasswordHasherBusy("Password hashing is at capacity")
+
+    monkeypatch.setattr(crypto._hasher, "run", refuse)
+
+
+@pytest.fixture
+def admin(make_user):
+    return make_user("admin@example.com", role="admin")
+
+
+def _assert_busy(response):
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+
+
+def test_register_is_busy_when_hashing_is_at_capacity(client, busy_hasher):
+    _assert_busy(
+        client.post(
+            "/api/auth/register",
+            json={"email": "new@example.com", "password": "secret123", "name": "New"},
+        )
+    )
+
+
+def test_create_user_is_busy_when_hashing_is_at_capacity(client, admin, busy_hasher):
+    _assert_busy(
+        client.post(
+            "/api/users",
+            json={"email": "new@example.com", "password": "secret123", "name": "New", "role": "viewer"},
+            headers=auth_headers(admin),
+        )
+    )
+
+
+def test_update_password_is_busy_when_hashing_is_at_capacity(client, admin, busy_hasher):
+    _assert_busy(
+        client.put(f"/api/users/{admin.id}", json={"password": "secret456"}, headers=auth_headers(admin))
+    )
+
+
+def test_login_with_a_hashed_password(client, make_user):
+    user = make_user("owner@example.com")
+    user.password = hash_password("secret123")
+    db.session.commit()
+
+    assert client.post(
+        "/api/auth/login", json={"email": user.email, "password": "secret123"}
+    ).status_code == 200
+    assert client.post(
+        "/api/auth/login", json={"email": user.email, "password": "wrong"}
+    ).status_code == 401
@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from models import db, Transaction
+from tests.conftest import auth_headers, seed_cashflow
+from utils.query_counter import QueryCounter, assert_max_queries
+
+
+@pytest.fixture
+def owner(make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    seed_cashflow(owner.businesses[0])
+    return owner
+
+
+def _add_transactions(business, count):
+    db.session.add_all(
+        Transaction(business_id=business.id, date=date(2024, 1, 1 + i % 28), amount=10 + i, direction="inflow")
+        for i in range(count)
+    )
+    db.session.commit()
+
+
+def _warm(client, headers):
+    # The first request of a token loads the principal into the auth cache
+    client.get("/api/auth/me", headers=headers)
+
+
+def test_dashboard_metrics_is_one_statement(client, owner):
+    headers = auth_headers(owner)
+    _warm(client, headers)
+
+    with assert_max_queries(2) as queries:
+        response = client.get(f"/api/dashboard/metrics?business_id={owner.businesses[0].id}", headers=headers)
+
+    assert response.status_code == 200
+    # Totals and the latest risk score come back together
+    assert sum("risk_scores" in statement for statement in queries.statements) == 1
+
+
+@pytest.mark.parametrize("query_string", ["", "?limit=10", "?stream=ndjson"])
+def test_transaction_listing_does_not_grow_with_rows(client, owner, query_string):
+    headers = auth_headers(owner)
+    _warm(client, headers)
+
+    counts = []
+    for rows in (3, 60):
+        _add_transactions(owner.businesses[0], rows)
+        with QueryCounter() as queries:
+            response = client.get(f"/api/transactions{query_string}", headers=headers)
+            response.get_data()
+        assert response.status_code == 200
+        counts.append(queries.count)
+
+    assert counts[0] == counts[1] == 1, counts
+
+
+@pytest.mark.parametrize(
+    "role, expected",
+    [("business_owner", 400), ("viewer", 403)],
+)
+def test_permission_checks_run_no_queries(client, make_user, role, expected):
+    user = make_user(f"{role}@example.com", role=role, business_names=["Shop"])
+    headers = auth_headers(user)
+    _warm(client, headers)
+
+    with assert_max_queries(0):
+        # Empty body: allowed callers stop at validation, before any lookup
+        response = client.post("/api/scenarios/batch", json={}, headers=headers)
+
+    assert response.status_code == expected
+
+
+def test_role_checks_run_no_queries(client, owner):
+    headers = auth_headers(owner)
+    _warm(client, headers)
+
+    with assert_max_queries(0):
+        response = client.get("/api/users", headers=headers)
+
+    assert response.status_code == 403
@@ -0,0 +1,27 @@
+LOGIN_LIMIT = 10
+
+
+def _login(client, forwarded_for):
+    return client.post(
+        "/api/auth/login",
+        json={"email": "nobody@example.com", "password": "wrong"},
+        headers={"X-Forwarded-For": forwarded_for},
+    )
+
+
+def test_login_limit_is_per_forwarded_client(client):
+    for _ in range(LOGIN_LIMIT):
+        assert _login(client, "203.0.113.1").status_code == 401
+
+    assert _login(client, "203.0.113.1").status_code == 429
+    # Same proxy, different client: its own bucket
+    assert _login(client, "203.0.113.2").status_code == 401
+
+
+def test_spoofed_forwarded_hops_are_ignored(client):
+    # Only the hop appended by our proxy is trusted, so a client cannot pick
+    # a fresh bucket by prepending its own X-Forwarded-For entries
+    for i in range(LOGIN_LIMIT):
+        assert _login(client, f"10.0.0.{i}, 203.0.113.1").status_code == 401
+
+    assert _login(client, "10.0.0.99, 203.0.113.1").status_code == 429
@@ -0,0 +1,99 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from models import db, Forecast
+from services.risk import simulate
+from tests.conftest import auth_headers, seed_cashflow
+
+
+@pytest.fixture
+def forecast(make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    business = owner.businesses[0]
+    seed_cashflow(business, start=date(2023, 11, 1))
+    forecast = Forecast(
+        business_id=business.id,
+        granularity="daily",
+        period_start=date(2024, 1, 1),
+        period_end=date(2024, 1, 31),
+    )
+    db.session.add(forecast)
+    db.session.commit()
+    return owner, forecast
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"paths": 10**9},
+        {"paths": 0},
+        {"paths": "1000"},
+        {"horizon_days": 10**6},
+        {"horizon_days": -5},
+    ],
+)
+def test_assess_rejects_out_of_range_options(client, forecast, options):
+    owner, forecast = forecast
+    response = client.post(
+        f"/api/forecasts/{forecast.id}/risk-score", json=options, headers=auth_headers(owner)
+    )
+
+    assert response.status_code == 400
+
+
+def test_assess_accepts_bounded_options(client, forecast):
+    owner, forecast = forecast
+    response = client.post(
+        f"/api/forecasts/{forecast.id}/risk-score",
+        json={"paths": 200, "horizon_days": 30, "seed": 1},
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 201, response.get_json()
+    # Every seeded day nets +10..+70, so no path ever dips below zero
+    score = response.get_json()
+    assert float(score["drawdown_prob"]) == 0
+    assert score["details"]["days_to_zero"] is None
+    assert score["details"]["net_cashflow"]["p5"] > 0
+
+
+def test_simulation_of_a_steady_loss():
+    # Losing 10 a day from 100 goes below zero on day 11 on every path
+    result = simulate(np.full(30, -10.0), 100.0, 30, paths=50, seed=1)
+
+    assert result.drawdown_prob == 1.0
+    assert result.cashflow_risk == 1.0
+    assert result.days_to_zero == 11
+    assert result.details["ending_balance"]["p50"] == -200.0
+
+
+@pytest.fixture
+def long_forecast(forecast):
+    owner, forecast = forecast
+    forecast.period_end = date(2124, 1, 1)
+    db.session.commit()
+    return owner, forecast
+
+
+def test_assess_rejects_a_forecast_longer_than_the_horizon_cap(client, long_forecast):
+    owner, forecast = long_forecast
+    response = client.post(
+        f"/api/forecasts/{forecast.id}/risk-score", json={"paths": 10}, headers=auth_headers(owner)
+    )
+
+    assert response.status_code == 400
+    assert "horizon" in response.get_json()["error"]
+
+
+def test_assess_caps_a_forecast_horizon_at_horizon_days(client, long_forecast):
+    owner, forecast = long_forecast
+    response = client.post(
+        f"/api/forecasts/{forecast.id}/risk-score",
+        json={"paths": 10, "horizon_days": 30, "seed": 1},
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()["details"]["horizon_days"] == 30
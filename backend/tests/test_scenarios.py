@@ -0,0 +1,180 @@
+import numpy as np
+import pytest
+
+from controllers.scenario_controller import MAX_BATCH
+from models import db, Scenario
+from services.scenarios.model import evaluate
+from services.scenarios.sweep import MAX_CONCURRENT, sweep_pool
+from tests.conftest import auth_headers, seed_cashflow
+
+
+@pytest.fixture
+def owner(make_user):
+    return make_user("owner@example.com", business_names=["Shop"])
+
+
+@pytest.mark.parametrize("timeline", ["100000_years", 10**9, "1e400_days", 0])
+def test_batch_rejects_unbounded_timeline(client, owner, timeline):
+    response = client.post(
+        "/api/scenarios/batch",
+        json={
+            "business_id": owner.businesses[0].id,
+            "scenarios": [{"params": {"timeline": timeline}}],
+            "persist": False,
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 400
+    assert "timeline" in response.get_json()["error"]
+
+
+def test_sweep_rejects_unbounded_timeline(client, owner):
+    response = client.post(
+        "/api/scenarios/sweep",
+        json={
+            "business_id": owner.businesses[0].id,
+            "grid": {"timeline": ["12_months", "100000_years"]},
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 400
+
+
+def test_run_rejects_unbounded_timeline(client, owner):
+    scenario = Scenario(
+        business_id=owner.businesses[0].id, params={"timeline": "100000_years"}, run_by=owner.id
+    )
+    db.session.add(scenario)
+    db.session.commit()
+
+    response = client.post(f"/api/scenarios/{scenario.id}/run", headers=auth_headers(owner))
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"market_growth": "nan"},
+        {"price_increase": "inf"},
+        {"investment": 1e308},
+        {"customer_retention": 2},
+        {"cost_reduction_target": 1.5},
+        {"implementation_cost": -100},
+        {"market_growth": True},
+    ],
+)
+def test_batch_rejects_out_of_range_params(client, owner, params):
+    seed_cashflow(owner.businesses[0])
+    response = client.post(
+        "/api/scenarios/batch",
+        json={"business_id": owner.businesses[0].id, "scenarios": [{"params": params}]},
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 400
+    assert next(iter(params)) in response.get_json()["error"]
+    assert Scenario.query.count() == 0
+
+
+def test_batch_rejects_too_many_scenarios(client, owner):
+    response = client.post(
+        "/api/scenarios/batch",
+        json={
+            "business_id": owner.businesses[0].id,
+            "scenarios": [{"params": {}}] * (MAX_BATCH + 1),
+            "persist": False,
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 400
+
+
+def test_batch_accepts_bounded_timeline(client, owner):
+    seed_cashflow(owner.businesses[0])
+    response = client.post(
+        "/api/scenarios/batch",
+        json={
+            "business_id": owner.businesses[0].id,
+            "scenarios": [{"params": {"timeline": "18_months", "price_increase": 0.05}}],
+            "persist": False,
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 200, response.get_json()
+    assert response.get_json()[0]["result_summary"]["horizon_days"] == 540
+
+
+def test_sweep_is_turned_away_when_all_slots_are_busy(client, owner):
+    held = 0
+    while sweep_pool.acquire():
+        held += 1
+    try:
+        response = client.post(
+            "/api/scenarios/sweep",
+            json={"business_id": owner.businesses[0].id, "grid": {"price_increase": [0, 0.1]}},
+            headers=auth_headers(owner),
+        )
+    finally:
+        for _ in range(held):
+            sweep_pool.release()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+
+
+def test_sweep_releases_its_slot_when_the_stream_closes(client, owner):
+    seed_cashflow(owner.businesses[0])
+    for _ in range(MAX_CONCURRENT + 1):
+        response = client.post(
+            "/api/scenarios/sweep",
+            json={"business_id": owner.businesses[0].id, "grid": {"price_increase": [0, 0.1]}},
+            headers=auth_headers(owner),
+        )
+        lines = response.get_data(as_text=True).splitlines()
+        response.close()
+
+        assert response.status_code == 200
+        assert len(lines) == 3
+
+
+def test_price_increase_pays_back_its_investment():
+    # +10% on 100/day inflow earns 10/day, so 300 up front is back on day 30
+    result, baseline = evaluate(
+        np.full(60, 100.0),
+        np.full(60, 60.0),
+        [{"price_increase": 0.1, "investment": 300, "timeline": 60}, {"timeline": 60}],
+        starting_cash=1000,
+    )
+
+    assert result["break_even_days"] == 30
+    assert result["break_even"] == "1_months"
+    assert result["incremental_cashflow"] == pytest.approx(300)
+    assert result["projected_roi"] == pytest.approx(1.0)
+    assert result["projected_net_cashflow"] == pytest.approx(50 * 60 - 300)
+    assert result["ending_cash"] == pytest.approx(1000 + 50 * 60 - 300)
+    assert baseline["baseline_net_cashflow"] == pytest.approx(40 * 60)
+    assert baseline["projected_roi"] is None
+
+
+def test_batch_projects_from_the_seeded_baseline(client, owner):
+    # A year of +40/day on average (weekday inflows 100..160, outflow 90)
+    seed_cashflow(owner.businesses[0], days=365)
+    response = client.post(
+        "/api/scenarios/batch",
+        json={
+            "business_id": owner.businesses[0].id,
+            "scenarios": [{"params": {"timeline": "28_days", "price_increase": 0.1}}],
+            "persist": False,
+        },
+        headers=auth_headers(owner),
+    )
+
+    assert response.status_code == 200, response.get_json()
+    summary = response.get_json()[0]["result_summary"]
+    assert summary["baseline_net_cashflow"] == pytest.approx(28 * 40, rel=0.05)
+    assert summary["incremental_cashflow"] == pytest.approx(28 * 13, rel=0.05)
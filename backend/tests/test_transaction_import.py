@@ -0,0 +1,100 @@
+import csv
+import json
+from decimal import Decimal
+
+import pytest
+
+from models import db, Category, DailyCashflow, Transaction
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def owner(make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    db.session.add(Category(business_id=owner.businesses[0].id, name="Sales", type="income"))
+    db.session.commit()
+    return owner
+
+
+def post_import(client, owner, body, content_type):
+    return client.post(
+        "/api/transactions/import?check_anomalies=false",
+        data=body,
+        headers={**auth_headers(owner), "Content-Type": content_type},
+    )
+
+
+def test_csv_import_writes_rows_and_rollup(client, owner):
+    body = (
+        "﻿date,amount,type,category,description\n"
+        "2024-03-01,100.50,income,Sales,Order 1\n"
+        "2024-03-01,20,expense,,Supplies\n"
+        "2024-03-02,75,income,sales,Order 2\n"
+    ).encode()
+
+    response = post_import(client, owner, body, "text/csv")
+
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()["imported"] == 3
+    assert {(t.description, t.amount, t.direction) for t in Transaction.query} == {
+        ("Order 1", Decimal("100.50"), "inflow"),
+        ("Supplies", Decimal("20.00"), "outflow"),
+        ("Order 2", Decimal("75.00"), "inflow"),
+    }
+    assert sum(bucket.count for bucket in DailyCashflow.query) == 3
+
+
+def test_ndjson_import(client, owner):
+    business_id = owner.businesses[0].id
+    body = "\n".join(
+        json.dumps({"business_id": business_id, "date": "2024-03-01", "amount": amount, "direction": "outflow"})
+        for amount in (10, 20)
+    ).encode()
+
+    response = post_import(client, owner, body, "application/x-ndjson")
+
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()["imported"] == 2
+    assert Transaction.query.count() == 2
+
+
+def test_bad_rows_are_reported_and_the_rest_imported(client, owner):
+    body = "\n".join(
+        [
+            json.dumps({"date": "2024-03-01", "amount": 10, "direction": "inflow"}),
+            json.dumps({"date": "not a date", "amount": 10, "direction": "inflow"}),
+            json.dumps({"date": "2024-03-01", "amount": "99999999999999999", "direction": "inflow"}),
+            json.dumps({"date": "2024-03-01", "amount": 10, "direction": "sideways"}),
+            "{not json",
+            json.dumps([1, 2]),
+            json.dumps({"date": "2024-03-01", "amount": "999999999999.99", "direction": "inflow"}),
+        ]
+    ).encode()
+
+    response = post_import(client, owner, body, "application/x-ndjson")
+
+    summary = response.get_json()
+    assert response.status_code == 201, summary
+    assert (summary["imported"], summary["failed"]) == (2, 5)
+    assert [error["row"] for error in summary["errors"]] == [2, 3, 4, 5, 6]
+    assert "12 digits" in summary["errors"][1]["error"]
+
+
+def test_undecodable_and_malformed_lines_do_not_abort_the_import(client, owner):
+    oversized = "x" * (csv.field_size_limit() + 1)
+    body = (
+        b"date,amount,type\n"
+        b"2024-03-01,10,income\n"
+        b"\xff\xfe,12,income\n"
+        + f'2024-03-01,5,"{oversized}"\n'.encode()
+        + b"2024-03-02,30,expense\n"
+    )
+
+    response = post_import(client, owner, body, "text/csv")
+
+    summary = response.get_json()
+    assert response.status_code == 201, summary
+    assert (summary["imported"], summary["failed"]) == (2, 2)
+    assert [error["row"] for error in summary["errors"]] == [3, 4]
+    assert "UTF-8" in summary["errors"][0]["error"]
+    assert "CSV" in summary["errors"][1]["error"]
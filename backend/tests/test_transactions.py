@@ -0,0 +1,83 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from models import db, Transaction
+from tests.conftest import auth_headers
+
+
+@pytest.fixture
+def owners(make_user):
+    owner = make_user("owner@example.com", business_names=["Shop"])
+    other = make_user("other@example.com", business_names=["Cafe"])
+    for user in (owner, other):
+        for day in range(5):
+            db.session.add(
+                Transaction(
+                    business_id=user.businesses[0].id,
+                    date=date(2024, 1, 1) + timedelta(days=day // 2),
+                    amount=10 + day,
+                    direction="inflow",
+                )
+            )
+    db.session.commit()
+    return owner, other
+
+
+def _listing_plans(client, user, query_string):
+    """EXPLAIN QUERY PLAN details of the transaction SELECTs a listing runs"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM transactions" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"/api/transactions?{query_string}", headers=auth_headers(user))
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+
+    with db.engine.connect() as connection:
+        return [
+            row[-1]
+            for statement, parameters in statements
+            for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        ]
+
+
+def test_pages_walk_owned_transactions_newest_first(client, owners):
+    owner, _ = owners
+    seen = []
+    cursor = ""
+    while True:
+        body = client.get(
+            f"/api/transactions?limit=2&cursor={cursor}", headers=auth_headers(owner)
+        ).get_json()
+        seen += [(row["date"], row["id"]) for row in body["transactions"]]
+        if not body["has_more"]:
+            break
+        cursor = body["next_cursor"]
+
+    owned = Transaction.query.filter_by(business_id=owner.businesses[0].id).all()
+    assert seen == sorted(((t.date.isoformat(), t.id) for t in owned), reverse=True)
+
+
+@pytest.mark.parametrize("role", ["business_owner", "admin"])
+def test_page_query_uses_an_index_for_the_ordering(client, owners, make_user, role):
+    owner, _ = owners
+    user = owner if role == "business_owner" else make_user("admin@example.com", role="admin")
+
+    plans = _listing_plans(client, user, "limit=2")
+
+    assert plans
+    assert not any("TEMP B-TREE" in detail for detail in plans), plans
+
+
+def test_stream_rejects_paging_arguments(client, owners):
+    owner, _ = owners
+    response = client.get("/api/transactions?stream=json&limit=2", headers=auth_headers(owner))
+
+    assert response.status_code == 400
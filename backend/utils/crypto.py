@@ -1,4 +1,130 @@
+import base64
 import hashlib
+import hmac
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# scrypt cost parameters; raising them rehashes existing passwords on login
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2**14)))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+# Hashing runs on a small dedicated pool. Requests beyond the pool plus
+# HASH_QUEUE waiting ones are turned away rather than queued without end.
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "16"))
+HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+
+_LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hashes are already running or queued"""
+
+
+class _BoundedHasher:
+    def __init__(self, workers, queue):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def run(self, function, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing is at capacity")
+
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=HASH_TIMEOUT)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy("Password hashing timed out")
+
+
+_hasher = _BoundedHasher(HASH_WORKERS, HASH_QUEUE)
+
+
+def _b64encode(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=256 * n * r * p,
+        dklen=KEY_BYTES,
+    )
+
+
+def _hash(password):
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def _verify(password, stored):
+    if _LEGACY_SHA256.match(stored):
+        legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(legacy, stored)
+
+    try:
+        scheme, n, r, p, salt, key = stored.split("$")
+        if scheme != "scrypt":
+            return False
+        expected = _b64decode(key)
+        actual = _scrypt(password, _b64decode(salt), int(n), int(r), int(p))
+    except ValueError:
+        return False
+    return hmac.compare_digest(actual, expected)
+
 
 def hash_password(password):
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
\ No newline at end of file
+    """
+    Salted scrypt hash of a password, stored as
+    ``scrypt$N$r$p$salt$key`` (base64, fits the 255 character column).
+    Runs on the bounded hashing pool; raises PasswordHasherBusy when full.
+    """
+    return _hasher.run(_hash, password)
+
+
+_dummy_hash = None
+
+
+def verify_password(password, stored):
+    """
+    Check a password against a stored scrypt hash or a legacy unsalted
+    SHA-256 digest. With no stored hash (unknown user) a dummy hash is
+    checked anyway, so response time does not reveal which emails exist.
+    """
+    global _dummy_hash
+    if not stored:
+        if _dummy_hash is None:
+            _dummy_hash = _hash(os.urandom(16).hex())
+        _hasher.run(_verify, password, _dummy_hash)
+        return False
+    return _hasher.run(_verify, password, stored)
+
+
+def needs_rehash(stored):
+    """True for legacy digests and hashes made with other cost parameters"""
+    if not stored or _LEGACY_SHA256.match(stored):
+        return True
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
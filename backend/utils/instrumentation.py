@@ -0,0 +1,239 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TIMED_PHASES = ("db", "ai", "serialize")
+
+logger = logging.getLogger(__name__)
+
+
+class _EndpointStats:
+    __slots__ = ("requests", "buckets", "duration", "statements", "phases")
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.duration = 0.0
+        self.statements = 0
+        self.phases = dict.fromkeys(TIMED_PHASES, 0.0)
+
+
+class Instrumentation:
+    """
+    Per-request statement counts and timings.
+
+    SQLAlchemy cursor hooks count statements and DB time, the AI client and
+    the serializers report their own time, and everything is attributed to
+    the request being handled. Each response gets a Server-Timing header and
+    the totals are aggregated per endpoint for the Prometheus ``/metrics``
+    endpoint. Counters are per process, like the job queue, so with several
+    gunicorn workers each scrape sees the worker that answered it.
+
+    Work outside a request (background jobs, CLI scripts) is not recorded,
+    and neither is the body of a streamed response, which is produced after
+    the headers have gone out.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._lock = threading.Lock()
+        self._endpoints = defaultdict(_EndpointStats)
+        self.slow_queries = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.server_timing = os.getenv("SERVER_TIMING", "true").lower() == "true"
+        # Statements slower than this are logged with their SQL; 0 disables
+        self.slow_query_seconds = float(os.getenv("SLOW_QUERY_MS", "250")) / 1000
+        self.metrics_token = os.getenv("METRICS_TOKEN") or None
+
+        event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view, methods=["GET"])
+
+    def add(self, phase, seconds):
+        """Charge time spent in a phase (db, ai, serialize) to the current request"""
+        timings = self._current()
+        if timings is not None:
+            timings[phase] += seconds
+
+    @contextmanager
+    def timer(self, phase):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    def _current(self):
+        if not has_request_context():
+            return None
+        return g.get("_timings")
+
+    def _start_request(self):
+        g._timings = dict.fromkeys(TIMED_PHASES, 0.0)
+        g._timings["statements"] = 0
+        g._request_started = time.perf_counter()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["_query_started"].pop()
+        timings = self._current()
+        if timings is None:
+            return
+
+        timings["statements"] += 1
+        timings["db"] += elapsed
+        if self.slow_query_seconds and elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self.slow_queries += 1
+            logger.warning(
+                "Slow query (%.1f ms) during %s %s: %s",
+                elapsed * 1000,
+                request.method,
+                request.path,
+                " ".join(statement.split())[:1000],
+            )
+
+    def _finish_request(self, response):
+        timings = g.pop("_timings", None)
+        if timings is None:
+            return response
+        total = time.perf_counter() - g.pop("_request_started")
+
+        if self.server_timing:
+            response.headers["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={timings["db"] * 1000:.1f};desc="{timings["statements"]} queries"',
+                    f'ai;dur={timings["ai"] * 1000:.1f}',
+                    f'serialize;dur={timings["serialize"] * 1000:.1f}',
+                    f"total;dur={total * 1000:.1f}",
+                ]
+            )
+
+        rule = request.url_rule.rule if request.url_rule else "<unmatched>"
+        with self._lock:
+            stats = self._endpoints[(request.method, rule)]
+            stats.requests[response.status_code] += 1
+            stats.duration += total
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if total <= bound:
+                    stats.buckets[index] += 1
+            stats.statements += timings["statements"]
+            for phase in TIMED_PHASES:
+                stats.phases[phase] += timings[phase]
+        return response
+
+    def metrics_view(self):
+        if self.metrics_token and request.headers.get("Authorization") != f"Bearer {self.metrics_token}":
+            return Response("Unauthorized\n", status=401, mimetype="text/plain")
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def render(self):
+        """All counters in the Prometheus text exposition format"""
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            slow_queries = self.slow_queries
+
+            lines = [
+                "# HELP http_requests_total Requests handled, by endpoint and status.",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, rule), stats in endpoints:
+                for status, count in sorted(stats.requests.items()):
+                    lines.append(
+                        f"http_requests_total{_labels(method, rule, status=status)} {count}"
+                    )
+
+            lines += [
+                "# HELP http_request_duration_seconds Time to produce a response.",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, rule), stats in endpoints:
+                count = sum(stats.requests.values())
+                for bound, bucket in zip(DURATION_BUCKETS, stats.buckets):
+                    lines.append(
+                        f"http_request_duration_seconds_bucket{_labels(method, rule, le=bound)} {bucket}"
+                    )
+                lines.append(
+                    f'http_request_duration_seconds_bucket{_labels(method, rule, le="+Inf")} {count}'
+                )
+                lines.append(f"http_request_duration_seconds_sum{_labels(method, rule)} {stats.duration:.6f}")
+                lines.append(f"http_request_duration_seconds_count{_labels(method, rule)} {count}")
+
+            lines += [
+                "# HELP http_request_db_statements_total SQL statements executed by requests.",
+                "# TYPE http_request_db_statements_total counter",
+            ]
+            for (method, rule), stats in endpoints:
+                lines.append(f"http_request_db_statements_total{_labels(method, rule)} {stats.statements}")
+
+            for phase, help_text in (
+                ("db", "Time spent executing SQL"),
+                ("ai", "Time spent waiting on the AI provider"),
+                ("serialize", "Time spent serializing rows and encoding JSON"),
+            ):
+                name = f"http_request_{phase}_seconds_total"
+                lines += [f"# HELP {name} {help_text}.", f"# TYPE {name} counter"]
+                for (method, rule), stats in endpoints:
+                    lines.append(f"{name}{_labels(method, rule)} {stats.phases[phase]:.6f}")
+
+        lines += [
+            "# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {slow_queries}",
+        ]
+        lines += _ai_client_lines()
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method, rule, **extra):
+    labels = {"method": method, "endpoint": rule, **extra}
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _ai_client_lines():
+    from services.ai_client import metrics as ai_metrics
+
+    snapshot = ai_metrics.snapshot()
+    lines = []
+    for key, kind in (
+        ("requests", "counter"),
+        ("retries", "counter"),
+        ("errors", "counter"),
+        ("throttled", "counter"),
+        ("clients_created", "counter"),
+        ("client_reuses", "counter"),
+    ):
+        name = f"ai_client_{key}_total"
+        lines += [f"# TYPE {name} {kind}", f"{name} {snapshot[key]}"]
+    lines += [
+        "# TYPE ai_client_latency_seconds_avg gauge",
+        f"ai_client_latency_seconds_avg {snapshot['avg_latency_ms'] / 1000:.6f}",
+        "# TYPE ai_client_latency_seconds_max gauge",
+        f"ai_client_latency_seconds_max {snapshot['max_latency_ms'] / 1000:.6f}",
+    ]
+    return lines
+
+
+instrumentation = Instrumentation()
@@ -0,0 +1,53 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from models import db
+
+
+class QueryCounter:
+    """
+    Records every SQL statement sent to the database while active. Used to
+    pin how many queries an endpoint issues so N+1 lookups show up as a
+    failing count rather than a slow page:
+
+        with QueryCounter() as queries:
+            client.get("/api/forecasts")
+        assert queries.count == 2, queries.statements
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+        return False
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """Fail with the recorded statements if the block runs more than limit queries"""
+    with QueryCounter(engine) as queries:
+        yield queries
+    if queries.count > limit:
+        listing = "\n".join(
+            f"{index}. {statement}" for index, statement in enumerate(queries.statements, 1)
+        )
+        raise AssertionError(
+            f"Expected at most {limit} queries, {queries.count} were executed:\n{listing}"
+        )
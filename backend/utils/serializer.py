@@ -0,0 +1,119 @@
+import json
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import Numeric
+
+from utils.instrumentation import instrumentation
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+
+class ModelSerializer:
+    """
+    Turns model instances (or any row with the same attribute names) into
+    JSON-ready dicts.
+
+    The per-column conversions are decided once from the table schema and
+    compiled into a single function, so serializing a row is one dict
+    literal with no type checks or column introspection. Dates and datetimes
+    become ISO strings and Numeric values become floats; None stays None.
+
+    Loaded ORM instances are read straight from their __dict__, skipping
+    the instrumented attribute descriptors; anything else (expired
+    instances, result rows) goes through normal attribute access.
+    """
+
+    def __init__(self, model, fields=None, exclude=()):
+        columns = {
+            attribute.key: attribute.columns[0]
+            for attribute in model.__mapper__.column_attrs
+        }
+        if fields is None:
+            fields = [name for name in columns if name not in exclude]
+
+        self.model = model
+        self.fields = tuple(fields)
+        self._field_set = frozenset(self.fields)
+        self._from_state = self._compile(columns, "state[{name!r}]")
+        self._from_attributes = self._compile(columns, "getattr(obj, {name!r})")
+
+    def one(self, obj):
+        state = getattr(obj, "__dict__", None)
+        if state is not None and self._field_set <= state.keys():
+            return self._from_state(state)
+        return self._from_attributes(obj)
+
+    def many(self, instances):
+        one = self.one
+        with instrumentation.timer("serialize"):
+            return [one(instance) for instance in instances]
+
+    def _compile(self, columns, accessor):
+        argument = "state" if accessor.startswith("state") else "obj"
+        lines = []
+        for index, name in enumerate(self.fields):
+            column = columns[name]
+            python_type = _python_type(column)
+            value = accessor.format(name=name)
+
+            if python_type in (date, datetime, time):
+                expression = (
+                    f"(v{index}.isoformat() if (v{index} := {value}) is not None else None)"
+                )
+            elif isinstance(column.type, Numeric) and column.type.asdecimal:
+                expression = f"(float(v{index}) if (v{index} := {value}) is not None else None)"
+            else:
+                expression = value
+            lines.append(f"        {name!r}: {expression},")
+
+        source = f"def serialize({argument}):\n    return {{\n" + "\n".join(lines) + "\n    }\n"
+        namespace = {}
+        exec(compile(source, f"<serializer {self.model.__name__}>", "exec"), namespace)
+        return namespace["serialize"]
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+_serializers = {}
+
+
+def serializer_for(model):
+    """Shared all-columns serializer for a model"""
+    serializer = _serializers.get(model)
+    if serializer is None:
+        serializer = _serializers[model] = ModelSerializer(model)
+    return serializer
+
+
+def dumps(value):
+    """Compact JSON text; uses orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str).decode()
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson when available. Values orjson does
+    not handle natively (and dates, to keep Flask's HTTP-date format) go
+    through the default provider's fallback, so responses look the same.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with instrumentation.timer("serialize"):
+            if orjson is None or kwargs.get("indent") is not None:
+                return super().dumps(obj, **kwargs)
+
+            option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=self.default, option=option).decode()
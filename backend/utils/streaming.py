@@ -0,0 +1,71 @@
+from flask import Response, request, stream_with_context
+
+from utils.serializer import dumps
+
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+DEFAULT_BATCH_SIZE = 1000
+CHUNK_BYTES = 64 * 1024
+
+
+def requested_stream_format():
+    """
+    The streaming format asked for with ?stream=ndjson|json, or None for a
+    regular response. Raises ValueError for an unknown format.
+    """
+    fmt = request.args.get("stream")
+    if not fmt:
+        return None
+
+    fmt = fmt.lower()
+    if fmt not in STREAM_FORMATS:
+        raise ValueError("Invalid stream format. Use 'ndjson' or 'json'")
+    return fmt
+
+
+def stream_query(query, serialize, fmt, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream a query as NDJSON lines or as one incrementally written JSON
+    array. Rows are fetched batch_size at a time through a server-side
+    cursor, so memory stays flat however many rows match.
+    """
+    rows = query.yield_per(batch_size)
+
+    def encoded():
+        for row in rows:
+            yield dumps(serialize(row))
+
+    def ndjson():
+        for line in encoded():
+            yield line + "\n"
+
+    def json_array():
+        yield "["
+        separator = ""
+        for item in encoded():
+            yield separator + item
+            separator = ","
+        yield "]"
+
+    body = ndjson() if fmt == "ndjson" else json_array()
+    return Response(
+        stream_with_context(_buffered(body)), mimetype=STREAM_FORMATS[fmt]
+    )
+
+
+def _buffered(pieces, size=CHUNK_BYTES):
+    """Join small pieces into ~size chunks so each write carries many rows"""
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)